@@ -114,3 +114,22 @@ def test_evaluate_grid2():
 
     sol = np.polynomial.chebyshev.chebgrid3d(x, x, x, poly.coeff)
     assert(np.all(poly.evaluate_grid(xyz) == sol))
+
+def test_restrict():
+    np.random.seed(0)
+    a = np.array([-.3,.2,0])
+    b = np.array([.5,.9,.1])
+    poly = MultiCheb(np.random.randn(5,4,6))
+    restricted = poly.restrict(a,b)
+    assert restricted.shape == poly.shape
+
+    points = np.random.uniform(-1,1,(20,3))
+    assert np.allclose(restricted(points), poly(((b-a)*points+(b+a))/2))
+
+    #Restricting to [-1,1] does nothing
+    assert np.allclose(poly.restrict(-np.ones(3),np.ones(3)).coeff, poly.coeff)
+
+    #One dimension with floats
+    poly = MultiCheb(np.random.randn(20))
+    x = np.linspace(-1,1,7)
+    assert np.allclose(poly.restrict(.1,.3)(x), poly(.1*x+.2))
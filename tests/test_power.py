@@ -140,3 +140,14 @@ def test_evaluate_grid2():
                     [6,14,28],
                     [6,29,58]]])
     assert(np.all(poly.evaluate_grid(xyz) == sol))
+
+def test_restrict():
+    np.random.seed(0)
+    a = np.array([-.3,.2])
+    b = np.array([.5,.9])
+    poly = MultiPower(np.random.randn(5,4))
+    restricted = poly.restrict(a,b)
+    assert isinstance(restricted, MultiPower)
+
+    points = np.random.uniform(-1,1,(20,2))
+    assert np.allclose(restricted(points), poly(((b-a)*points+(b+a))/2))
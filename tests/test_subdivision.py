@@ -1,4 +1,5 @@
 import unittest
+import pathlib
 import numpy as np
 from yroots.polynomial import Polynomial, MultiCheb, MultiPower, getPoly
 from yroots import subdivision as subdiv
@@ -153,21 +154,12 @@ def test_subdivision_solve_with_transform():
     # This case works, but it's really slow
     # Case 5 - Three MultiPower 3D of degrees 3,4 and 5
     # choose a seed that has a zero like 1,3,5,11,13,16,24,28,31,32,33,41,42
-<<<<<<< HEAD
     # np.random.seed(1)
     # a = -2*np.ones(3);b = 2*np.ones(3)
     # A = getPoly(3,3,True)
     # B = getPoly(4,3,True)
     # C = getPoly(5,3,True)
     # correctZeros([A,B,C], a, b)
-=======
-    np.random.seed(1)
-    a = -2*np.ones(3);b = 2*np.ones(3)
-    A = getPoly(3,3,True)
-    B = getPoly(4,3,True)
-    C = getPoly(5,3,True)
-    correctZeros([A,B,C], a, b)
->>>>>>> 50b4738d99cf8cd68e62fe355a69fc0346d90ce6
 
 def test_subdivision_solve_with_transform_1d():
     #Case 6 - One MultiPower 1D of degrees 10
@@ -241,3 +233,591 @@ def test_copy_block():
         idx2 = idx.copy()
         idx2[i] = slice(2*deg-1,deg,-1)
         assert np.all(values[tuple(idx1)] == values[tuple(idx2)])
+
+def test_interval_queue():
+    queue = subdiv.IntervalQueue(2, 2, capacity=1)
+    intervals = [(np.array([i,0.]), np.array([i+1,1.])) for i in range(5)]
+    queue.push_intervals(intervals, [[3,4],[5,2]], depth=2)
+    assert len(queue) == 5
+
+    #Intervals come back out in the order they were given
+    for i in range(5):
+        a, b, good_degs, depth = queue.pop()
+        assert np.all(a == intervals[i][0])
+        assert np.all(b == intervals[i][1])
+        assert np.all(good_degs == [[3,4],[5,2]])
+        assert depth == 2
+    assert len(queue) == 0
+
+    queue.push(-np.ones(2), np.ones(2))
+    a, b, good_degs, depth = queue.pop()
+    assert good_degs is None
+    assert depth == 0
+
+def test_root_accumulator():
+    roots = subdiv.RootAccumulator(2, capacity=1)
+    roots.add(np.zeros([0,2]))
+    assert len(roots) == 0
+    roots.add(np.array([[1.,2.]]))
+    roots.add(np.array([[3.,4.],[5.,6.]]))
+    assert len(roots) == 3
+    assert np.all(roots.get_roots() == np.array([[1.,2.],[3.,4.],[5.,6.]]))
+
+def test_default_checks_keep_roots():
+    #The constant term, T3(x)T3(y), dominates no single slice of the coefficients but cancels at some points
+    T3 = lambda x: 4*x**3 - 3*x
+    f = lambda x,y: .6 + T3(x)*T3(y)
+    g = lambda x,y: y - .3*x - .05
+    for tune_checks in [True, False]:
+        zeros = subdiv.solve([f,g],-np.ones(2),np.ones(2),silent=True,tune_checks=tune_checks)
+        assert len(zeros) == 2
+        assert np.max(np.abs(subdiv.evaluate_funcs([f,g],zeros))) < 1.e-6
+
+def test_trim_coeffs():
+    labels = subdiv.total_degree_labels((3,4,2))
+    assert labels.shape == (3,4,2)
+    assert labels[1,2,1] == 4
+    assert subdiv.total_degree_labels((3,4,2)) is labels
+
+    #The terms of degree 4 and up are below the tolerance, then degree 3, but not degree 2 as well
+    coeff = 10.**-subdiv.total_degree_labels((4,4))
+    coeffs, divisor_var = subdiv.trim_coeffs([coeff.copy()], 1.e-2, 1.e-5)
+    assert coeffs[0].shape == (3,3)
+    assert np.all(coeffs[0] == np.where(subdiv.total_degree_labels((3,3)) < 3, coeff[:3,:3], 0))
+
+    #Terms of degree 4 and up above the tolerance mean it can't be trimmed
+    coeffs, divisor_var = subdiv.trim_coeffs([coeff.copy()], 1.e-5, 1.e-5)
+    assert np.all(coeffs[0] == coeff)
+    assert divisor_var == -1
+
+def test_good_direc():
+    #A coefficient that is exactly zero is still on the Macaulay diagonal
+    A = np.array([[.5,0],[1,0]])
+    B = np.array([[.3,.2],[.1,0]])
+    assert not subdiv.good_direc([A,B],0,1.e-8)
+    assert subdiv.good_direc([A,B],1,1.e-8)
+
+    #The spots past the degree of a polynomial aren't
+    C = np.array([[.4,.2,.3],[.5,.6,0],[.7,0,0]])
+    assert subdiv.good_direc([C,B],0,1.e-8)
+    assert subdiv.good_direc([C,B],1,1.e-8)
+
+def test_subdivision_solve_deep():
+    '''
+    A root on a very small scale needs many levels of subdivision. The queue based solver
+    shouldn't run into the recursion limit no matter how deep it goes.
+    '''
+    f = lambda x,y: np.tanh(1.e3*(x-.2))
+    g = lambda x,y: y - .3
+    zeros = subdiv.solve([f,g], -np.ones(2), np.ones(2))
+    assert len(zeros) == 1
+    assert np.allclose(zeros[0], [.2,.3], atol=1.e-4)
+
+def test_subdivision_parallel():
+    '''
+    Solving with a pool of workers should find the same roots as solving serially,
+    even though lambdas can't be pickled.
+    '''
+    f = lambda x,y: np.sin(np.pi*y)
+    g = lambda x,y: np.sin(np.pi*(x+y))
+    a = -0.511*np.ones(2)
+    b = 3.511*np.ones(2)
+
+    zeros = subdiv.solve([f, g], a, b)
+    parallel_zeros = subdiv.solve([f, g], a, b, workers=2)
+    sort = lambda zeros: np.array(sorted(list(zeros), key=lambda x: 10*x[0] + x[1]))
+    assert len(parallel_zeros) == len(zeros)
+    assert np.allclose(sort(parallel_zeros), sort(zeros))
+
+def test_subdivision_parallel_dead_worker():
+    import os
+    import multiprocessing
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return
+    main = os.getpid()
+    def f(x,y):
+        if os.getpid() != main:
+            os._exit(1)
+        return np.sin(np.pi*y)
+    g = lambda x,y: np.sin(np.pi*(x+y))
+    #The solve fails instead of waiting forever for the interval of the dead worker
+    try:
+        subdiv.solve([f, g], -0.511*np.ones(2), 3.511*np.ones(2), workers=2)
+        assert False
+    except RuntimeError:
+        pass
+
+def test_solve_interval_task_schedulers():
+    f = lambda x,y: np.sin(20*x)*np.cos(20*y) + .3
+    g = lambda x,y: y - x**2 + .1*np.sin(15*x)
+    a = -np.ones(2)
+    b = np.ones(2)
+    subdiv._set_worker_funcs([f,g])
+    try:
+        #A worker keeps tuning the checks with the schedulers of its earlier tasks
+        zeros, pending, first = subdiv.solve_interval_task(a,b,None,0,9,a,b,1.e-4,1.e-8,False,8,None,tune_checks=True)
+        checked = first.interval_scheduler.checked.copy()
+        schedulers = (first.interval_scheduler, first.subinterval_scheduler)
+        zeros, pending, second = subdiv.solve_interval_task(pending[0][0],pending[1][0],None,pending[3][0],9,a,b,\
+                                                            1.e-4,1.e-8,False,8,None,tune_checks=True,\
+                                                            schedulers=schedulers)
+        assert second.interval_scheduler is first.interval_scheduler
+        assert np.all(second.interval_scheduler.checked >= checked)
+        assert np.sum(second.interval_scheduler.checked) > np.sum(checked)
+    finally:
+        subdiv._set_worker_funcs(None)
+
+    #The parallel solve still finds the same roots when tuning the checks
+    truth = subdiv.solve([f,g],a,b)
+    zeros = subdiv.solve([f,g],a,b,workers=2,tune_checks=True)
+    assert len(zeros) == len(truth)
+    assert np.allclose(np.sort(zeros, axis=0), np.sort(truth, axis=0))
+
+def test_full_cheb_approximate():
+    '''
+    The approximation test should evaluate the function once, on the degree 2*deg grid,
+    and return the degree 2*deg coefficients when they are good enough.
+    '''
+    from yroots.IntervalChecks import IntervalData
+    f = lambda x,y: np.cos(x) + y**2
+    a = -np.ones(2)
+    b = np.ones(2)
+    deg = 6
+    interval_data = IntervalData(a,b)
+    coeff, bools = subdiv.full_cheb_approximate(f,a,b,deg,1.e-5,interval_data=interval_data)
+    assert coeff.shape == (2*deg+1,2*deg+1)
+    assert interval_data.evaluations == (2*deg+1)**2
+
+    coeff2, multiplier = subdiv.interval_approximate_nd(f,a,b,2*deg)
+    assert np.allclose(coeff, coeff2)
+
+    #The coarse grid is every other point of the fine grid
+    values_block = subdiv.evaluate_cheb_grid(f,a,b,2*deg)
+    assert np.allclose(values_block[::2,::2], subdiv.evaluate_cheb_grid(f,a,b,deg))
+
+    #Too hard to approximate, so it says to subdivide
+    g = lambda x,y: np.sin(20*x) + y
+    coeff, div_dimensions = subdiv.full_cheb_approximate(g,a,b,deg,1.e-5)
+    assert coeff is None
+    assert np.all(div_dimensions == [0])
+
+def test_subdivision_polys_not_sampled():
+    '''
+    Polynomials are restricted to each interval exactly, so they are never evaluated.
+    '''
+    from yroots.IntervalChecks import IntervalData
+    np.random.seed(3)
+    a = -np.ones(2);b = np.ones(2)
+    polys = [getPoly(10,2,True), getPoly(10,2,False)]
+    interval_data = IntervalData(a,b)
+    zeros = subdiv.subdivision_solve_nd(polys,a,b,9,interval_data)
+    assert interval_data.evaluations == 0
+    assert len(zeros) > 0
+    for poly in polys:
+        assert np.allclose(poly(zeros), 0, atol=1.e-3)
+
+def test_subdivision_vector_function():
+    '''
+    One vector valued function should give the same roots as the list of its components,
+    with fewer function evaluations.
+    '''
+    from yroots.IntervalChecks import IntervalData
+    f = lambda x,y: np.sin(np.pi*y)
+    g = lambda x,y: np.sin(np.pi*(x+y))
+    F = lambda x,y: np.array([np.sin(np.pi*y), np.sin(np.pi*(x+y))])
+    a = -0.511*np.ones(2)
+    b = 3.511*np.ones(2)
+
+    list_data = IntervalData(a,b)
+    zeros = subdiv.subdivision_solve_nd([f,g],a,b,9,list_data)
+    vector_data = IntervalData(a,b)
+    vector_zeros = subdiv.subdivision_solve_nd(F,a,b,9,vector_data)
+    assert np.allclose(zeros, vector_zeros)
+    assert vector_data.evaluations < list_data.evaluations
+
+    #Also when the degrees are refined, in the serial and the batched solves
+    evaluations = []
+    for solver in [subdiv.subdivision_solve_nd, subdiv.batched_subdivision_solve_nd]:
+        list_data = IntervalData(a,b)
+        zeros = solver([f,g],a,b,9,list_data,max_deg=36)
+        vector_data = IntervalData(a,b)
+        vector_zeros = solver(F,a,b,9,vector_data,max_deg=36)
+        assert len(zeros) == len(vector_zeros) == 16
+        assert vector_data.evaluations < list_data.evaluations
+        evaluations.append(vector_data.evaluations)
+
+    #And in the async solve, where it is a coroutine function
+    import asyncio
+    async def async_F(x,y):
+        return F(x,y)
+    async_data = IntervalData(a,b)
+    async_zeros = asyncio.get_event_loop().run_until_complete(subdiv.async_subdivision_solve_nd(async_F,a,b,9,\
+                                                                                               async_data,max_deg=36))
+    assert len(async_zeros) == 16
+    assert async_data.evaluations == evaluations[0]
+
+    assert len(subdiv.solve(F, a, b)) == 16
+
+def test_subdivision_plot_vector_function():
+    from matplotlib import pyplot as plt
+    plt.switch_backend('Agg')
+    F = lambda x,y: np.array([np.sin(np.pi*y), np.sin(np.pi*(x+y))])
+    a = -0.511*np.ones(2)
+    b = 3.511*np.ones(2)
+    zeros = subdiv.solve(F, a, b, plot=True, silent=True)
+    assert len(zeros) == 16
+    #Every check gets a color when the intervals are plotted
+    zeros = subdiv.solve(F, a, b, plot=True, plot_intervals=True)
+    assert len(zeros) == 16
+    plt.close('all')
+
+def test_subdivision_batched():
+    calls = [0]
+    def f(x,y):
+        calls[0] += 1
+        return np.sin(np.pi*y)
+    def g(x,y):
+        calls[0] += 1
+        return np.sin(np.pi*(x+y))
+    a = -0.511*np.ones(2)
+    b = 3.511*np.ones(2)
+
+    zeros = subdiv.solve([f,g],a,b)
+    serial_calls = calls[0]
+    calls[0] = 0
+    batched_zeros = subdiv.solve([f,g],a,b,batched=True)
+    assert calls[0] < serial_calls/4
+
+    assert len(batched_zeros) == len(zeros) == 16
+    dists = np.linalg.norm(zeros[:,np.newaxis] - batched_zeros[np.newaxis], axis=2)
+    assert np.all(np.min(dists, axis=1) < 1.e-5)
+
+    #A vector valued function
+    vector_zeros = subdiv.solve(lambda x,y: np.array([np.sin(np.pi*y),np.sin(np.pi*(x+y))]),a,b,batched=True)
+    dists = np.linalg.norm(zeros[:,np.newaxis] - vector_zeros[np.newaxis], axis=2)
+    assert np.all(np.min(dists, axis=1) < 1.e-5)
+
+def test_anisotropic_approximation():
+    f = lambda x,y: np.sin(5*y) + .1*x
+    a = np.array([-1.,-1.])
+    b = np.array([1.,1.])
+
+    #Different degrees in each dimension
+    coeff, multiplier = subdiv.interval_approximate_nd(f,a,b,np.array([4,30]))
+    assert coeff.shape == (5,31)
+    cheb = np.polynomial.chebyshev.chebval2d
+    points = np.random.uniform(-1,1,(2,20))
+    assert np.allclose(cheb(points[0],points[1],coeff)/multiplier, f(points[0],points[1]), atol=1.e-6)
+
+    #Only the y direction is refined
+    from yroots.IntervalChecks import IntervalData
+    interval_data = IntervalData(a,b)
+    coeff, bools = subdiv.full_cheb_approximate(f,a,b,5,1.e-5,interval_data=interval_data,max_deg=40)
+    assert coeff is not None
+    assert interval_data.evaluations == 11**2 + 11*21 + 11*41
+    assert subdiv.axis_degrees(coeff, 1.e-5)[0] < 3
+
+    #Without refinement it subdivides in y
+    coeff, div_dims = subdiv.full_cheb_approximate(f,a,b,5,1.e-5)
+    assert coeff is None
+    assert np.all(div_dims == [1])
+
+def test_chebyshev_dct():
+    np.random.seed(0)
+    for shape in [(7,),(5,9),(4,4,6)]:
+        block = np.random.rand(*shape)
+        degs = [i-1 for i in shape]
+        coeffs = np.real(np.fft.fftn(subdiv.chebyshev_block_copy(block)/np.prod(degs)))
+        for i in range(len(shape)):
+            coeffs[(slice(None),)*i + (0,)] /= 2
+            coeffs[(slice(None),)*i + (degs[i],)] /= 2
+        coeffs = coeffs[tuple(slice(0,i) for i in shape)]
+        assert np.allclose(subdiv.chebyshev_dct(block), coeffs)
+
+    #One dimensional approximations only evaluate at the deg+1 extrema
+    x = []
+    coeffs = subdiv.interval_approximate_1d(lambda t: x.append(t) or np.cos(t),-1,2,16)
+    assert len(x[0]) == 17
+    t = np.linspace(-1,2,11)
+    assert np.allclose(np.polynomial.chebyshev.chebval((2*t-1)/3,coeffs), np.cos(t))
+
+def test_transform_workspace():
+    f = lambda x,y: np.cos(3*x+2*y)
+    workspace = subdiv.TransformWorkspace()
+    for i in range(5):
+        a = np.random.rand(2) - 1
+        b = a + np.random.rand(2)
+        coeff, bools = subdiv.full_cheb_approximate(f,a,b,9,1.e-4)
+        ws_coeff, ws_bools = subdiv.full_cheb_approximate(f,a,b,9,1.e-4,workspace=workspace)
+        assert np.allclose(coeff, ws_coeff)
+        #The coefficients belong to the caller
+        assert not any(np.shares_memory(ws_coeff, buffer) for buffer in workspace.buffers.values())
+    assert workspace.allocations == 3
+    assert workspace.uses == 15
+
+def test_subdivision_solve_1d_batch():
+    from yroots.OneDimension import multCheb, multChebStacked
+    np.random.seed(0)
+    coeffs = np.random.randn(5,8)
+    stacked = multChebStacked(coeffs)
+    for i in range(5):
+        assert np.allclose(np.sort_complex(stacked[i]), np.sort_complex(multCheb(coeffs[i])))
+
+    f = lambda x: np.sin(3*x) - .2
+    funcs = [f]*20 + [lambda x,k=k: np.cos(k*x) for k in range(1,6)] + [lambda x: np.tanh(100*(x-.1))]
+    a = np.linspace(-5,5,len(funcs))
+    b = a + 2
+    zeros = subdiv.subdivision_solve_1d_batch(funcs,a,b)
+    assert len(zeros) == len(funcs)
+    for i in range(len(funcs)):
+        serial_zeros = subdiv.subdivision_solve_1d(funcs[i],a[i],b[i])
+        assert len(zeros[i]) == len(serial_zeros)
+        assert np.allclose(zeros[i], serial_zeros)
+
+def test_solve_batch():
+    import yroots
+    calls = [0]
+    def circle(x,y):
+        calls[0] += 1
+        return x**2 + y**2 - .5
+    family_calls = [0]
+    def curve(x,y,p):
+        family_calls[0] += 1
+        return np.sin(3*x) - y + p
+    params = np.linspace(-.3,.3,5)
+    systems = [[yroots.ParameterizedFunction(curve, p), circle] for p in params]
+    #A vector valued system
+    systems.append(lambda x,y: np.array([np.sin(3*x) - y, x**2 + y**2 - .5]))
+    a = -np.ones(2)
+    b = np.ones(2)
+
+    zeros = yroots.solve_batch(systems,a,b)
+    assert len(zeros) == len(systems)
+    #The shared function and the family are each called once per grid size per level
+    assert calls[0] < 10
+    assert family_calls[0] < 10
+
+    for funcs, system_zeros in zip(systems, zeros):
+        assert len(system_zeros) == 2
+        assert np.allclose(system_zeros, subdiv.solve(funcs,a,b,batched=True))
+
+def test_solve_async():
+    import asyncio
+    running = [0]
+    most_running = [0]
+    async def f(x,y):
+        running[0] += 1
+        most_running[0] = max(most_running[0], running[0])
+        await asyncio.sleep(.001)
+        running[0] -= 1
+        return np.sin(3*x) - y
+    g = lambda x,y: x**2 + y**2 - .5
+    a = -np.ones(2)
+    b = np.ones(2)
+
+    loop = asyncio.get_event_loop()
+    zeros = loop.run_until_complete(subdiv.solve_async([f,g],a,b,max_concurrency=3))
+    assert most_running[0] <= 3
+    truth = subdiv.solve([lambda x,y: np.sin(3*x) - y, g],a,b)
+    assert len(zeros) == len(truth)
+    assert np.all(np.min(np.linalg.norm(zeros[:,None] - truth[None], axis=2), axis=1) < 1.e-8)
+
+    #Cancelling the solve cancels the evaluations that are running
+    async def cancel_solve():
+        task = asyncio.ensure_future(subdiv.solve_async([f,g],a,b,max_concurrency=3))
+        await asyncio.sleep(.005)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+    assert loop.run_until_complete(cancel_solve())
+
+def test_solve_budgets():
+    f = lambda x,y: np.sin(20*x)*np.cos(20*y) + .3
+    g = lambda x,y: y - x**2 + .1*np.sin(15*x)
+    a = -np.ones(2)
+    b = np.ones(2)
+    truth = subdiv.solve([f,g],a,b)
+
+    #A budget that isn't used up leaves nothing unresolved
+    zeros, unresolved, volume = subdiv.solve([f,g],a,b,max_depth=50)
+    assert np.allclose(zeros, truth)
+    assert unresolved.shape == (0,2,2)
+    assert volume == 0
+
+    for budget in [dict(max_depth=3), dict(max_evaluations=5000), dict(max_time=0.)]:
+        zeros, unresolved, volume = subdiv.solve([f,g],a,b,**budget)
+        assert len(unresolved) > 0
+        assert np.all(unresolved[:,0] >= a) and np.all(unresolved[:,1] <= b)
+        assert np.isclose(volume, np.sum(np.prod(unresolved[:,1] - unresolved[:,0], axis=1)))
+        #The roots found so far are real roots
+        for zero in zeros:
+            assert np.min(np.linalg.norm(truth - zero, axis=1)) < 1.e-8
+        #Every root not found is in an unresolved interval
+        for zero in truth:
+            if len(zeros) == 0 or np.min(np.linalg.norm(zeros - zero, axis=1)) > 1.e-8:
+                assert np.any(np.all((unresolved[:,0] <= zero) & (zero <= unresolved[:,1]), axis=1))
+
+def test_checkpoint_resume(tmpdir):
+    class Preempted(Exception):
+        pass
+    calls = [0]
+    def f(x,y):
+        calls[0] += 1
+        if calls[0] == 40:
+            raise Preempted
+        return np.sin(20*x)*np.cos(20*y) + .3
+    g = lambda x,y: y - x**2 + .1*np.sin(15*x)
+    a = -np.ones(2)
+    b = np.ones(2)
+    path = str(tmpdir.join('solve.npz'))
+
+    calls[0] = -np.inf
+    interval_data = subdiv.IntervalData(a,b)
+    truth = subdiv.subdivision_solve_nd([f,g],a,b,9,interval_data)
+
+    calls[0] = 0
+    try:
+        subdiv.solve([f,g],a,b,checkpoint=path)
+        assert False
+    except Preempted:
+        pass
+
+    #The resumed solve finishes the work without repeating any of it
+    calls[0] = -np.inf
+    resumed_data = subdiv.IntervalData(a,b)
+    zeros = subdiv.subdivision_solve_nd([f,g],a,b,9,resumed_data,resume_from=path)
+    assert np.allclose(np.sort(zeros, axis=0), np.sort(truth, axis=0))
+    assert resumed_data.evaluations == interval_data.evaluations
+    assert np.isclose(resumed_data.current_area, interval_data.current_area)
+    assert np.all(resumed_data.counts == interval_data.counts)
+
+    #A checkpoint can only resume the same interval
+    try:
+        subdiv.solve([f,g],a,2*b,resume_from=path)
+        assert False
+    except ValueError:
+        pass
+
+    #Saves every few intervals, to a pathlib path
+    path = pathlib.Path(str(tmpdir.join('frequent.npz')))
+    saved = []
+    def h(x,y):
+        saved.append(path.exists())
+        return f(x,y)
+    calls[0] = -np.inf
+    zeros = subdiv.solve([h,g],a,b,checkpoint=path,checkpoint_interval=np.inf,checkpoint_frequency=5)
+    assert any(saved)
+    assert np.allclose(np.sort(subdiv.solve([h,g],a,b,resume_from=path)[0], axis=0), np.sort(zeros[0], axis=0))
+
+def test_interval_log():
+    from yroots.IntervalChecks import IntervalData
+    f = lambda x,y: np.sin(20*x)*np.cos(20*y) + .3
+    g = lambda x,y: y - x**2 + .1*np.sin(15*x)
+    a = -np.ones(2)
+    b = np.ones(2)
+
+    #The checks run in a fixed order so each solve goes through the same intervals
+    interval_data = IntervalData(a,b)
+    zeros = subdiv.subdivision_solve_nd([f,g],a,b,9,interval_data,max_deg=36)
+    records = interval_data.interval_log.get_records()
+    assert len(records) == np.sum(interval_data.counts) > 64
+    assert np.isclose(np.sum(np.prod(records['upper'] - records['lower'], axis=1)), 4)
+    assert np.isclose(np.sum(interval_data.volumes), 4)
+    assert np.max(records['depth']) > 1
+    for name, count in zip(interval_data.methods, interval_data.counts):
+        lower, upper = interval_data.get_intervals(name)
+        assert len(lower) == count
+        assert np.all(lower < upper)
+
+    #Only counting gives the same counts and volumes
+    counts_data = IntervalData(a,b,log_intervals=False)
+    counts_zeros = subdiv.subdivision_solve_nd([f,g],a,b,9,counts_data,max_deg=36)
+    assert np.allclose(zeros, counts_zeros)
+    assert counts_data.interval_log is None
+    assert np.all(counts_data.counts == interval_data.counts)
+    assert np.allclose(counts_data.volumes, interval_data.volumes)
+
+    #The parallel solve merges the logs of the workers
+    parallel_data = IntervalData(a,b)
+    subdiv.parallel_subdivision_solve_nd([f,g],a,b,9,parallel_data,workers=2,max_deg=36)
+    assert np.all(parallel_data.counts == interval_data.counts)
+    assert len(parallel_data.interval_log) == len(records)
+
+def test_progress_reporting(capsys):
+    f = lambda x,y: np.sin(20*x)*np.cos(20*y) + .3
+    g = lambda x,y: y - x**2 + .1*np.sin(15*x)
+    a = -np.ones(2)
+    b = np.ones(2)
+    capsys.readouterr()
+
+    truth = subdiv.solve([f,g],a,b,silent=True)
+    assert capsys.readouterr().out == ''
+
+    reports = []
+    zeros = subdiv.solve([f,g],a,b,progress_callback=reports.append,progress_frequency=10)
+    assert capsys.readouterr().out == ''
+    assert np.allclose(zeros, truth)
+    assert len(reports) > 2
+    assert all(not report['done'] for report in reports[:-1])
+    assert reports[-1]['done']
+    assert np.isclose(reports[-1]['volume_solved'], 1)
+    volumes = [report['volume_solved'] for report in reports]
+    assert np.all(np.diff(volumes) >= 0)
+    assert reports[-1]['evaluations'] > 0
+    assert reports[-1]['interval_rate'] > 0
+    assert sum(reports[-1]['intervals'].values()) > sum(reports[0]['intervals'].values())
+
+def test_unique_roots():
+    np.random.seed(0)
+    zeros = np.random.uniform(-1,1,(1000,3))
+    #Duplicates, and a chain of roots that are each close to the next
+    duplicates = zeros[:100] + 1.e-12
+    chain = zeros[100] + np.arange(1,4)[:,np.newaxis]*np.array([.6e-8,0,0])
+    unique_zeros = subdiv.unique_roots(np.vstack([zeros, duplicates, chain]), 1.e-8)
+    #The chain isn't merged into one root, only the roots within tol of a kept root are removed
+    assert np.all(unique_zeros == np.vstack([zeros, chain[1]]))
+    assert len(subdiv.unique_roots(chain, 1.e-8)) == 2
+
+    #Polishing finds some roots twice, and the solver removes those duplicates
+    np.random.seed(0)
+    p = np.random.uniform(5,25,4)
+    q = np.random.uniform(-1,1,4)
+    f = lambda x,y: np.sin(p[0]*x+q[0])*np.cos(p[1]*y+q[1]) + .2*q[2]
+    g = lambda x,y: np.sin(p[2]*(x+y)+q[3]) - .3*x
+    zeros = subdiv.solve([f,g],-np.ones(2),np.ones(2),polish=True,silent=True)
+    distances = np.linalg.norm(zeros[:,np.newaxis] - zeros[np.newaxis], axis=2)
+    np.fill_diagonal(distances, np.inf)
+    assert np.min(distances) > 1.e-6
+
+def test_polish_roots():
+    f = lambda x,y: np.sin(3*x) - y
+    g = lambda x,y: x**2 + y**2 - .5
+    jac = lambda x,y: np.array([[3*np.cos(3*x), -np.ones_like(y)], [2*x, 2*y]])
+    a = -np.ones(2)
+    b = np.ones(2)
+    zeros = subdiv.solve([f,g],a,b,silent=True)
+
+    #All the roots are refined together, with or without the Jacobian
+    for polished in [subdiv.polish_roots(zeros,[f,g],a,b), subdiv.polish_roots(zeros,[f,g],a,b,jac=jac),\
+                     subdiv.solve([f,g],a,b,polish=True,silent=True)]:
+        assert len(polished) == len(zeros)
+        assert np.allclose(polished, zeros, atol=1.e-4)
+        assert np.max(np.abs(subdiv.evaluate_funcs([f,g],polished))) < 1.e-14
+
+    #Newton's method converges slowly to a double root, so that root is resolved by subdivision
+    h = lambda x,y: (x-.3)**2
+    k = lambda x,y: y-.2
+    polished, converged = subdiv.newton_polish(np.array([[.301,.2]]),[h,k],.1)
+    assert not converged[0]
+    polished = subdiv.polish_roots(np.array([[.301,.2]]),[h,k],a,b)
+    assert len(polished) > 0
+    assert np.allclose(polished, [.3,.2], atol=1.e-4)
+
+    #Zeros that Newton's method pushes out of [a,b] are left where they were
+    h = lambda x,y: x-1.001
+    polished, converged = subdiv.newton_polish(np.array([[.999,.2]]),[h,k],.1)
+    assert converged[0] and polished[0,0] > 1
+    assert np.allclose(subdiv.polish_roots(np.array([[.999,.2]]),[h,k],a,b), [[.999,.2]])
@@ -1,10 +1,12 @@
 import numpy as np
 from yroots.IntervalChecks import constant_term_check, full_quad_check, full_cubic_check, curvature_check, \
-linear_check, quadratic_check
+linear_check, quadratic_check, constant_term_check_batch, stack_coeffs, IntervalData, quadratic_check_2D, \
+quadratic_check_3D, quadratic_check_nd, bernstein_check, bernstein_check_batch, chebyshev_to_bernstein, \
+IntervalArray, TabularCompute, chebvalnd, CheckScheduler
 from yroots.polynomial import MultiCheb,MultiPower
 
 def test_zero_check2D():
-    interval_checks = [constant_term_check,full_quad_check, curvature_check, full_cubic_check]
+    interval_checks = [constant_term_check,full_quad_check, curvature_check, full_cubic_check, bernstein_check]
     subinterval_checks = [linear_check,quadratic_check]
     a = -np.ones(2)
     b = np.ones(2)
@@ -68,3 +70,149 @@ def test_zero_check2D():
 
     if __name__ == "__main__":
         test_zero_check2D()
+
+def test_batch_checks():
+    np.random.seed(0)
+    tol = 1.e-4
+    coeffs = [np.random.randn(*shape) for shape in [(3,4),(5,2),(2,2)]*100]
+    for coeff in coeffs[::3]:
+        coeff[0,0] += 10
+    stacked = stack_coeffs(coeffs)
+    assert stacked.shape == (300,5,4)
+    mask = constant_term_check_batch(stacked, tol)
+    assert np.all(mask == [constant_term_check(coeff, tol) for coeff in coeffs])
+    assert not np.all(mask)
+
+    a = -np.ones(2)
+    b = np.ones(2)
+    interval_data = IntervalData(a,b)
+    lower = np.random.uniform(-1,0,(300,2))
+    upper = lower + .5
+    thrown_out = interval_data.check_interval_batch(stacked, tol, lower, upper)
+    assert np.all(thrown_out[~mask])
+    assert interval_data.counts[interval_data.method_ids['constant_term_check']] == np.sum(~mask)
+    one_at_a_time = IntervalData(a,b)
+    assert np.all(thrown_out == [one_at_a_time.check_interval(coeff, tol, a, b) for coeff in stacked])
+    assert np.all(interval_data.counts == one_at_a_time.counts)
+
+def test_quadratic_check_nd():
+    from yroots.subdivision import get_subintervals
+    np.random.seed(1)
+    tol = 1.e-4
+    for dim, check in [(2, quadratic_check_2D), (3, quadratic_check_3D)]:
+        intervals = get_subintervals(-np.ones(dim),np.ones(dim),np.arange(dim),None,None,None,tol)
+        thrown_out = 0
+        for i in range(50):
+            coeff = np.random.randn(*[4]*dim)*np.random.rand(*[4]*dim)**3
+            coeff[(0,)*dim] += 6*np.random.randn()
+            change_sign = np.random.rand(len(intervals)) < .2
+            mask = quadratic_check_nd(coeff, intervals, change_sign, tol)
+            assert mask == list(check(coeff, intervals, change_sign, tol))
+            thrown_out += len(mask) - sum(mask)
+        assert thrown_out > 0
+
+def test_bernstein_check():
+    from scipy.special import comb
+    #The Bernstein form gives the same polynomial
+    for deg in [1,4,9]:
+        M = chebyshev_to_bernstein(deg)[0]
+        x = np.linspace(-1,1,20)
+        t = (x+1)/2
+        bernstein = np.array([comb(deg,j)*t**j*(1-t)**(deg-j) for j in range(deg+1)]).T
+        assert np.allclose(bernstein@M, np.polynomial.chebyshev.chebvander(x,deg))
+
+    #Positive on the box, but the constant term doesn't dominate
+    c = np.zeros((3,2))
+    c[0,0] = 1.5
+    c[1,0] = 1
+    c[2,0] = .4
+    c[0,1] = .2
+    assert constant_term_check(c, 1.e-4)
+    assert not bernstein_check(c, 1.e-4)
+    c[0,0] = .5
+    assert bernstein_check(c, 1.e-4)
+
+    np.random.seed(0)
+    coeffs = .02*np.random.randn(200,4,3,5)
+    coeffs[::2,0,0,0] += 2
+    mask = bernstein_check_batch(coeffs, 1.e-4)
+    assert np.all(mask == [bernstein_check(coeff, 1.e-4) for coeff in coeffs])
+    assert not np.all(mask)
+
+def test_interval_arithmetic():
+    from fractions import Fraction
+    #The results are rounded outward, so they contain the exact results
+    x = IntervalArray([.1, -.3], [.2, .7])
+    total = x + .2
+    assert total.lo[0] < Fraction(.1) + Fraction(.2) and Fraction(.2) + Fraction(.2) < total.hi[0]
+    product = x*IntervalArray(-3., 2.)
+    assert product.lo[0] < Fraction(.2)*-3 and product.hi[0] > Fraction(.2)*2
+    assert product.lo[1] < Fraction(.7)*-3 and product.hi[1] > Fraction(.7)*2
+    difference = 1 - x
+    assert difference.lo[1] < 1 - Fraction(.7) and difference.hi[1] > 1 - Fraction(-.3)
+
+    #Bounds on the value, gradient and curvature of x*y + y^2 on [0,1]x[-1,2]
+    x = TabularCompute(0., 1., dim=2, index=0)
+    y = TabularCompute(-1., 2., dim=2, index=1)
+    f = x*y + y*y
+    assert f.iv.lo <= -1 and f.iv.hi >= 6
+    assert np.all(f.iv_prime.lo <= [-1, -2]) and np.all(f.iv_prime.hi >= [2, 5])
+
+    #The whole coefficient tensor is evaluated at once
+    np.random.seed(0)
+    poly = MultiCheb(np.random.randn(4,5))
+    values = chebvalnd([TabularCompute(-.1, .1, dim=2, index=0), TabularCompute(.3, .4, dim=2, index=1)], poly)
+    assert values.iv.lo <= poly([0,.35]) <= values.iv.hi
+
+    #Positive with small curvature, which the constant term check can't see
+    c = np.array([[1.245,.963,.014],[-.123,-.141,0],[-.023,0,0]])
+    assert constant_term_check(c, 1.e-4)
+    assert not curvature_check(c, 1.e-4)
+    assert not curvature_check(-c, 1.e-4)
+
+    #The corners are all negative, but it is positive near (0,.75)
+    c = np.array([[-.35,.33,-.08],[.04,.01,0],[-.12,0,0]])
+    assert MultiCheb(c)([0,.75]) > 0
+    assert curvature_check(c, 1.e-4)
+
+    #The corners straddle zero, so the interval is kept however small the curvature is
+    c = np.array([[.1,1.],[0,0]])
+    assert MultiCheb(c)([0,-1]) < 0 < MultiCheb(c)([0,1])
+    assert curvature_check(c, 1.e-4)
+    assert curvature_check(-c, 1.e-4)
+
+def test_check_scheduler():
+    def cheap(test_coeff, tol):
+        return True
+    def useful(test_coeff, tol):
+        return False
+    def useless(test_coeff, tol):
+        return True
+    checks = [useless, cheap, useful]
+    scheduler = CheckScheduler(checks, explore_period=4)
+    #The checks that haven't been timed are ordered by their costs
+    assert scheduler.order() == checks
+    scheduler.record(useless, 1., 1, 0)
+    scheduler.record(cheap, 1., 1, 0)
+    scheduler.record(useful, 1., 1, 0)
+    #Then by their time per interval thrown out
+    scheduler.record(useless, 1.e-3, 10, 0)
+    scheduler.record(cheap, 1.e-5, 10, 0)
+    scheduler.record(useful, 1.e-4, 10, 10)
+    assert scheduler.order() == [useful, cheap, useless]
+    #Checks that take longer to throw out an interval than it saves are skipped, except when exploring
+    assert scheduler.order(saved_seconds=1.e-3) == [useful, cheap]
+    assert scheduler.order(saved_seconds=1.e-3) == [useful, cheap, useless]
+    assert CheckScheduler(checks, tune=False).order() == checks
+
+    #The checks are run in the scheduled order, and tracked
+    interval_data = IntervalData(-np.ones(2), np.ones(2))
+    interval_data.interval_scheduler = scheduler
+    interval_data.methods += ['cheap', 'useful', 'useless']
+    interval_data.method_ids = {name: i for i, name in enumerate(interval_data.methods)}
+    interval_data.counts = np.zeros(len(interval_data.methods), dtype=int)
+    interval_data.volumes = np.zeros(len(interval_data.methods))
+    assert interval_data.check_interval(np.ones((2,2)), 1.e-4, -np.ones(2), np.ones(2))
+    assert interval_data.counts[interval_data.method_ids['useful']] == 1
+    assert scheduler.checked[checks.index(useful)] == 12
+    assert scheduler.checked[checks.index(cheap)] == 11
@@ -2,15 +2,161 @@
 The check functions are all functions that take in a coefficent matrix and run a quick check
 to determine if there can ever be zeros on the unit box there. They are then put into the list
 all_bound_check_functions in the order we want to run them (probably fastest first). These are
-then all run to throw out intervals as possible.
+then all run to throw out intervals as possible. IntervalData reorders and skips them during a
+solve with CheckScheduler, starting from their costs in check_costs.
 """
 import numpy as np
 from itertools import product
 import itertools
+import time
+from fractions import Fraction
+from scipy.special import comb
 from yroots.polynomial import MultiCheb
 from matplotlib import pyplot as plt
 from yroots.polynomial import MultiCheb, Polynomial
 from matplotlib import patches
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+class IntervalLog:
+    '''
+    A log of the intervals that were solved, stored compactly in a structured numpy array.
+
+    Each record holds the id of the method that solved the interval, its bounds and its depth.
+    The array is preallocated and grows geometrically as needed.
+
+    Attributes
+    ----------
+    records : numpy array
+        A structured array with the fields 'method', 'lower', 'upper' and 'depth'. Only the first
+        size records are used.
+    size : int
+        The number of intervals logged.
+    '''
+    def __init__(self, dim, capacity=64):
+        self.records = np.empty(capacity, dtype=interval_log_dtype(dim))
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def grow(self, capacity):
+        """Makes room for at least capacity records, doubling the storage as needed."""
+        old_capacity = len(self.records)
+        if capacity <= old_capacity:
+            return
+        records = np.empty(max(capacity, 2*old_capacity), dtype=self.records.dtype)
+        records[:self.size] = self.records[:self.size]
+        self.records = records
+
+    def append(self, method, a, b, depth):
+        """Logs that the interval [a,b] at the given depth was solved by the method with the given id."""
+        self.grow(self.size + 1)
+        self.records[self.size] = (method, a, b, depth)
+        self.size += 1
+
+    def extend(self, records):
+        """Logs all the records of a structured array with the same fields."""
+        self.grow(self.size + len(records))
+        self.records[self.size:self.size + len(records)] = records
+        self.size += len(records)
+
+    def truncate(self, size):
+        """Forgets all but the first size records."""
+        self.size = min(self.size, size)
+
+    def get_records(self, method=None):
+        """The records that are used, or only the ones of the method with the given id."""
+        records = self.records[:self.size]
+        if method is None:
+            return records
+        return records[records['method'] == method]
+
+def interval_log_dtype(dim):
+    """The dtype of the records of an IntervalLog of intervals in dim dimensions."""
+    return np.dtype([('method', np.int16), ('lower', np.float64, (dim,)), ('upper', np.float64, (dim,)),\
+                     ('depth', np.int32)])
+
+class CheckScheduler:
+    '''
+    Picks the order to run a list of checks in, and which ones to skip, from how long each one takes
+    and how often it throws out an interval during the solve.
+
+    The checks are run in order of their expected time per interval thrown out, which is the order
+    that throws out an interval the fastest on average. Until a check has been timed its time is
+    estimated from its cost in check_costs. A check is skipped if it takes longer to throw out an
+    interval than throwing it out saves, except on every explore_period'th round, so it is picked
+    back up if it starts to work deeper in the solve.
+
+    Attributes
+    ----------
+    checks : list
+        The checks to schedule.
+    index : dictionary
+        A dictionary of the checks to their index in checks.
+    costs : numpy array
+        The relative cost of each check from check_costs, used until it has been timed.
+    calls : numpy array
+        How many times each check has been run.
+    times : numpy array
+        The total time spent running each check, not counting the first call as it may fill caches
+        or compile code.
+    timed : numpy array
+        How many intervals each check has checked in the timed calls.
+    checked : numpy array
+        How many intervals each check has checked.
+    thrown_out : numpy array
+        How many intervals each check has thrown out.
+    rounds : int
+        How many times the order has been asked for.
+    tune : bool
+        If false the checks are always all run in the order given.
+    explore_period : int
+        Skipped checks are still run once every this many rounds.
+    '''
+    def __init__(self, checks, tune=True, explore_period=32):
+        self.checks = list(checks)
+        self.index = {check: i for i, check in enumerate(self.checks)}
+        self.costs = np.array([check_costs.get(check, 1.) for check in self.checks], dtype=float)
+        self.calls = np.zeros(len(self.checks), dtype=int)
+        self.times = np.zeros(len(self.checks))
+        self.timed = np.zeros(len(self.checks), dtype=int)
+        self.checked = np.zeros(len(self.checks), dtype=int)
+        self.thrown_out = np.zeros(len(self.checks), dtype=int)
+        self.rounds = 0
+        self.tune = tune
+        self.explore_period = explore_period
+
+    def order(self, saved_seconds=None):
+        """The checks to run next, in the order to run them. saved_seconds is how much time throwing
+        out an interval saves the solve, if known."""
+        if not self.tune:
+            return self.checks
+        self.rounds += 1
+        #The rate each check throws out intervals at, smoothed so untried checks start at 1/2
+        rates = (self.thrown_out + .5) / (self.checked + 1)
+        timed = self.timed > 0
+        seconds = self.times / np.maximum(self.timed, 1)
+        #Converts the relative costs of the untimed checks to seconds using the timed ones
+        scale = np.mean(seconds[timed] / self.costs[timed]) if np.any(timed) else 1.
+        seconds = np.where(timed, seconds, self.costs*scale)
+        if saved_seconds is None or self.rounds % self.explore_period == 0:
+            skip = np.zeros(len(self.checks), dtype=bool)
+        else:
+            skip = timed & (seconds/rates > saved_seconds)
+        return [self.checks[i] for i in np.argsort(seconds/rates, kind='stable') if not skip[i]]
+
+    def record(self, check, seconds, checked, thrown_out):
+        """Records that check took seconds to check some intervals and throw out some of them."""
+        i = self.index[check]
+        if self.calls[i] > 0:
+            self.times[i] += seconds
+            self.timed[i] += checked
+        self.calls[i] += 1
+        self.checked[i] += checked
+        self.thrown_out[i] += thrown_out
 
 class IntervalData:
     '''
@@ -28,20 +174,47 @@ class IntervalData:
         sign changes,and a tolerance. It then returns a list of booleans whether the Chebyshev Polynomial
         represented by that matrix, and accurate to within that tolerance, can ever be zero on the given intervals.
         The list of sign changes represents if we already know the function changes sign on a given interval.
+    interval_scheduler: CheckScheduler
+        Picks which interval_checks to run, and in what order.
+    subinterval_scheduler: CheckScheduler
+        Picks which subinterval_checks to run, and in what order.
     a: numpy array
         The lower bounds of the overall interval to solve on.
     b: numpy array
         The upper bounds of the overall interval to solve on.
-    interval_results: dictionary
-        A dictionary of funciton names to lists of intervals that were solved by that function.
+    methods: list
+        The names of the checks and processes (Base Case, Division) that can solve an interval. The
+        index of a name is its id in interval_log.
+    method_ids: dictionary
+        A dictionary of the names in methods to their ids.
+    counts: numpy array
+        How many intervals were solved by each method.
+    volumes: numpy array
+        The n dimensional volume of the intervals solved by each method.
+    interval_log: IntervalLog
+        The intervals that were solved, or None if only the counts and volumes are kept.
     total_area: float
         The total n dimensional volume of the overall interval being solved on.
     current_area: float
         How much of the n dimensional volume has been checked.
+    depth: int
+        How many times the overall interval was subdivided to get the interval being solved. It is
+        logged with the intervals that are tracked.
     polishing: bool
         If true this class is just being used as a shell to pass into the polish code.
     tick: int
         Keeps track of how many intervals have been solved. Every 100 it resets and prints the progress.
+    evaluations: int
+        How many points the functions have been evaluated at.
+    progress_callback: function
+        If not None, it is called with the dictionary from progress instead of printing the progress.
+    progress_frequency: int
+        How many intervals are solved between each report of the progress.
+    silent: bool
+        If true nothing is printed or reported, and the intervals solved and the volume they cover
+        aren't tracked.
+    start_time: float
+        When the solve started, from time.perf_counter.
 
     Methods
     -------
@@ -49,35 +222,59 @@ class IntervalData:
         Initializes everything.
     check_intervals
         Checks if a polynomial can be zero on an interval.
+    check_interval_batch
+        Checks if polynomials can be zero on many intervals at once.
     check_subintervals
         Checks if a polynomial can be zero on an list of intervals.
+    saved_seconds
+        Estimates how much time throwing out an interval saves.
     track_interval
         Tracks what happened to a given interval.
+    track_evaluations
+        Counts function evaluations.
+    merge
+        Adds in what another IntervalData tracked.
+    get_intervals
+        Gets the logged intervals solved by a check/method.
     print_progress
         Prints what percentage of the domain has been searched
+    progress
+        Gives the progress of subdivision solve as a dictionary
+    finish
+        Reports the end of subdivision solve
     print_results
         Prints the results of how much each method contributed to the overall search
     plot_results
         Plots the results of subdivision solve
     '''
-    def __init__(self,a,b):
-        self.interval_checks = [constant_term_check]
+    def __init__(self,a,b,progress_callback=None,progress_frequency=100,silent=False,log_intervals=True,\
+                 tune_checks=False):
+        #quad_check and cubic_check ignore the terms outside the slices they bound, and curvature_check
+        #compiles chebval2 for interval arrays in every new process, so none of them run by default
+        self.interval_checks = [constant_term_check, bernstein_check]
         self.subinterval_checks = [quadratic_check]
 #         self.subinterval_checks = [linear_check]
-#         self.subinterval_checks = []
+        self.interval_scheduler = CheckScheduler(self.interval_checks, tune_checks)
+        self.subinterval_scheduler = CheckScheduler(self.subinterval_checks, tune_checks)
         self.a = a
         self.b = b
-        self.interval_results = dict()
-        for check in self.interval_checks:
-            self.interval_results[check.__name__] = []
-        for check in self.subinterval_checks:
-            self.interval_results[check.__name__] = []
-        self.interval_results["Base Case"] = []
-        self.interval_results["Division"] = []
+        self.methods = [check.__name__ for check in self.interval_checks]
+        self.methods += [check.__name__ for check in self.subinterval_checks]
+        self.methods += ["Base Case", "Division"]
+        self.method_ids = {name: i for i, name in enumerate(self.methods)}
+        self.counts = np.zeros(len(self.methods), dtype=int)
+        self.volumes = np.zeros(len(self.methods))
+        self.interval_log = IntervalLog(len(a)) if log_intervals else None
         self.total_area = np.prod(self.b-self.a)
         self.current_area = 0.
+        self.depth = 0
         self.polishing = False
         self.tick = 0
+        self.evaluations = 0
+        self.progress_callback = progress_callback
+        self.progress_frequency = progress_frequency
+        self.silent = silent
+        self.start_time = time.perf_counter()
 
     def check_interval(self, coeff, approx_tol, a, b):
         ''' Runs the interval checks on the interval [a,b]
@@ -97,12 +294,52 @@ class IntervalData:
         check_interval : bool
             True if we can throw out the interval. Otherwise False.
         '''
-        for check in self.interval_checks:
-            if not check(coeff, approx_tol):
+        for check in self.interval_scheduler.order(self.saved_seconds(2**len(self.a))):
+            start = time.perf_counter()
+            result = check(coeff, approx_tol)
+            self.interval_scheduler.record(check, time.perf_counter() - start, 1, not result)
+            if not result:
                 self.track_interval(check.__name__, [a,b])
                 return True
         return False
 
+    def check_interval_batch(self, coeffs, approx_tol, lower, upper):
+        ''' Runs the interval checks on many intervals at once. Checks that have a batched version in
+            batch_interval_checks check all the intervals in one vectorized pass, the others check
+            them one at a time.
+
+        Parameters
+        ----------
+        coeffs : numpy array
+            coeffs[i] is the coefficient matrix of the Chebyshev approximation on the i'th interval.
+            Approximations of lower degree can be padded with zeros, see stack_coeffs.
+        approx_tol: float
+            The sup norm bound on the approximation error.
+        lower: numpy array
+            Row i is the lower bounds of the i'th interval.
+        upper: numpy array
+            Row i is the upper bounds of the i'th interval.
+        Returns
+        -------
+        thrown_out : numpy array
+            thrown_out[i] is True if we can throw out the i'th interval.
+        '''
+        thrown_out = np.zeros(len(coeffs), dtype=bool)
+        for check in self.interval_scheduler.order(self.saved_seconds(2**len(self.a))):
+            idx = np.flatnonzero(~thrown_out)
+            if len(idx) == 0:
+                break
+            start = time.perf_counter()
+            if check in batch_interval_checks:
+                mask = batch_interval_checks[check](coeffs[idx], approx_tol)
+            else:
+                mask = np.array([check(coeffs[i], approx_tol) for i in idx], dtype=bool)
+            self.interval_scheduler.record(check, time.perf_counter() - start, len(idx), np.sum(~mask))
+            for i in idx[~mask]:
+                self.track_interval(check.__name__, [lower[i],upper[i]])
+            thrown_out[idx[~mask]] = True
+        return thrown_out
+
     def check_subintervals(self, subintervals, scaled_subintervals, polys, change_sign, approx_tol):
         ''' Runs the subinterval checks on the given intervals
 
@@ -123,22 +360,40 @@ class IntervalData:
         check_interval : bool
             True if we can throw out the interval. Otherwise False.
         '''
-        for check in self.subinterval_checks:
+        #Which subintervals haven't been thrown out yet
+        remaining = np.arange(len(subintervals))
+        for check in self.subinterval_scheduler.order(self.saved_seconds()):
             for poly in polys:
-                mask = check(poly, scaled_subintervals, change_sign, approx_tol)
-                new_scaled_subintervals = []
-                new_subintervals = []
-                for i, result in enumerate(mask):
-                    if result:
-                        new_scaled_subintervals.append(scaled_subintervals[i])
-                        new_subintervals.append(subintervals[i])
-                    else:
-                        self.track_interval(check.__name__, subintervals[i])
-                scaled_subintervals = new_scaled_subintervals
-                subintervals = new_subintervals
-        return subintervals
+                if len(remaining) == 0:
+                    return []
+                start = time.perf_counter()
+                mask = np.asarray(check(poly, [scaled_subintervals[i] for i in remaining],\
+                                        [change_sign[i] for i in remaining], approx_tol), dtype=bool)
+                self.subinterval_scheduler.record(check, time.perf_counter() - start, len(remaining), np.sum(~mask))
+                for i in remaining[~mask]:
+                    self.track_interval(check.__name__, subintervals[i], self.depth+1)
+                remaining = remaining[mask]
+        return [subintervals[i] for i in remaining]
+
+    def saved_seconds(self, intervals=1):
+        ''' Estimates how much time throwing out an interval saves, from how long the solve has spent
+            on each interval solved so far.
 
-    def track_interval(self, name, interval):
+        Parameters
+        ----------
+        intervals : int
+            How many intervals the solve would go through if the interval isn't thrown out.
+        Returns
+        -------
+        saved_seconds : float
+            The time saved, or None if no intervals have been tracked.
+        '''
+        solved = np.sum(self.counts)
+        if solved == 0:
+            return None
+        return intervals * (time.perf_counter() - self.start_time) / solved
+
+    def track_interval(self, name, interval, depth=None):
         ''' Stores what happened to a given interval
 
         Parameters
@@ -147,31 +402,131 @@ class IntervalData:
             The name of the check or process (Division, Base Case) that solved this interval
         interval: list
             [a,b] where a and b are the lower and upper bound of the interval to track.
+        depth: int
+            How many times the overall interval was subdivided to get this interval. Defaults to depth.
+        '''
+        if not self.polishing and not self.silent:
+            method = self.method_ids[name]
+            volume = np.prod(interval[1] - interval[0])
+            self.counts[method] += 1
+            self.volumes[method] += volume
+            self.current_area += volume
+            if self.interval_log is not None:
+                self.interval_log.append(method, interval[0], interval[1], self.depth if depth is None else depth)
+
+    def track_evaluations(self, num):
+        ''' Counts function evaluations
+
+        Parameters
+        ----------
+        num : int
+            How many points a function was just evaluated at.
         '''
-        if not self.polishing:
-            self.interval_results[name].append(interval)
-            self.current_area += np.prod(interval[1] - interval[0])
+        self.evaluations += num
+
+    def merge(self, other):
+        ''' Adds in the intervals and evaluations tracked by another IntervalData of the same solve,
+            like the ones of the worker processes of a parallel solve.
+
+        Parameters
+        ----------
+        other : IntervalData
+            What to add in.
+        '''
+        self.track_evaluations(other.evaluations)
+        if self.polishing or self.silent:
+            return
+        ids = np.array([self.method_ids[name] for name in other.methods])
+        np.add.at(self.counts, ids, other.counts)
+        np.add.at(self.volumes, ids, other.volumes)
+        self.current_area += np.sum(other.volumes)
+        if self.interval_log is not None and other.interval_log is not None:
+            records = other.interval_log.get_records().copy()
+            records['method'] = ids[records['method']]
+            self.interval_log.extend(records)
+
+    def get_intervals(self, name):
+        ''' Gets the intervals that were solved by a check/method. Needs the interval log.
+
+        Parameters
+        ----------
+        name : string
+            The name of the check or process (Division, Base Case).
+        Returns
+        -------
+        lower : numpy array
+            Row i is the lower bound of the i'th interval.
+        upper : numpy array
+            Row i is the upper bound of the i'th interval.
+        '''
+        if self.interval_log is None:
+            raise ValueError("The intervals aren't logged, only how many each method solved.")
+        records = self.interval_log.get_records(self.method_ids[name])
+        return records['lower'], records['upper']
 
     def print_progress(self):
-        ''' Prints the progress of subdivision solve. Only prints every 100th time this function is
-            called to save time.
+        ''' Prints the progress of subdivision solve, or passes it to progress_callback. Only reports
+            every progress_frequency times this function is called to save time.
         '''
-        if not self.polishing:
-            if self.tick == 100:
+        if not self.polishing and not self.silent:
+            if self.tick == self.progress_frequency:
                 self.tick = 0
-                print("\rPercent Finished: {}%       ".format(round(100*self.current_area/self.total_area,2)), end='')
+                if self.progress_callback is None:
+                    print("\rPercent Finished: {}%       ".format(round(100*self.current_area/self.total_area,2)), end='')
+                else:
+                    self.progress_callback(self.progress())
             self.tick += 1
 
+    def progress(self, done=False):
+        ''' Gives the progress of subdivision solve.
+
+        Parameters
+        ----------
+        done : bool
+            Whether the solve is finished.
+        Returns
+        -------
+        progress : dictionary
+            'volume_solved' is the fraction of the volume that has been solved, 'intervals' is a dictionary
+            of how many intervals each check/method solved, 'evaluations' is the number of function
+            evaluations, 'elapsed' is the seconds since the solve started, 'interval_rate' and
+            'evaluation_rate' are the intervals solved and evaluations per second, and 'done' is done.
+        '''
+        elapsed = time.perf_counter() - self.start_time
+        intervals = {name: int(count) for name, count in zip(self.methods, self.counts)}
+        rate_time = max(elapsed, 1.e-9)
+        return {'volume_solved': self.current_area/self.total_area,
+                'intervals': intervals,
+                'evaluations': self.evaluations,
+                'elapsed': elapsed,
+                'interval_rate': sum(intervals.values())/rate_time,
+                'evaluation_rate': self.evaluations/rate_time,
+                'done': done}
+
+    def finish(self):
+        ''' Reports the end of subdivision solve. Prints the results, or passes the final progress to
+            progress_callback. Does nothing if silent.
+        '''
+        if self.silent:
+            return
+        if self.progress_callback is None:
+            print("\rPercent Finished: 100%       ")
+            self.print_results()
+        else:
+            self.progress_callback(self.progress(done=True))
+
     def print_results(self):
         ''' Prints the results of subdivision solve, how many intervals there were and what percent were
             solve by each check/method.
         '''
-        results_numbers = np.array([len(self.interval_results[name]) for name in self.interval_results])
+        results_numbers = self.counts
         total_intervals = sum(results_numbers)
-        checkers = [name for name in self.interval_results]
+        checkers = self.methods
         print("Total intervals checked was {}".format(total_intervals))
         print("Methods used were {}".format(checkers))
-        print("The percent solved by each was {}".format((100*results_numbers / total_intervals).round(2)))
+        if total_intervals > 0:
+            print("The percent solved by each was {}".format((100*results_numbers / total_intervals).round(2)))
+        print("Total function evaluations was {}".format(self.evaluations))
 
     def plot_results(self, funcs, zeros, plot_intervals):
         ''' Prints the results of subdivision solve. Only works if the funcitons are two dimensional.
@@ -183,7 +538,7 @@ class IntervalData:
         zeros: numpy array
             Each row is a zero of the funcitons
         plot_intervals: bool
-            If true, shows on the plot which areas were solved by which check/method.
+            If true, shows on the plot which areas were solved by which check/method. Needs the interval log.
         '''
         #colors: use alpha = .5, dark green, black, orange roots. Change colors of check info plots
         #3D plot with small alpha, matplotlib interactive, animation
@@ -216,25 +571,23 @@ class IntervalData:
 
         #Plot the zeros
         plt.plot(np.real(zeros[:,0]), np.real(zeros[:,1]),'.',color='k',markersize=10,label='Roots')
-        colors = ['w','#d3d3d3','#708090','#ffd480']
+        colors = ['w','#d3d3d3','#708090','#ffd480','#99ccff','#ff9999','#b3e6b3','#e0b3ff']
 
         if plot_intervals:
             plt.title('What happened to the intervals')
             #plot results
             i = -1
-            for check in self.interval_results:
+            for check in self.methods:
                 i += 1
-                results = self.interval_results[check]
                 first = True
-                for data in results:
-                    a0,b0 = data
+                for a0,b0 in zip(*self.get_intervals(check)):
                     if first:
                         first = False
                         rect = patches.Rectangle((a0[0],a0[1]),b0[0]-a0[0],b0[1]-a0[1],linewidth=.05,\
-                                                 edgecolor='k',facecolor=colors[i], label=check)
+                                                 edgecolor='k',facecolor=colors[i%len(colors)], label=check)
                     else:
                         rect = patches.Rectangle((a0[0],a0[1]),b0[0]-a0[0],b0[1]-a0[1],linewidth=.05,\
-                                                 edgecolor='k',facecolor=colors[i])
+                                                 edgecolor='k',facecolor=colors[i%len(colors)])
                     ax.add_patch(rect)
             plt.legend()
         plt.show()
@@ -344,6 +697,151 @@ def constant_term_check(test_coeff, tol):
     else:
         return True
 
+def constant_term_check_batch(test_coeffs, tol):
+    """The batched version of constant_term_check
+
+    Parameters
+    ----------
+    test_coeffs : numpy array
+        test_coeffs[i] is the coefficient matrix of the i'th polynomial to check
+    tol: float
+        The bound of the sup norm error of the chebyshev approximations.
+
+    Returns
+    -------
+    mask : numpy array
+        mask[i] is False if the i'th function is guarenteed to never be zero in the unit box, True otherwise
+    """
+    axes = tuple(range(1, test_coeffs.ndim))
+    test_sums = np.sum(np.abs(test_coeffs), axis=axes)
+    constants = np.abs(test_coeffs[(slice(None),) + (0,)*len(axes)])
+    return constants * 2 <= test_sums + tol
+
+def stack_coeffs(coeffs):
+    """Stacks coefficient matrices of different shapes into one array for the batched checks.
+
+    Each matrix is padded with zeros to the largest shape in each dimension, which doesn't change
+    the polynomial it represents.
+
+    Parameters
+    ----------
+    coeffs : list
+        The coefficient matrices, all with the same number of dimensions.
+
+    Returns
+    -------
+    stacked : numpy array
+        stacked[i] is the i'th coefficient matrix padded with zeros.
+    """
+    shape = np.max([coeff.shape for coeff in coeffs], axis=0)
+    stacked = np.zeros((len(coeffs),) + tuple(shape), dtype=coeffs[0].dtype)
+    for i, coeff in enumerate(coeffs):
+        stacked[(i,) + tuple(slice(0, n) for n in coeff.shape)] = coeff
+    return stacked
+
+#The Chebyshev to Bernstein conversion matrices of each degree, made by chebyshev_to_bernstein
+bernstein_matrices = dict()
+
+def chebyshev_to_bernstein(deg):
+    """The matrix that converts Chebyshev coefficients to Bernstein coefficients on [-1,1].
+
+    The entries are computed exactly with integers and then rounded, and the matrix of each degree
+    is only computed once. A tensor is converted by applying the matrix of its degree in each dimension
+    along that axis, so these matrices are all that is needed in any dimension.
+
+    Parameters
+    ----------
+    deg : int
+        The degree of the polynomials.
+
+    Returns
+    -------
+    M : numpy array
+        M[j,k] is the j'th degree deg Bernstein coefficient of T_k.
+    abs_M : numpy array
+        The absolute value of M, for bounding the rounding error of the conversion.
+    """
+    if deg not in bernstein_matrices:
+        M = np.zeros([deg+1, deg+1])
+        for j in range(deg+1):
+            for k in range(deg+1):
+                total = 0
+                for i in range(max(0, j+k-deg), min(j, k)+1):
+                    total += (-1)**(k-i) * comb(2*k, 2*i, exact=True) * comb(deg-k, j-i, exact=True)
+                M[j,k] = Fraction(total, comb(deg, j, exact=True))
+        bernstein_matrices[deg] = M, np.abs(M)
+    return bernstein_matrices[deg]
+
+def bernstein_bounds(test_coeffs, first_axis=0):
+    """Converts Chebyshev coefficients to the Bernstein basis on the unit box.
+
+    Parameters
+    ----------
+    test_coeffs : numpy array
+        The coefficient matrix of the polynomial, or many of them stacked along the axes before first_axis.
+    first_axis : int
+        The first axis of the coefficient matrices.
+
+    Returns
+    -------
+    lower : numpy array
+        Lower bounds on the Bernstein coefficients, allowing for the rounding error of the conversion.
+    upper : numpy array
+        Upper bounds on the Bernstein coefficients.
+    """
+    values = test_coeffs
+    abs_values = np.abs(test_coeffs)
+    for axis in range(first_axis, test_coeffs.ndim):
+        M, abs_M = chebyshev_to_bernstein(test_coeffs.shape[axis] - 1)
+        values = np.moveaxis(np.tensordot(values, M, axes=([axis],[1])), -1, axis)
+        abs_values = np.moveaxis(np.tensordot(abs_values, abs_M, axes=([axis],[1])), -1, axis)
+    #Each conversion adds at most shape[axis] roundings to each term
+    error = 2 * np.sum(test_coeffs.shape[first_axis:]) * np.finfo(float).eps * abs_values
+    return values - error, values + error
+
+def bernstein_check(test_coeff, tol):
+    """One of interval_checks
+
+    Converts the polynomial to the Bernstein basis on the unit box. The polynomial is in the convex hull
+    of its Bernstein coefficients, so if they are all bigger than tol or all less than -tol it can't be zero.
+
+    Parameters
+    ----------
+    test_coeff : numpy array
+        The coefficient matrix of the polynomial to check
+    tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+
+    Returns
+    -------
+    bernstein_check : bool
+        False if the function is guarenteed to never be zero in the unit box, True otherwise
+    """
+    lower, upper = bernstein_bounds(test_coeff)
+    if np.min(lower) > tol or np.max(upper) < -tol:
+        return False
+    else:
+        return True
+
+def bernstein_check_batch(test_coeffs, tol):
+    """The batched version of bernstein_check
+
+    Parameters
+    ----------
+    test_coeffs : numpy array
+        test_coeffs[i] is the coefficient matrix of the i'th polynomial to check
+    tol: float
+        The bound of the sup norm error of the chebyshev approximations.
+
+    Returns
+    -------
+    mask : numpy array
+        mask[i] is False if the i'th function is guarenteed to never be zero in the unit box, True otherwise
+    """
+    lower, upper = bernstein_bounds(test_coeffs, 1)
+    axes = tuple(range(1, test_coeffs.ndim))
+    return (np.min(lower, axis=axes) <= tol) & (np.max(upper, axis=axes) >= -tol)
+
 def quad_check(test_coeff, tol):
     """One of interval_checks
 
@@ -614,7 +1112,8 @@ def quadratic_check_2D(test_coeff, intervals, change_sign, tol):
     """One of subinterval_checks
 
     Finds the min of the absolute value of the quadratic part, and compares to the sum of the
-    rest of the terms.
+    rest of the terms. All the intervals are checked by one call to the compiled quadratic_kernel_2D,
+    or by quadratic_check_nd if numba isn't installed.
 
     Parameters
     ----------
@@ -635,111 +1134,19 @@ def quadratic_check_2D(test_coeff, intervals, change_sign, tol):
     """
     if test_coeff.ndim != 2:
         return [True]*len(intervals)
-
-    #Padding is slow, so check the shape instead.
-    shape = test_coeff.shape
-    c0 = test_coeff[0,0]
-    if shape[0] > 1:
-        c1 = test_coeff[1,0]
-    else:
-        c1 = 0
-    if shape[1] > 1:
-        c2 = test_coeff[0,1]
-    else:
-        c2 = 0
-    if shape[0] > 2:
-        c3 = test_coeff[2,0]
-    else:
-        c3 = 0
-    if shape[0] > 1 and shape[1] > 1:
-        c4 = test_coeff[1,1]
-    else:
-        c4 = 0
-    if shape[1] > 2:
-        c5 = test_coeff[0,2]
-    else:
-        c5 = 0
-
-    #The sum of the absolute values of everything else
-    other_sum = np.sum(np.abs(test_coeff)) - np.sum(np.abs([c0,c1,c2,c3,c4,c5]))
-
-    #function for evaluating c0 + c1x + c2y +c3x^2 + c4xy + c5y^2 (note these are chebyshev monomials)
-    eval_func = lambda x,y: c0 + c1*x + c2*y + c3*(2*x**2-1) + c4*x*y + c5*(2*y**2-1)
-
-    #The interior min
-    #Comes from solving dx, dy = 0
-    #Dx: 4c3x +  c4y = -c1    Matrix inverse is  [4c5  -c4]
-    #Dy:  c4x + 4c5y = -c2                       [-c4  4c3]
-    det = 16*c3*c5 - c4**2
-    if det != 0:
-        int_x = (c2*c4 - 4*c1*c5)/det
-        int_y = (c1*c4 - 4*c2*c3)/det
-    else:#Something outside the unit box
-        int_x = 100
-        int_y = 100
-
-    mask = []
-    for i, interval in enumerate(intervals):
-        if change_sign[i]:
-            mask.append(True)
-            continue
-
-        extreme_points = []
-        #Add all the corners
-        extreme_points.append(eval_func(interval[0][0], interval[0][1]))
-        extreme_points.append(eval_func(interval[1][0], interval[0][1]))
-        extreme_points.append(eval_func(interval[0][0], interval[1][1]))
-        extreme_points.append(eval_func(interval[1][0], interval[1][1]))
-
-        #Add the x constant boundaries
-        #The partial with respect to y is zero
-        #Dy:  c4x + 4c5y = -c2 =>   y = (-c2-c4x)/(4c5)
-        if c5 != 0:
-            x = interval[0][0]
-            y = -(c2 + c4*x)/(4*c5)
-            if interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y))
-            x = interval[1][0]
-            y = -(c2 + c4*x)/(4*c5)
-            if interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y))
-
-        #Add the y constant boundaries
-        #The partial with respect to x is zero
-        #Dx: 4c3x +  c4y = -c1  =>  x = (-c1-c4y)/(4c3)
-        if c3 != 0:
-            y = interval[0][1]
-            x = -(c1 + c4*y)/(4*c3)
-            if interval[0][0] < x < interval[1][0]:
-                extreme_points.append(eval_func(x,y))
-            y = interval[1][1]
-            x = -(c1 + c4*y)/(4*c3)
-            if interval[0][0] < x < interval[1][0]:
-                extreme_points.append(eval_func(x,y))
-
-        #Add the interior value
-        if interval[0][0] < int_x < interval[1][0] and interval[0][1] < int_y < interval[1][1]:
-            extreme_points.append(eval_func(int_x,int_y))
-
-        extreme_points = np.array(extreme_points)
-
-        #If sign change, True
-        if not np.all(extreme_points > 0) and not np.all(extreme_points < 0):
-            mask.append(True)
-            continue
-
-        if np.min(np.abs(extreme_points)) - tol > other_sum:
-            mask.append(False)
-        else:
-            mask.append(True)
-
-    return mask
+    if njit is None:
+        return quadratic_check_nd(test_coeff, intervals, change_sign, tol)
+    const, B, A, other_sum = quadratic_part(test_coeff)
+    intervals = np.array(intervals, dtype=float).reshape(-1, 2, 2)
+    return quadratic_kernel_2D(const, B, A, other_sum, intervals[:,0], intervals[:,1],\
+                               np.array(change_sign, dtype=bool), tol).tolist()
 
 def quadratic_check_3D(test_coeff, intervals, change_sign, tol):
     """One of subinterval_checks
 
     Finds the min of the absolute value of the quadratic part, and compares to the sum of the
-    rest of the terms.
+    rest of the terms. All the intervals are checked by one call to the compiled quadratic_kernel_3D,
+    or by quadratic_check_nd if numba isn't installed.
 
     Parameters
     ----------
@@ -760,238 +1167,212 @@ def quadratic_check_3D(test_coeff, intervals, change_sign, tol):
     """
     if test_coeff.ndim != 3:
         return [True]*len(intervals)
+    if njit is None:
+        return quadratic_check_nd(test_coeff, intervals, change_sign, tol)
+    const, B, A, other_sum = quadratic_part(test_coeff)
+    intervals = np.array(intervals, dtype=float).reshape(-1, 2, 3)
+    return quadratic_kernel_3D(const, B, A, other_sum, intervals[:,0], intervals[:,1],\
+                               np.array(change_sign, dtype=bool), tol).tolist()
+
+def quadratic_value(const, B, A, x):
+    """Evaluates the quadratic const + Bx + x^TAx/2 at the point x."""
+    value = const
+    for i in range(len(x)):
+        value += B[i]*x[i] + A[i,i]*x[i]**2/2
+        for j in range(i+1, len(x)):
+            value += A[i,j]*x[i]*x[j]
+    return value
+
+def quadratic_kernel_2D(const, B, A, other_sum, lower, upper, change_sign, tol):
+    """The loop over the intervals of quadratic_check_2D, compiled with numba.
 
-    #Padding is slow, so check the shape instead.
-    shape = test_coeff.shape
-    c0 = test_coeff[0,0,0]
-    if shape[0] > 1:
-        c1 = test_coeff[1,0,0]
-    else:
-        c1 = 0
-    if shape[1] > 1:
-        c2 = test_coeff[0,1,0]
-    else:
-        c2 = 0
-    if shape[2] > 1:
-        c3 = test_coeff[0,0,1]
-    else:
-        c3 = 0
-    if shape[0] > 1 and shape[1] > 1:
-        c4 = test_coeff[1,1,0]
-    else:
-        c4 = 0
-    if shape[0] > 1 and shape[2] > 1:
-        c5 = test_coeff[1,0,1]
-    else:
-        c5 = 0
-    if shape[1] > 1 and shape[2] > 1:
-        c6 = test_coeff[0,1,1]
-    else:
-        c6 = 0
-    if shape[0] > 2:
-        c7 = test_coeff[2,0,0]
-    else:
-        c7 = 0
-    if shape[1] > 2:
-        c8 = test_coeff[0,2,0]
-    else:
-        c8 = 0
-    if shape[2] > 2:
-        c9 = test_coeff[0,0,2]
-    else:
-        c9 = 0
-
-    #function for evaluating c0 + c1x + c2y +c3z + c4xy + c5xz + c6yz + c7x^2 + c8y^2 + c9z^2
-    #(note these are chebyshev monomials)
-    eval_func = lambda x,y,z: c0 + c1*x + c2*y + c3*z + c4*x*y + c5*x*z + c6*y*z +\
-                                    c7*(2*x**2-1) + c8*(2*y**2-1) + c9*(2*z**2-1)
-
-    #The sum of the absolute values of everything else
-    other_sum = np.sum(np.abs(test_coeff)) - np.sum(np.abs([c0,c1,c2,c3,c4,c5,c6,c7,c8,c9]))
+    Parameters
+    ----------
+    const, B, A : float, numpy array, numpy array
+        The quadratic part const + Bx + x^TAx/2, from quadratic_part.
+    other_sum : float
+        The sum of the absolute values of the other terms.
+    lower : numpy array
+        Row i is the lower bounds of the i'th interval.
+    upper : numpy array
+        Row i is the upper bounds of the i'th interval.
+    change_sign : numpy array
+        Whether we know the function changes sign on each interval.
+    tol: float
+        The bound of the sup norm error of the chebyshev approximation.
 
+    Returns
+    -------
+    mask : numpy array
+        False if the function is guarenteed to never be zero on the interval, True otherwise.
+    """
     #The interior min
-    #Comes from solving dx, dy, dz = 0
-    #Dx: 4c7x +  c4y +  c5z = -c1    Matrix inverse is  [(16c8c9-c6^2) -(4c4c9-c5c6)  (c4c6-4c5c8)]
-    #Dy:  c4x + 4c8y +  c6z = -c2                       [-(4c4c9-c5c6) (16c7c9-c5^2) -(4c6c7-c4c5)]
-    #Dz:  c5x +  c6y + 4c9z = -c3                       [(c4c6-4c5c8)  -(4c6c7-c4c5) (16c7c8-c4^2)]
-    det = 4*c7*(16*c8*c9-c6**2) - c4*(4*c4*c9-c5*c6) + c5*(c4*c6-4*c5*c8)
+    #Comes from solving dx, dy = 0
+    #Dx: A00x + A01y = -B0    Matrix inverse is  [ A11  -A01]
+    #Dy: A01x + A11y = -B1                       [-A01   A00]
+    det = A[0,0]*A[1,1] - A[0,1]**2
+    interior = np.empty(2)
     if det != 0:
-        int_x = (c1*(c6**2-16*c8*c9) + c2*(4*c4*c9-c5*c6)  + c3*(4*c5*c8-c4*c6))/det
-        int_y = (c1*(4*c4*c9-c5*c6)  + c2*(c5**2-16*c7*c9) + c3*(4*c6*c7-c4*c5))/det
-        int_z = (c1*(4*c5*c8-c4*c6)  + c2*(4*c6*c7-c4*c5)  + c3*(c4**2-16*c7*c8))/det
-    else:#Something outside the unit box
-        int_x = 100
-        int_y = 100
-        int_z = 100
+        interior[0] = (A[0,1]*B[1] - A[1,1]*B[0])/det
+        interior[1] = (A[0,1]*B[0] - A[0,0]*B[1])/det
 
-    mask = []
-    for interval_num, interval in enumerate(intervals):
-        if change_sign[interval_num]:
-            mask.append(True)
+    mask = np.ones(len(lower), dtype=np.bool_)
+    x = np.empty(2)
+    for i in range(len(lower)):
+        if change_sign[i]:
             continue
-
-        extreme_points = []
-        #Add all the corners
-        extreme_points.append(eval_func(interval[0][0], interval[0][1], interval[0][2]))
-        extreme_points.append(eval_func(interval[1][0], interval[0][1], interval[0][2]))
-        extreme_points.append(eval_func(interval[0][0], interval[1][1], interval[0][2]))
-        extreme_points.append(eval_func(interval[0][0], interval[0][1], interval[1][2]))
-        extreme_points.append(eval_func(interval[1][0], interval[1][1], interval[0][2]))
-        extreme_points.append(eval_func(interval[1][0], interval[0][1], interval[1][2]))
-        extreme_points.append(eval_func(interval[0][0], interval[1][1], interval[1][2]))
-        extreme_points.append(eval_func(interval[1][0], interval[1][1], interval[1][2]))
-
-        #Adds the x and y constant boundaries
-        #The partial with respect to z is zero
-        #Dz:  c5x +  c6y + 4c9z = -c3   => z=(-c3-c5x-c6y)/(4c9)
-        if c9 != 0:
-            x = interval[0][0]
-            y = interval[0][1]
-            z = -(c3+c5*x+c6*y)/(4*c9)
-            if interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[1][0]
-            y = interval[0][1]
-            z = -(c3+c5*x+c6*y)/(4*c9)
-            if interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[0][0]
-            y = interval[1][1]
-            z = -(c3+c5*x+c6*y)/(4*c9)
-            if interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[1][0]
-            y = interval[1][1]
-            z = -(c3+c5*x+c6*y)/(4*c9)
-            if interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-
-        #Adds the x and z constant boundaries
-        #The partial with respect to y is zero
-        #Dy:  c4x + 4c8y + c6z = -c2   => y=(-c2-c4x-c6z)/(4c8)
-        if c8 != 0:
-            x = interval[0][0]
-            z = interval[0][2]
-            y = -(c2+c4*x+c6*z)/(4*c8)
-            if interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[1][0]
-            z = interval[0][2]
-            y = -(c2+c4*x+c6*z)/(4*c8)
-            if interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[0][0]
-            z = interval[1][2]
-            y = -(c2+c4*x+c6*z)/(4*c8)
-            if interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[1][0]
-            z = interval[1][2]
-            y = -(c2+c4*x+c6*z)/(4*c8)
-            if interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y,z))
-
-        #Adds the y and z constant boundaries
-        #The partial with respect to x is zero
-        #Dx: 4c7x +  c4y +  c5z = -c1   => x=(-c1-c4y-c5z)/(4c7)
-        if c7 != 0:
-            y = interval[0][1]
-            z = interval[0][2]
-            x = -(c1+c4*y+c5*z)/(4*c7)
-            if interval[0][0] < x < interval[1][0]:
-                extreme_points.append(eval_func(x,y,z))
-            y = interval[1][1]
-            z = interval[0][2]
-            x = -(c1+c4*y+c5*z)/(4*c7)
-            if interval[0][0] < x < interval[1][0]:
-                extreme_points.append(eval_func(x,y,z))
-            y = interval[0][1]
-            z = interval[1][2]
-            x = -(c1+c4*y+c5*z)/(4*c7)
-            if interval[0][0] < x < interval[1][0]:
-                extreme_points.append(eval_func(x,y,z))
-            y = interval[1][1]
-            z = interval[1][2]
-            x = -(c1+c4*y+c5*z)/(4*c7)
-            if interval[0][0] < x < interval[1][0]:
-                extreme_points.append(eval_func(x,y,z))
-
-        #Add the x constant boundaries
-        #The partials with respect to y and z are zero
-        #Dy:  4c8y +  c6z = -c2 - c4x    Matrix inverse is [4c9  -c6]
-        #Dz:   c6y + 4c9z = -c3 - c5x                      [-c6  4c8]
-        det = 16*c8*c9-c6**2
-        if det != 0:
-            x = interval[0][0]
-            y = (-4*c9*(c2+c4*x) +   c6*(c3+c5*x))/det
-            z = (c6*(c2+c4*x)    - 4*c8*(c3+c5*x))/det
-            if interval[0][1] < y < interval[1][1] and interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-            x = interval[1][0]
-            y = (-4*c9*(c2+c4*x) +   c6*(c3+c5*x))/det
-            z = (c6*(c2+c4*x)    - 4*c8*(c3+c5*x))/det
-            if interval[0][1] < y < interval[1][1] and interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-
-        #Add the y constant boundaries
-        #The partials with respect to x and z are zero
-        #Dx: 4c7x +  c5z = -c1 - c4y    Matrix inverse is [4c9  -c5]
-        #Dz:  c5x + 4c9z = -c3 - c6y                      [-c5  4c7]
-        det = 16*c7*c9-c5**2
-        if det != 0:
-            y = interval[0][1]
-            x = (-4*c9*(c1+c4*y) +   c5*(c3+c6*y))/det
-            z = (c5*(c1+c4*y)    - 4*c7*(c3+c6*y))/det
-            if interval[0][0] < x < interval[1][0] and interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-            y = interval[1][1]
-            x = (-4*c9*(c1+c4*y) +   c5*(c3+c6*y))/det
-            z = (c5*(c1+c4*y)    - 4*c7*(c3+c6*y))/det
-            if interval[0][0] < x < interval[1][0] and interval[0][2] < z < interval[1][2]:
-                extreme_points.append(eval_func(x,y,z))
-
-        #Add the z constant boundaries
-        #The partials with respect to x and y are zero
-        #Dx: 4c7x +  c4y  = -c1 - c5z    Matrix inverse is [4c8  -c4]
-        #Dy:  c4x + 4c8y  = -c2 - c6z                      [-c4  4c7]
-        det = 16*c7*c8-c4**2
-        if det != 0:
-            z = interval[0][2]
-            x = (-4*c8*(c1+c5*z) +   c4*(c2+c6*z))/det
-            y = (c4*(c1+c5*z)    - 4*c7*(c2+c6*z))/det
-            if interval[0][0] < x < interval[1][0] and interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y,z))
-            z = interval[1][2]
-            x = (-4*c8*(c1+c5*z) +   c4*(c2+c6*z))/det
-            y = (c4*(c1+c5*z)    - 4*c7*(c2+c6*z))/det
-            if interval[0][0] < x < interval[1][0] and interval[0][1] < y < interval[1][1]:
-                extreme_points.append(eval_func(x,y,z))
-
-        #Add the interior value
-        if interval[0][0] < int_x < interval[1][0] and interval[0][1] < int_y < interval[1][1] and\
-                interval[0][2] < int_z < interval[1][2]:
-            extreme_points.append(eval_func(int_x,int_y,int_z))
-
-        extreme_points = np.array(extreme_points)
+        min_abs = np.inf
+        has_pos = False
+        has_neg = False
+        for point in range(9):
+            if point < 4:
+                #The corners
+                x[0] = upper[i,0] if point & 1 else lower[i,0]
+                x[1] = upper[i,1] if point & 2 else lower[i,1]
+            elif point < 8:
+                #The edges, where the partial with respect to the free variable is zero
+                free = (point - 4)//2
+                fixed = 1 - free
+                if A[free,free] == 0:
+                    continue
+                x[fixed] = upper[i,fixed] if point & 1 else lower[i,fixed]
+                x[free] = -(B[free] + A[free,fixed]*x[fixed])/A[free,free]
+                if not lower[i,free] < x[free] < upper[i,free]:
+                    continue
+            else:
+                #The interior
+                if det == 0:
+                    continue
+                x[0] = interior[0]
+                x[1] = interior[1]
+                if not (lower[i,0] < x[0] < upper[i,0] and lower[i,1] < x[1] < upper[i,1]):
+                    continue
+            value = quadratic_value(const, B, A, x)
+            has_pos = has_pos or value >= 0
+            has_neg = has_neg or value <= 0
+            min_abs = min(min_abs, abs(value))
 
         #If sign change, True
-        if not np.all(extreme_points > 0) and not np.all(extreme_points < 0):
-            mask.append(True)
+        if has_pos and has_neg:
             continue
+        if min_abs - tol > other_sum:
+            mask[i] = False
+    return mask
 
-        if np.min(np.abs(extreme_points)) - tol > other_sum:
-            mask.append(False)
-        else:
-            mask.append(True)
+def quadratic_kernel_3D(const, B, A, other_sum, lower, upper, change_sign, tol):
+    """The loop over the intervals of quadratic_check_3D, compiled with numba.
 
+    Parameters
+    ----------
+    const, B, A : float, numpy array, numpy array
+        The quadratic part const + Bx + x^TAx/2, from quadratic_part.
+    other_sum : float
+        The sum of the absolute values of the other terms.
+    lower : numpy array
+        Row i is the lower bounds of the i'th interval.
+    upper : numpy array
+        Row i is the upper bounds of the i'th interval.
+    change_sign : numpy array
+        Whether we know the function changes sign on each interval.
+    tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+
+    Returns
+    -------
+    mask : numpy array
+        False if the function is guarenteed to never be zero on the interval, True otherwise.
+    """
+    #The interior min
+    #Comes from solving Ax = -B with the adjugate of A
+    adj = np.empty((3,3))
+    for j in range(3):
+        for k in range(3):
+            j1, j2 = [l for l in range(3) if l != k]
+            k1, k2 = [l for l in range(3) if l != j]
+            adj[j,k] = (-1)**(j+k)*(A[j1,k1]*A[j2,k2] - A[j1,k2]*A[j2,k1])
+    det = A[0,0]*adj[0,0] + A[0,1]*adj[1,0] + A[0,2]*adj[2,0]
+    interior = np.empty(3)
+    if det != 0:
+        for j in range(3):
+            interior[j] = -(adj[j,0]*B[0] + adj[j,1]*B[1] + adj[j,2]*B[2])/det
+
+    mask = np.ones(len(lower), dtype=np.bool_)
+    x = np.empty(3)
+    for i in range(len(lower)):
+        if change_sign[i]:
+            continue
+        min_abs = np.inf
+        has_pos = False
+        has_neg = False
+        #The corners
+        for corner in range(8):
+            for j in range(3):
+                x[j] = upper[i,j] if corner & (1 << j) else lower[i,j]
+            value = quadratic_value(const, B, A, x)
+            has_pos = has_pos or value >= 0
+            has_neg = has_neg or value <= 0
+            min_abs = min(min_abs, abs(value))
+
+        for k in range(3):
+            #The edges where only x_k is free, so the partial with respect to x_k is zero
+            if A[k,k] != 0:
+                j1, j2 = [l for l in range(3) if l != k]
+                for corner in range(4):
+                    x[j1] = upper[i,j1] if corner & 1 else lower[i,j1]
+                    x[j2] = upper[i,j2] if corner & 2 else lower[i,j2]
+                    x[k] = -(B[k] + A[k,j1]*x[j1] + A[k,j2]*x[j2])/A[k,k]
+                    if lower[i,k] < x[k] < upper[i,k]:
+                        value = quadratic_value(const, B, A, x)
+                        has_pos = has_pos or value >= 0
+                        has_neg = has_neg or value <= 0
+                        min_abs = min(min_abs, abs(value))
+
+            #The faces where x_k is fixed, so the partials with respect to the other two are zero
+            j1, j2 = [l for l in range(3) if l != k]
+            face_det = A[j1,j1]*A[j2,j2] - A[j1,j2]**2
+            if face_det != 0:
+                for side in range(2):
+                    x[k] = upper[i,k] if side else lower[i,k]
+                    rhs1 = B[j1] + A[j1,k]*x[k]
+                    rhs2 = B[j2] + A[j2,k]*x[k]
+                    x[j1] = (A[j1,j2]*rhs2 - A[j2,j2]*rhs1)/face_det
+                    x[j2] = (A[j1,j2]*rhs1 - A[j1,j1]*rhs2)/face_det
+                    if lower[i,j1] < x[j1] < upper[i,j1] and lower[i,j2] < x[j2] < upper[i,j2]:
+                        value = quadratic_value(const, B, A, x)
+                        has_pos = has_pos or value >= 0
+                        has_neg = has_neg or value <= 0
+                        min_abs = min(min_abs, abs(value))
+
+        #The interior
+        if det != 0 and lower[i,0] < interior[0] < upper[i,0] and lower[i,1] < interior[1] < upper[i,1]\
+                and lower[i,2] < interior[2] < upper[i,2]:
+            value = quadratic_value(const, B, A, interior)
+            has_pos = has_pos or value >= 0
+            has_neg = has_neg or value <= 0
+            min_abs = min(min_abs, abs(value))
+
+        #If sign change, True
+        if has_pos and has_neg:
+            continue
+        if min_abs - tol > other_sum:
+            mask[i] = False
     return mask
 
+if njit is not None:
+    quadratic_value = njit(cache=True)(quadratic_value)
+    quadratic_kernel_2D = njit(cache=True)(quadratic_kernel_2D)
+    quadratic_kernel_3D = njit(cache=True)(quadratic_kernel_3D)
+
 def quadratic_check_nd(test_coeff, intervals, change_sign, tol):
     """One of subinterval_checks
 
     Finds the min of the absolute value of the quadratic part, and compares to the sum of the
     rest of the terms.
 
+    The extreme values of the quadratic part are at the critical points on the faces of each interval.
+    Which variables are free on a face doesn't depend on the interval, so each of those reduced systems
+    is factored once and then the critical points of every interval and face are found together.
+
     Parameters
     ----------
     test_coeff_in : numpy array
@@ -1010,105 +1391,193 @@ def quadratic_check_nd(test_coeff, intervals, change_sign, tol):
         in the unit box, True otherwise
     """
     dim = test_coeff.ndim
-    padding = [(0,max(0,3-i)) for i in test_coeff.shape]
-    test_coeff = np.pad(test_coeff.copy(), padding, mode='constant')
+    const, B, A, other_sum = quadratic_part(test_coeff)
+    intervals = np.array(intervals, dtype=float).reshape(-1, 2, dim)
+    lower = intervals[:,0]
+    upper = intervals[:,1]
+
+    points = []
+    in_interval = []
+    for num_fixed in range(dim+1):
+        for fixed in itertools.combinations(range(dim), num_fixed):
+            fixed = list(fixed)
+            others = [i for i in range(dim) if i not in fixed]
+            #The fixed variables are at the corners of the face
+            corners = np.array(list(itertools.product([False,True], repeat=num_fixed)), dtype=bool)
+            corners = corners.reshape(2**num_fixed, 1, num_fixed)
+            X = np.empty((len(corners), len(intervals), dim))
+            X[:,:,fixed] = np.where(corners, upper[:,fixed], lower[:,fixed])
+            if len(others) > 0:
+                #The partials with respect to the others are zero
+                A_ = A[np.ix_(others, others)]
+                if np.linalg.matrix_rank(A_) < len(others):
+                    continue
+                A_inv = np.linalg.inv(A_)
+                X[:,:,others] = -(B[others] + X[:,:,fixed] @ A[np.ix_(others, fixed)].T) @ A_inv.T
+            points.append(X)
+            in_interval.append(np.all((lower <= X) & (X <= upper), axis=-1))
+    points = np.concatenate(points)
+    in_interval = np.concatenate(in_interval)
+
+    #Evaluates const + Bx + x^TAx/2 at all the points, which is the quadratic part in the Chebyshev basis
+    values = const + points @ B + np.einsum('...i,ij,...j->...', points, A, points)/2
+
+    #If sign change, True
+    all_positive = np.all(~in_interval | (values > 0), axis=0)
+    all_negative = np.all(~in_interval | (values < 0), axis=0)
+    min_values = np.min(np.where(in_interval, np.abs(values), np.inf), axis=0)
+    mask = np.array(change_sign, dtype=bool) | ~(all_positive | all_negative) | (min_values - tol <= other_sum)
+    return mask.tolist()
+
+def quadratic_part(test_coeff):
+    """Splits a Chebyshev polynomial into its quadratic part and the rest, for quadratic_check_nd
+
+    Parameters
+    ----------
+    test_coeff : numpy array
+        The coefficient matrix of the polynomial.
 
+    Returns
+    -------
+    const : float
+        The constant term of the quadratic part in the power basis, counting the -1 of each T_2.
+    B : numpy array
+        The linear terms of the quadratic part.
+    A : numpy array
+        The Hessian of the quadratic part, a symmetric matrix.
+    other_sum : float
+        The sum of the absolute values of the other terms.
+    """
+    dim = test_coeff.ndim
+    shape = test_coeff.shape
     A = np.zeros([dim,dim])
     B = np.zeros(dim)
-    quad_coeff = np.zeros([3]*dim)
-    for spot in itertools.product(np.arange(3),repeat=dim):
-        if np.sum(spot) < 3:
-            spot_array = np.array(spot)
-            if np.sum(spot_array != 0) == 2:
-                i,j = np.where(spot_array != 0)[0]
-                A[i,j] = test_coeff[spot].copy()
-                A[j,i] = test_coeff[spot].copy()
-            elif np.any(spot_array == 2):
-                i = np.where(spot_array != 0)[0][0]
-                A[i,i] = 4*test_coeff[spot].copy()
-            elif np.any(spot_array == 1):
-                i = np.where(spot_array != 0)[0][0]
-                B[i] = test_coeff[spot].copy()
-            quad_coeff[spot] = test_coeff[spot]
-            test_coeff[spot] = 0
-
-    quad_poly = MultiCheb(quad_coeff)
-
-    #The sum of the absolute values of everything else
-    other_sum = np.sum(np.abs(test_coeff))
+    def get(*spot):
+        #Padding is slow, so check the shape instead.
+        spot = spot + (0,)*(dim - len(spot))
+        for i, n in zip(spot, shape):
+            if i >= n:
+                return 0.
+        return float(test_coeff[spot])
+    const = get()
+    quad_sum = abs(const)
+    zeros = (0,)*dim
+    for i in range(dim):
+        B[i] = get(*zeros[:i], 1)
+        #T_2(x) = 2x^2 - 1
+        c = get(*zeros[:i], 2)
+        A[i,i] = 4*c
+        const -= c
+        quad_sum += abs(B[i]) + abs(c)
+        for j in range(i+1, dim):
+            A[i,j] = A[j,i] = get(*zeros[:i], 1, *zeros[i+1:j], 1)
+            quad_sum += abs(A[i,j])
+    other_sum = np.sum(np.abs(test_coeff)) - quad_sum
+    return const, B, A, other_sum
 
-    mask = []
-    for interval_num, interval in enumerate(intervals):
-        if change_sign[interval_num]:
-            mask.append(True)
-            continue
+#This is all for Tyler's new function
+def round_down(x):
+    """The next float below x, to round a lower bound outward."""
+    return np.nextafter(x, -np.inf)
 
-        def powerset(iterable):
-            "powerset([1,2,3]) --> () (1,) (2,) (3,) (1,2) (1,3) (2,3) (1,2,3)"
-            s = list(iterable)
-            return itertools.chain.from_iterable(itertools.combinations(s, r)\
-                                                 for r in range(len(s)+1))
-
-        extreme_points = []
-        for fixed in powerset(np.arange(dim)):
-            fixed = np.array(fixed)
-            if len(fixed) == 0:
-                others = np.arange(dim)
-                if np.linalg.matrix_rank(A) < A.shape[0]:
-                    continue
-                X = np.linalg.solve(A, -B)
-                if np.all([interval[0][i] <= X[i] <= interval[1][0] for i in range(dim)]):
-                    extreme_points.append(quad_poly(X))
-            elif len(fixed) == dim:
-                for corner in itertools.product([0,1],repeat=dim):
-                    extreme_points.append(quad_poly([interval[j][i] for i,j in enumerate(corner)]))
-            else:
-                others = np.delete(np.arange(dim), fixed)
-                A_ = A[others][:,others]
-                if np.linalg.matrix_rank(A_) < A_.shape[0]:
-                    continue
-                fixed_A = A[others][:,fixed]
-                B_ = B[others]
+def round_up(x):
+    """The next float above x, to round an upper bound outward."""
+    return np.nextafter(x, np.inf)
 
-                for corner in itertools.product([0,1],repeat=len(fixed)):
-                    X0 = np.array([interval[j][i] for i,j in enumerate(corner)])
-                    X_ = np.linalg.solve(A_, -B_-fixed_A@X0)
-                    X = np.zeros(dim)
-                    X[fixed] = X0
-                    X[others] = X_
-                    if np.all([interval[0][i] <= X[i] <= interval[1][0] for i in range(dim)]):
-                        extreme_points.append(quad_poly(X))
+class IntervalArray:
+    '''
+    An array of intervals of floats, stored as an array of lower bounds and an array of upper bounds.
+    The results of the arithmetic are rounded outward, so they always contain the exact result.
+    The arithmetic broadcasts like numpy arrays, and numbers and numpy arrays are treated as intervals
+    of width zero.
 
-        extreme_points = np.array(extreme_points)
+    Attributes
+    ----------
+    lo : numpy array
+        The lower bounds of the intervals.
+    hi : numpy array
+        The upper bounds of the intervals.
+    '''
+    #Makes numpy arrays use the reflected operators of this class instead of their own
+    __array_ufunc__ = None
 
-        #If sign change, True
-        if not np.all(extreme_points > 0) and not np.all(extreme_points < 0):
-            mask.append(True)
-            continue
+    def __init__(self, lo, hi=None):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = self.lo if hi is None else np.asarray(hi, dtype=float)
 
-        if np.min(np.abs(extreme_points)) - tol > other_sum:
-            mask.append(False)
-        else:
-            mask.append(True)
+    @property
+    def shape(self):
+        return np.broadcast(self.lo, self.hi).shape
 
-    return mask
+    def __getitem__(self, index):
+        return IntervalArray(self.lo[index], self.hi[index])
+
+    def __len__(self):
+        return len(self.lo)
+
+    def __add__(self, other):
+        if isinstance(other, IntervalArray):
+            return IntervalArray(round_down(self.lo + other.lo), round_up(self.hi + other.hi))
+        return IntervalArray(round_down(self.lo + other), round_up(self.hi + other))
+
+    def __neg__(self):
+        return IntervalArray(-self.hi, -self.lo)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __mul__(self, other):
+        if not isinstance(other, IntervalArray):
+            other = IntervalArray(other)
+        products = [self.lo*other.lo, self.lo*other.hi, self.hi*other.lo, self.hi*other.hi]
+        return IntervalArray(round_down(np.minimum.reduce(products)), round_up(np.maximum.reduce(products)))
+
+    def __radd__(self, other):
+        return self + other
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __rmul__(self, other):
+        return self*other
+
+    def sum(self, axis):
+        """Sums the intervals along an axis, with a bound on the rounding error of the sum."""
+        num = self.shape[axis]
+        error_lo = num*np.finfo(float).eps*np.sum(np.abs(self.lo), axis=axis)
+        error_hi = num*np.finfo(float).eps*np.sum(np.abs(self.hi), axis=axis)
+        return IntervalArray(round_down(np.sum(self.lo, axis=axis) - error_lo),\
+                             round_up(np.sum(self.hi, axis=axis) + error_hi))
+
+    def magnitude(self):
+        """An upper bound on the absolute value of the numbers in each interval."""
+        return np.maximum(np.abs(self.lo), np.abs(self.hi))
+
+    def __str__(self):
+        return "IntervalArray(lo={}, hi={})".format(self.lo, self.hi)
+
+    def __repr__(self):
+        return str(self)
 
-#This is all for Tyler's new function
-from mpmath import iv
-from itertools import product
-from copy import copy
 def lambda_s(a):
-    return sum(iv.mpf([0,1])*max(ai.a**2,ai.b**2) for ai in a)
+    """Bounds the sum of the squares of the intervals along the last axis of a, like [0,1]*max(a^2).
+    Returns the upper bound, as the lower bound is 0."""
+    return IntervalArray(round_up(a.magnitude()**2)).sum(-1).hi
 
 def beta(a,b):
-    return iv.mpf([-1,1])*iv.sqrt(lambda_s(a)*lambda_s(b))
+    r = round_up(np.sqrt(round_up(lambda_s(a)*lambda_s(b))))
+    return IntervalArray(-r, r)
 
 def lambda_t(a,b):
-    return beta(a,b) + np.dot(a,b)
+    return beta(a,b) + (a*b).sum(-1)
 
 class TabularCompute:
     def __init__(self,a,b,dim=False,index=None):
         """Class for estimating the maximum curvature.
+
+        Each instance is an array of functions on the same box, with interval bounds on their values,
+        gradients and curvatures. The operations work on whole arrays at once, and broadcast like numpy.
+
         Parameters
         ----------
             a (int) - the starting value of the interval
@@ -1117,73 +1586,112 @@ class TabularCompute:
                                 integer indicating the number of dimensions
             index (int) - defines which dimension this interval corresponds to
 
+        Attributes
+        ----------
+            iv (IntervalArray) - bounds on the values
+            iv_prime (IntervalArray) - bounds on the gradients, along an extra last axis
+            iv_lambda (IntervalArray) - bounds on the curvatures
         """
-        self.iv = iv.mpf([a,b])
-        self.iv_lambda = iv.mpf([0,0])
+        self.iv = IntervalArray(a,b)
+        self.iv_lambda = IntervalArray(0.)
         if dim:
             assert isinstance(dim, int)
             assert isinstance(index, int) and 0<=index<dim
-            self.iv_prime = np.array([iv.mpf([0,0]) for _ in range(dim)])
-            self.iv_prime[index] = iv.mpf([1,1])
+            prime = np.zeros(dim)
+            prime[index] = 1
+            self.iv_prime = IntervalArray(prime)
         else:
-            self.iv_prime = iv.mpf([0,0])
+            self.iv_prime = IntervalArray(np.zeros(1))
 
-    def copy(self):
-        new_copy = TabularCompute(0,0)
-        new_copy.iv = copy(self.iv)
-        new_copy.iv_prime = copy(self.iv_prime)
-        new_copy.iv_lambda = copy(self.iv_lambda)
-        return new_copy
+    #Makes numpy arrays use the reflected operators of this class instead of their own
+    __array_ufunc__ = None
+
+    @staticmethod
+    def from_bounds(iv, iv_prime, iv_lambda):
+        new = TabularCompute(0,0)
+        new.iv = iv
+        new.iv_prime = iv_prime
+        new.iv_lambda = iv_lambda
+        return new
+
+    @property
+    def shape(self):
+        return np.broadcast(self.iv.lo, self.iv.hi, self.iv_lambda.lo, self.iv_prime.lo[...,0]).shape
+
+    def __getitem__(self, index):
+        shape = self.shape
+        dim = self.iv_prime.shape[-1]
+        def get(interval, shape):
+            return IntervalArray(np.broadcast_to(interval.lo, shape)[index], np.broadcast_to(interval.hi, shape)[index])
+        #The gradients have an extra last axis, so the leading axes are indexed the same way
+        return TabularCompute.from_bounds(get(self.iv, shape), get(self.iv_prime, shape + (dim,)),\
+                                          get(self.iv_lambda, shape))
+
+    def __len__(self):
+        return self.shape[0]
 
     def __add__(self, other):
-        new = self.copy()
         if isinstance(other, TabularCompute):
-            new.iv += other.iv
-            new.iv_prime += other.iv_prime
-            new.iv_lambda += other.iv_lambda
-        else:
-            new.iv += other
-        return new
+            return TabularCompute.from_bounds(self.iv + other.iv, self.iv_prime + other.iv_prime,\
+                                              self.iv_lambda + other.iv_lambda)
+        return TabularCompute.from_bounds(self.iv + other, self.iv_prime, self.iv_lambda)
 
     def __mul__(self, other):
-        new = TabularCompute(0,0)
         if isinstance(other, TabularCompute):
-            new.iv = self.iv*other.iv
-            tmp1 = np.array([self.iv])*other.iv_prime
-            tmp2 = np.array([other.iv])*self.iv_prime
-            new.iv_prime = tmp1 + tmp2
-            new.iv_lambda = (self.iv*other.iv_lambda
-                            + other.iv*self.iv_lambda
-                            + lambda_t(self.iv_prime, other.iv_prime))
-        else:
-            new.iv = self.iv*other
-            new.iv_prime = self.iv_prime*other
-            new.iv_lambda = self.iv_lambda*other
-        return new
+            iv = self.iv*other.iv
+            iv_prime = expand(self.iv)*other.iv_prime + expand(other.iv)*self.iv_prime
+            iv_lambda = (self.iv*other.iv_lambda
+                         + other.iv*self.iv_lambda
+                         + lambda_t(self.iv_prime, other.iv_prime))
+            return TabularCompute.from_bounds(iv, iv_prime, iv_lambda)
+        other = np.asarray(other, dtype=float)
+        return TabularCompute.from_bounds(self.iv*other, self.iv_prime*other[...,np.newaxis],\
+                                          self.iv_lambda*other)
+    def __neg__(self):
+        return TabularCompute.from_bounds(-self.iv, -self.iv_prime, -self.iv_lambda)
     def __sub__(self, other):
-        return self + (-1*other)
+        return self + (-other)
     def __rmul__(self, other):
         return self*other
     def __radd__(self, other):
         return self + other
     def __rsub__(self, other):
-        return (-1*self) + other
+        return (-self) + other
     def __str__(self):
         return "{}\n{}\n{}".format(self.iv,self.iv_prime,self.iv_lambda)
     def __repr__(self):
         return str(self)
 
-chebval = np.polynomial.chebyshev.chebval
+def expand(interval):
+    """Adds a last axis to an IntervalArray so it broadcasts against gradients."""
+    return IntervalArray(interval.lo[...,np.newaxis], interval.hi[...,np.newaxis])
+
+def chebval(x, c):
+    """Evaluates the Chebyshev series along the first axis of c at x with the Clenshaw recursion,
+    like np.polynomial.chebyshev.chebval. x and c can be TabularCompute."""
+    if len(c) == 1:
+        c0 = c[0]
+        c1 = 0
+    elif len(c) == 2:
+        c0 = c[0]
+        c1 = c[1]
+    else:
+        x2 = 2*x
+        c0 = c[-2]
+        c1 = c[-1]
+        for i in range(3, len(c) + 1):
+            tmp = c0
+            c0 = c[-i] - c1
+            c1 = tmp + c1*x2
+    return c0 + c1*x
+
 def chebvalnd(intervals, poly):
-    n = poly.dim
+    """Evaluates poly at the TabularCompute intervals, one dimension at a time. Each step evaluates
+    the whole remaining coefficient tensor at once."""
     c = poly.coeff
-    c = chebval(intervals[0],c, tensor=True)
-    for i in range(1,n):
-        c = chebval(intervals[i],c, tensor=False)
-    if len(poly.coeff) == 1:
-        return c[0]
-    else:
-        return c
+    for i in range(poly.dim):
+        c = chebval(intervals[i], c)
+    return c
 
 def can_eliminate(poly, a, b, tol):
     assert len(a)==len(b)==poly.dim
@@ -1195,15 +1703,14 @@ def can_eliminate(poly, a, b, tol):
     if not (all(corners>0) or all(corners<0)):
         return False
 
-    min_corner = abs(min(corners))
+    min_corner = min(abs(corners))
 
     x = []
     n = len(a)
     for i,(ai,bi) in enumerate(zip(a,b)):
         x.append(TabularCompute(ai,bi,dim=n,index=i))
-    x = np.array(x)
 
-    max_curve = abs(chebvalnd(x, poly).iv_lambda)
+    max_curve = chebvalnd(x, poly).iv_lambda.magnitude()
     return min_corner > max_curve * n * h**2/8 + tol
 
 def curvature_check(coeff, tol):
@@ -1211,3 +1718,10 @@ def curvature_check(coeff, tol):
     a = np.array([-1.]*poly.dim)
     b = np.array([1.]*poly.dim)
     return not can_eliminate(poly, a, b, tol)
+
+#The relative cost of running each check once, used by CheckScheduler until it has timed the check
+check_costs = {constant_term_check: 1, bernstein_check: 20, quad_check: 40, cubic_check: 80, full_quad_check: 150,
+               full_cubic_check: 300, curvature_check: 300, quadratic_check: 5, linear_check: 15}
+
+#The batched versions of the interval checks, used by IntervalData.check_interval_batch
+batch_interval_checks = {constant_term_check: constant_term_check_batch, bernstein_check: bernstein_check_batch}
@@ -1,7 +1,6 @@
 from itertools import product
 
 import numpy as np
-from numpy.fft.fftpack import fftn
 from yroots.utils import get_var_list
 from yroots.polynomial import Polynomial, MultiCheb
 from scipy.linalg import qr
@@ -117,11 +116,10 @@ def proj_approximate_nd(f, transform):
     coeffs : numpy array
         The coefficient of the chebyshev interpolating polynomial.
     """
-    from yroots.subdivision import chebyshev_block_copy
+    from yroots.subdivision import chebyshev_dct
     dim = f.dim
     proj_dim = dim-1
     deg = f.degree
-    degs = np.array([deg]*proj_dim)
 
     # assert hasattr(f,"evaluate_grid")
     # dang, we don't get to use evaluate_grid here
@@ -132,26 +130,7 @@ def proj_approximate_nd(f, transform):
     flatten = lambda x: x.flatten()
     cheb_points = transform(np.column_stack(map(flatten, cheb_grids)))
     values_block = f(cheb_points).reshape(*([deg+1]*proj_dim))
-    values = chebyshev_block_copy(values_block)
-    coeffs = np.real(fftn(values/np.product(degs)))
-
-    for i in range(proj_dim):
-        #construct slices for the first and degs[i] entry in each dimension
-        idx0 = [slice(None)] * proj_dim
-        idx0[i] = 0
-
-        idx_deg = [slice(None)] * proj_dim
-        idx_deg[i] = degs[i]
-
-        #halve the coefficients in each slice
-        coeffs[tuple(idx0)] /= 2
-        coeffs[tuple(idx_deg)] /= 2
-
-    slices = []
-    for i in range(proj_dim):
-        slices.append(slice(0,degs[i]+1))
-
-    return coeffs[tuple(slices)]
+    return chebyshev_dct(values_block)
 
 def bounding_parallelepiped(linear):
     """
@@ -164,6 +164,39 @@ def multCheb(coeff, eigvals=True, verbose=False):
             print('Left Eigenvectors\n',vecs)
         return vecs[1,:]/vecs[0,:]
 
+def multChebStacked(coeffs):
+    """Finds the zeros of many 1-D chebyshev polynomials of the same degree using multiplication matrices.
+
+    All the colleague matrices are built in one array and their eigenvalues found with a single call.
+
+    Parameters
+    ----------
+    coeffs : numpy array
+        Row i is the coefficients of the i'th polynomial.
+
+    Returns
+    -------
+    zeros : numpy array
+        Row i is the zeros of the i'th polynomial.
+    """
+    num, n = coeffs.shape
+    n -= 1
+
+    # linear/constant cases
+    if n < 1:
+        return np.zeros((num,0), dtype=coeffs.dtype)
+    if n == 1:
+        return -coeffs[:,:1]/coeffs[:,1:]
+
+    matrices = np.zeros((num,n,n), dtype=coeffs.dtype)
+    matrices[:,1,0] = 1
+    rows = np.arange(n-1)
+    matrices[:,rows,rows+1] = 1/2
+    rows = np.arange(2,n)
+    matrices[:,rows,rows-1] = 1/2
+    matrices[:,:,-1] -= .5*coeffs[:,:-1]/coeffs[:,-1:]
+    return la.eigvals(matrices)
+
 def getXinv(coeff):
     """Helper function for division matrix"""
     n = len(coeff)-1
@@ -1,7 +1,7 @@
 # Do not delete this file. It tells python that groebner is a module you can import from.
 #public facing functions should be imported here so they can be used directly
 name = "yroots"
-from .subdivision import solve
+from .subdivision import solve, solve_async, solve_batch, subdivision_solve_1d_batch, ParameterizedFunction
 from .polyroots import solve as polysolve
 from .polynomial import MultiPower
 from .polynomial import MultiCheb
@@ -0,0 +1,90 @@
+import numpy as np
+from yroots.subdivision import chebyshev_block_copy, chebyshev_dct, full_cheb_approximate, TransformWorkspace
+import argparse
+import time
+import tracemalloc
+
+def fft_transform(values_block):
+    """The chebyshev transform done with an FFT of the mirrored values, for comparison."""
+    dim = values_block.ndim
+    deg = values_block.shape[0] - 1
+    values = chebyshev_block_copy(values_block)
+    coeffs = np.real(np.fft.fftn(values/deg**dim))
+    for i in range(dim):
+        idx0 = [slice(None)] * dim
+        idx0[i] = 0
+        idx_deg = [slice(None)] * dim
+        idx_deg[i] = deg
+        coeffs[tuple(idx0)] /= 2
+        coeffs[tuple(idx_deg)] /= 2
+    return coeffs[tuple([slice(0,deg+1)]*dim)]
+
+def time_transform(transform, values_block, trials):
+    """Gives the average time and the peak memory allocated by a transform."""
+    transform(values_block)
+    start = time.perf_counter()
+    for i in range(trials):
+        transform(values_block)
+    run_time = (time.perf_counter() - start)/trials
+
+    tracemalloc.start()
+    transform(values_block)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return run_time, peak
+
+def transform_benchmark(dims, trials):
+    """Compares the FFT and DCT chebyshev transforms in each dimension."""
+    degree_dimension = {1:1000, 2:64, 3:20, 4:10, 5:6}
+    print("{:>4} {:>5} {:>12} {:>12} {:>12} {:>12}".format("dim", "deg", "fft time", "dct time", "fft peak", "dct peak"))
+    for dim in dims:
+        deg = degree_dimension[dim]
+        values_block = np.random.rand(*([deg+1]*dim))
+        assert np.allclose(fft_transform(values_block), chebyshev_dct(values_block))
+        fft_time, fft_peak = time_transform(fft_transform, values_block, trials)
+        dct_time, dct_peak = time_transform(chebyshev_dct, values_block, trials)
+        print("{:>4} {:>5} {:>10.1f}us {:>10.1f}us {:>10.1f}kB {:>10.1f}kB".format(dim, deg, fft_time*1e6, dct_time*1e6,\
+                                                                               fft_peak/1e3, dct_peak/1e3))
+
+def approximate_intervals(f, intervals, deg, workspace):
+    for a,b in intervals:
+        full_cheb_approximate(f,a,b,deg,1.e-4,workspace=workspace)
+
+def workspace_benchmark(dims, trials):
+    """Compares the approximations with and without a TransformWorkspace in each dimension."""
+    degree_dimension = {1:16, 2:9, 3:5, 4:3, 5:2}
+    print("{:>4} {:>12} {:>12} {:>12} {:>12} {:>12}".format("dim", "time", "ws time", "peak", "ws peak", "allocations"))
+    for dim in dims:
+        deg = degree_dimension[dim]
+        f = lambda *x: np.cos(sum((i+1)*xi for i,xi in enumerate(x)))
+        lower = np.random.rand(trials, dim) - 1
+        intervals = [(a, a + np.random.rand(dim)) for a in lower]
+        workspace = TransformWorkspace()
+        times = []
+        peaks = []
+        for ws in [None, workspace]:
+            approximate_intervals(f, intervals[:1], deg, ws)
+            start = time.perf_counter()
+            approximate_intervals(f, intervals, deg, ws)
+            times.append((time.perf_counter() - start)/trials)
+            tracemalloc.start()
+            approximate_intervals(f, intervals, deg, ws)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        print("{:>4} {:>10.1f}us {:>10.1f}us {:>10.1f}kB {:>10.1f}kB {:>5} of {:>5}".format(dim, times[0]*1e6, times[1]*1e6,\
+                    peaks[0]/1e3, peaks[1]/1e3, workspace.allocations, workspace.uses))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark Options")
+    parser.add_argument('--dims', type=int, nargs='+', default=[1,2,3,4,5], choices=[1,2,3,4,5], help='Dimensions to benchmark')
+    parser.add_argument('-t', '--trials', type=int, default=100, help='Number of times to run each transform')
+    parser.add_argument('-b', '--benchmark', default='transform', choices=['transform','workspace'], help='What to benchmark')
+    args = parser.parse_args()
+
+    if args.trials < 1:
+        raise ValueError("trials must be a positive integer")
+
+    if args.benchmark == 'transform':
+        transform_benchmark(args.dims, args.trials)
+    else:
+        workspace_benchmark(args.dims, args.trials)
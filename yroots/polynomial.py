@@ -307,6 +307,8 @@ class MultiCheb(Polynomial):
         Multiply a MultiCheb monomial by a MultiCheb polynomial.
     __call__
         Evaluate a MultiCheb polynomial at a point.
+    restrict
+        The MultiCheb polynomial on a subinterval, rescaled to [-1,1].
 
     """
     def __init__(self, coeff, order='degrevlex', lead_term=None, clean_zeros = True):
@@ -579,6 +581,26 @@ class MultiCheb(Polynomial):
 
         return out
 
+    def restrict(self, a, b):
+        '''
+        Finds the polynomial on the interval [a,b], rescaled to [-1,1]. The coefficients
+        are computed exactly instead of interpolated.
+
+        Parameters
+        ----------
+        a : array-like
+            The lower bound on the interval.
+        b : array-like
+            The upper bound on the interval.
+
+        Returns
+        -------
+        MultiCheb
+            The polynomial q with q(x) = p(((b-a)*x+(b+a))/2), which is p on [a,b]
+            when x is in [-1,1].
+        '''
+        return MultiCheb(restrict_coeff(self.coeff, a, b, cheb_restriction_matrix), clean_zeros = False)
+
 ###############################################################################
 
 #### MULTI_POWER ##############################################################
@@ -632,6 +654,8 @@ class MultiPower(Polynomial):
         Multiplies a power monomial by a power polynomial.
     __call__
         Evaluate a power polynomial at a point.
+    restrict
+        The power polynomial on a subinterval, rescaled to [-1,1].
 
     """
     def __init__(self, coeff, order='degrevlex', lead_term=None, clean_zeros = True):
@@ -841,6 +865,25 @@ class MultiPower(Polynomial):
 
         return out
 
+    def restrict(self, a, b):
+        '''
+        Finds the polynomial on the interval [a,b], rescaled to [-1,1].
+
+        Parameters
+        ----------
+        a : array-like
+            The lower bound on the interval.
+        b : array-like
+            The upper bound on the interval.
+
+        Returns
+        -------
+        MultiPower
+            The polynomial q with q(x) = p(((b-a)*x+(b+a))/2), which is p on [a,b]
+            when x is in [-1,1].
+        '''
+        return MultiPower(restrict_coeff(self.coeff, a, b, power_restriction_matrix), clean_zeros = False)
+
 ###############################################################################
 
 #### CONVERT_POLY #############################################################
@@ -969,6 +1012,103 @@ def is_power(poly_list, return_string = False):
 
 ############################################################################
 
+#### RESTRICTION ###########################################################
+
+def cheb_restriction_matrix(n, a, b):
+    """
+    The matrix that restricts a one dimensional Chebyshev polynomial to [a,b].
+
+    Uses the recurrence T_{j+1}(s) = 2sT_j(s) - T_{j-1}(s) with s = ((b-a)x+(b+a))/2,
+    and the identities xT_0 = T_1 and xT_k = (T_{k-1} + T_{k+1})/2.
+
+    Parameters
+    ----------
+    n : int
+        The number of coefficients.
+    a : float
+        The lower bound on the interval.
+    b : float
+        The upper bound on the interval.
+
+    Returns
+    -------
+    M : ndarray
+        Column j is the coefficients of T_j(((b-a)x+(b+a))/2) in the Chebyshev basis.
+    """
+    alpha = (b-a)/2
+    beta = (b+a)/2
+    M = np.zeros([n,n])
+    M[0,0] = 1
+    if n > 1:
+        M[0,1] = beta
+        M[1,1] = alpha
+    for j in range(1,n-1):
+        col = M[:,j]
+        x_col = np.zeros(n)
+        x_col[1:] += col[:-1]/2
+        x_col[:-1] += col[1:]/2
+        x_col[1] += col[0]/2
+        M[:,j+1] = 2*(alpha*x_col + beta*col) - M[:,j-1]
+    return M
+
+def power_restriction_matrix(n, a, b):
+    """
+    The matrix that restricts a one dimensional power basis polynomial to [a,b].
+
+    Parameters
+    ----------
+    n : int
+        The number of coefficients.
+    a : float
+        The lower bound on the interval.
+    b : float
+        The upper bound on the interval.
+
+    Returns
+    -------
+    M : ndarray
+        Column j is the coefficients of (((b-a)x+(b+a))/2)^j in the power basis.
+    """
+    alpha = (b-a)/2
+    beta = (b+a)/2
+    M = np.zeros([n,n])
+    M[0,0] = 1
+    for j in range(1,n):
+        M[1:j+1,j] = alpha*M[:j,j-1]
+        M[:j,j] += beta*M[:j,j-1]
+    return M
+
+def restrict_coeff(coeff, a, b, restriction_matrix):
+    """
+    Restricts a coefficient tensor to the interval [a,b] one dimension at a time.
+
+    Parameters
+    ----------
+    coeff : ndarray
+        The coefficient tensor.
+    a : array-like
+        The lower bound on the interval.
+    b : array-like
+        The upper bound on the interval.
+    restriction_matrix : function
+        Either cheb_restriction_matrix or power_restriction_matrix.
+
+    Returns
+    -------
+    coeff : ndarray
+        The coefficient tensor of the restricted polynomial.
+    """
+    a = np.atleast_1d(a)
+    b = np.atleast_1d(b)
+    if len(a) != coeff.ndim or len(b) != coeff.ndim:
+        raise ValueError('Dimension of interval does not match dimension of polynomial!')
+    for i in range(coeff.ndim):
+        M = restriction_matrix(coeff.shape[i], a[i], b[i])
+        coeff = np.moveaxis(np.tensordot(M, coeff, axes=([1],[i])), 0, i)
+    return coeff
+
+############################################################################
+
 #### CHEBVALND, POLYVALND #############################################################
 
 def chebvalnd(x,c):
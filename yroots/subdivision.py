@@ -7,20 +7,33 @@ the approximation degree is small enough to be solved efficiently.
 """
 
 import numpy as np
-from numpy.fft.fftpack import fftn
-from yroots.OneDimension import divCheb,divPower,multCheb,multPower,solve
+try:
+    from scipy.fft import dctn
+except ImportError:
+    from scipy.fftpack import dctn
+from yroots.OneDimension import divCheb,divPower,multCheb,multChebStacked,multPower,solve
 from yroots.Division import division
 from yroots.utils import clean_zeros_from_matrix, slice_top, MacaulayError, get_var_list
-from yroots.polynomial import MultiCheb
-from yroots.IntervalChecks import IntervalData
+from yroots.polynomial import MultiCheb, MultiPower, Polynomial, poly2cheb
+from yroots.IntervalChecks import IntervalData, stack_coeffs
 from itertools import product
 from matplotlib import pyplot as plt
 from scipy.linalg import lu
+from scipy.sparse import coo_matrix
+from scipy.spatial import cKDTree
+import asyncio
+import inspect
 import itertools
+import multiprocessing
+import os
+import queue
 import time
 import warnings
 
-def solve(funcs, a, b, plot = False, plot_intervals = False, polish = False):
+def solve(funcs, a, b, plot = False, plot_intervals = False, polish = False, workers = None, batched = False,\
+          max_time = None, max_evaluations = None, max_depth = None, checkpoint = None, checkpoint_interval = 600.,\
+          checkpoint_frequency = None, resume_from = None, silent = False, progress_callback = None, progress_frequency = 100, jac = None,\
+          tune_checks = False, max_deg = None):
     '''
     Finds the real roots of the given list of functions on a given interval.
 
@@ -30,6 +43,8 @@ def solve(funcs, a, b, plot = False, plot_intervals = False, polish = False):
         Functions to find the common roots of.
         More efficient if functions have an 'evaluate_grid' method handle
         function evaluation at an grid of points.
+        Can also be a single vectorized function F(x1,...,xn) that returns an (n, number of points)
+        array of the values of all n functions, which is evaluated once per grid.
     a : numpy array
         The lower bound on the interval.
     b : numpy array
@@ -38,24 +53,84 @@ def solve(funcs, a, b, plot = False, plot_intervals = False, polish = False):
         If True plots the zeros-loci of the functions along with the computed roots
     plot_intervals : bool
         If True, plot is True, and the functions are 2 dimensional, plots what check/method solved
-        each part of the interval.
+        each part of the interval. Only then is every interval solved logged, otherwise just how many
+        intervals each check/method solved and their volume are counted.
     polish : bool
-        If True resolves for each root on a smaller interval with a finer approximation to give a
-        more accurate answer.
+        If True refines all the roots together with Newton's method to give a more accurate answer.
+        Roots where Newton's method doesn't converge are resolved on a smaller interval with a finer
+        approximation instead.
+    workers : int
+        If more than 1, the subintervals are solved in parallel by a pool of this many processes.
+        Only used for multidimensional systems. The functions don't need to be picklable on
+        platforms that can fork.
+    batched : bool
+        If True, the subdivision is done one level at a time and each function is evaluated on the
+        grids of every interval in the level with a single call. Faster for cheap vectorized functions.
+        Only used for multidimensional systems, and not together with workers.
+    max_time : float
+        The most seconds to spend subdividing. Once it is used up the intervals left are returned
+        as unresolved.
+    max_evaluations : int
+        The most points to evaluate the functions at. Once it is used up the intervals left are
+        returned as unresolved. Can be exceeded by the evaluations of the last interval solved.
+    max_depth : int
+        The most times an interval can be subdivided. Deeper intervals are returned as unresolved
+        and the rest of the intervals are still solved.
+        The budgets are only used for multidimensional systems, and not together with workers or batched.
+    checkpoint : string or path-like
+        If given, the state of the solve is saved to this file every checkpoint_interval seconds, and when
+        the solve is interrupted.
+    checkpoint_interval : float
+        The seconds between the saves to checkpoint.
+    checkpoint_frequency : int
+        If given, the state of the solve is also saved every this many intervals.
+    resume_from : string
+        A checkpoint file from an earlier solve of the same functions on the same interval. The solve
+        continues from it instead of starting over.
+        Checkpoints are only used for multidimensional systems, and not together with workers or batched.
+    silent : bool
+        If True nothing is printed, and the progress isn't tracked.
+    progress_callback : function
+        If given, it is called with a dictionary of the progress (see IntervalData.progress) instead of
+        printing it, and once more at the end with 'done' set to True.
+    progress_frequency : int
+        How many intervals are solved between each report of the progress.
+    jac : function
+        The Jacobian of the functions, used when polishing. jac(x1,...,xn) returns an (n, n, number of points)
+        array where entry [i,j] is the derivative of the i'th function with respect to the j'th variable.
+        If None the Jacobian is estimated with central differences.
+    tune_checks : bool
+        If True the interval checks are reordered and skipped during the solve based on how long they
+        take and how often they throw out an interval (see CheckScheduler). If False they are always
+        all run in the same order, so the solve goes through the same intervals every time.
+    max_deg : int
+        If given, an approximation that isn't good enough is first tried again at a higher degree in
+        the dimensions that need it, up to max_deg, and the interval is only subdivided after that.
+        This takes fewer function evaluations, but the roots are only as accurate as the approximation
+        tolerance, where subdividing usually makes them more accurate.
 
     If finding roots of a univariate function, `funcs` does not need to be a list,
-    and `a` and `b` can be floats instead of arrays.
+    and `a` and `b` can be floats instead of arrays. A single function with
+    multidimensional `a` and `b` is treated as vector valued.
 
     returns
     -------
     zeros : numpy array
         The common zeros of the polynomials. Each row is a root.
+    unresolved : numpy array
+        Only returned if a budget is given. unresolved[i,0] and unresolved[i,1] are the lower and
+        upper bounds of the i'th interval that wasn't solved before the budget ran out.
+    unresolved_volume : float
+        Only returned if a budget is given. The total volume of the unresolved intervals.
     '''
-    if not isinstance(funcs,list):
+    if isinstance(funcs,list):
+        dim = len(funcs)
+    elif np.ndim(a) > 0 and len(a) > 1:
+        #one vector valued function
+        dim = len(a)
+    else:
         funcs = [funcs]
         dim = 1
-    else:
-        dim = len(funcs)
 
     if dim == 1:
         #one dimensional case
@@ -74,26 +149,150 @@ def solve(funcs, a, b, plot = False, plot_intervals = False, polish = False):
         a = np.float64(a)
         b = np.float64(b)
 
-        interval_data = IntervalData(a,b)
+        interval_data = IntervalData(a,b,progress_callback,progress_frequency,silent,\
+                                     log_intervals=plot and plot_intervals,tune_checks=tune_checks)
 
-        #choose an appropriate max degree for the given dimension
-        deg_dim = {2:9, 3:5, 4:3}
-        if dim > 4:
-            deg = 2
-        else:
-            deg = deg_dim[dim]
+        deg = default_degree(dim)
+        has_budget = max_time is not None or max_evaluations is not None or max_depth is not None
+        serial_only = has_budget or checkpoint is not None or resume_from is not None
+        if serial_only and ((workers is not None and workers > 1) or batched):
+            raise ValueError("The budgets and checkpoints can't be used together with workers or batched.")
 
         #Output the interval percentages
-        zeros = subdivision_solve_nd(funcs,a,b,deg,interval_data,polish=polish)
+        if serial_only:
+            zeros, unresolved = subdivision_solve_nd(funcs,a,b,deg,interval_data,max_deg=max_deg,\
+                                                     max_time=max_time,max_evaluations=max_evaluations,\
+                                                     max_depth=max_depth,return_unresolved=True,\
+                                                     checkpoint=checkpoint,checkpoint_interval=checkpoint_interval,\
+                                                     checkpoint_frequency=checkpoint_frequency,resume_from=resume_from)
+        elif workers is not None and workers > 1:
+            zeros = parallel_subdivision_solve_nd(funcs,a,b,deg,interval_data,workers=workers,max_deg=max_deg)
+        elif batched:
+            zeros = batched_subdivision_solve_nd(funcs,a,b,deg,interval_data,max_deg=max_deg)
+        else:
+            zeros = subdivision_solve_nd(funcs,a,b,deg,interval_data,max_deg=max_deg)
+        if polish:
+            zeros = polish_roots(zeros,funcs,a,b,jac=jac)
 
-        print("\rPercent Finished: 100%       ")
-        interval_data.print_results()
+        interval_data.finish()
         #Plot what happened
         if plot and dim == 2:
 #             interval_data.print_results()
+            if not isinstance(funcs, list):
+                funcs = [lambda x,y,i=i,F=funcs: F(x,y)[i] for i in range(dim)]
             interval_data.plot_results(funcs, zeros, plot_intervals)
+        if has_budget:
+            return zeros, unresolved, np.sum(np.prod(unresolved[:,1] - unresolved[:,0], axis=1))
         return zeros
 
+def solve_batch(systems, a, b, polish = False, silent = False, tune_checks = False, max_deg = None):
+    '''
+    Finds the real roots of many systems of functions on the same interval.
+
+    Gives the same roots as calling solve with batched=True on each system, but all the systems are
+    subdivided together. Each system keeps its own intervals, while the approximations are shared where
+    they can be: a function that appears in more than one system is evaluated on the intervals of all
+    of them with one call. So are systems that differ in a parameter, when the functions that depend on
+    it are ParameterizedFunctions of the same family.
+
+    Parameters
+    ----------
+    systems : list
+        The systems to solve. Each is a list of vectorized, callable functions like solve takes, or
+        a single vector valued function. They must all have the same dimension. Any of them can be
+        ParameterizedFunctions.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    polish : bool
+        If True polishes the roots of each system like solve does.
+    silent : bool
+        If True the progress of the systems isn't printed or tracked.
+    tune_checks : bool
+        If True the interval checks are reordered and skipped based on how they do, like in solve.
+    max_deg : int
+        The largest degree an approximation is refined to before subdividing, like in solve.
+
+    returns
+    -------
+    zeros : list
+        The common zeros of each system, as a numpy array where each row is a root.
+    '''
+    a = np.float64(a)
+    b = np.float64(b)
+    dim = len(a)
+    for funcs in systems:
+        if isinstance(funcs, list) and len(funcs) != dim:
+            raise ValueError("Each system must have one function for each dimension!")
+
+    interval_datas = [IntervalData(a,b,silent=silent,log_intervals=False,tune_checks=tune_checks) for funcs in systems]
+    deg = default_degree(dim)
+    zeros = batch_subdivision_solve_nd(systems,a,b,deg,interval_datas,max_deg=max_deg)
+    if polish:
+        zeros = [polish_roots(system_zeros,funcs,a,b) for system_zeros, funcs in zip(zeros, systems)]
+    return zeros
+
+async def solve_async(funcs, a, b, max_concurrency = 8, silent = False, progress_callback = None, progress_frequency = 100,\
+                      tune_checks = False, max_deg = None):
+    '''
+    Finds the real roots of the given list of functions on a given interval, where the functions
+    can be coroutine functions.
+
+    Many intervals are solved at once, so while the evaluations of some are being waited on the
+    others keep going. Cancelling the solve cancels all of its pending evaluations.
+
+    Parameters
+    ----------
+    funcs : list of vectorized, callable functions
+        Functions to find the common roots of, like solve takes. Each can be a normal function or a
+        coroutine function. Can also be a single vector valued function.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    max_concurrency : int
+        The most function evaluations that can be waited on at once.
+    silent : bool
+        If True nothing is printed, and the progress isn't tracked.
+    progress_callback : function
+        If given, it is called with the progress instead of printing it, like in solve.
+    progress_frequency : int
+        How many intervals are solved between each report of the progress.
+    tune_checks : bool
+        If True the interval checks are reordered and skipped based on how they do, like in solve.
+    max_deg : int
+        The largest degree an approximation is refined to before subdividing, like in solve.
+
+    returns
+    -------
+    zeros : numpy array
+        The common zeros of the functions. Each row is a root.
+    '''
+    if np.ndim(a) == 0 or len(a) < 2:
+        raise ValueError("solve_async only solves multidimensional systems, use solve in one dimension.")
+    a = np.float64(a)
+    b = np.float64(b)
+    dim = len(a)
+    if isinstance(funcs, list) and len(funcs) != dim:
+        raise ValueError("There must be one function for each dimension!")
+
+    interval_data = IntervalData(a,b,progress_callback,progress_frequency,silent,log_intervals=False,\
+                                 tune_checks=tune_checks)
+    deg = default_degree(dim)
+    zeros = await async_subdivision_solve_nd(funcs,a,b,deg,interval_data,max_deg=max_deg,\
+                                             max_concurrency=max_concurrency)
+    interval_data.finish()
+    return zeros
+
+def default_degree(dim):
+    """Chooses an appropriate max degree for the given dimension."""
+    deg_dim = {2:9, 3:5, 4:3}
+    if dim > 4:
+        return 2
+    else:
+        return deg_dim[dim]
+
 def transform(x,a,b):
     """Transforms points from the interval [-1,1] to the interval [a,b].
 
@@ -130,19 +329,60 @@ def chebyshev_block_copy(values_block):
       chebyshev interpolation values
     """
     dim = values_block.ndim
-    deg = values_block.shape[0] - 1
-    values_cheb = np.empty(tuple([2*deg])*dim, dtype=values_block.dtype)
+    degs = [i - 1 for i in values_block.shape]
+    values_cheb = np.empty(tuple([2*deg for deg in degs]), dtype=values_block.dtype)
 
     for block in product([False,True],repeat=dim):
-        cheb_idx = [slice(0,deg+1)]*dim
+        cheb_idx = [slice(0,deg+1) for deg in degs]
         block_idx = [slice(None)]*dim
         for i,flip_dim in enumerate(block):
             if flip_dim:
-                cheb_idx[i] = slice(deg+1,None)
-                block_idx[i] = slice(deg-1,0,-1)
+                cheb_idx[i] = slice(degs[i]+1,None)
+                block_idx[i] = slice(degs[i]-1,0,-1)
         values_cheb[tuple(cheb_idx)] = values_block[tuple(block_idx)]
     return values_cheb
 
+def chebyshev_dct(values_block, multiplier=1., axes=None):
+    """Finds the coefficients of the chebyshev interpolant of values on a grid of Chebyshev extrema.
+
+    Uses a type I DCT on the values directly. This gives the same coefficients as the FFT of
+    chebyshev_block_copy(values_block), without building the mirrored copy, which is 2^dim times
+    as big.
+
+    Parameters
+    ----------
+    values_block : numpy array
+      block of values from function evaluation
+    multiplier : float
+        What to scale the coefficients by.
+    axes : list
+        The axes to transform. The others index separate interpolants. Defaults to all of them.
+
+    Returns
+    -------
+    coeffs : numpy array
+        The coefficient of the chebyshev interpolating polynomial.
+    """
+    dim = values_block.ndim
+    if axes is None:
+        axes = list(range(dim))
+    degs = [values_block.shape[i] - 1 for i in axes]
+    coeffs = dctn(values_block, type=1, axes=axes)
+    coeffs *= multiplier/np.prod(degs)
+
+    for i, deg in zip(axes, degs):
+        #construct slices for the first and degs[i] entry in each dimension
+        idx0 = [slice(None)] * dim
+        idx0[i] = 0
+
+        idx_deg = [slice(None)] * dim
+        idx_deg[i] = deg
+
+        #halve the coefficients in each slice
+        coeffs[tuple(idx0)] /= 2
+        coeffs[tuple(idx_deg)] /= 2
+    return coeffs
+
 def interval_approximate_1d(f,a,b,deg):
     """Finds the chebyshev approximation of a one-dimensional function on an interval.
 
@@ -162,8 +402,8 @@ def interval_approximate_1d(f,a,b,deg):
     coeffs : numpy array
         The coefficient of the chebyshev interpolating polynomial.
     """
-    extrema = transform(np.cos((np.pi*np.arange(2*deg))/deg),a,b)
-    values = f(extrema)
+    extrema = transform(np.cos((np.pi*np.arange(deg+1))/deg),a,b)
+    values = np.asarray(f(extrema), dtype=float)
 
 #     multiplier = None
 #     if multiplier is None:
@@ -174,10 +414,7 @@ def interval_approximate_1d(f,a,b,deg):
     multiplier = 1.#max(1, multiplier)
     values *= multiplier
 
-    coeffs = np.real(np.fft.fft(values/deg))
-    coeffs[0]/=2
-    coeffs[deg]/=2
-    return coeffs[:deg+1]
+    return chebyshev_dct(values)
 
 class Memoize:
     """
@@ -192,14 +429,70 @@ class Memoize:
             self.memo[args] = self.f(*args)
         return self.memo[args]
 
+class ParameterizedFunction:
+    """
+    One member of a family of functions f(x1,...,xn,p) that only differ in the parameter p.
+
+    It is called like any other function, but solve_batch evaluates the members of the same family
+    in different systems together, with one call to f on the grids of all of their intervals. f is
+    then called with a p that has a leading axis with the parameter of each point, so it must
+    broadcast like f(x,y,p) = np.sin(3*x) - y + p does. When a member is called on its own, p is
+    the parameter repeated for each point the same way.
+
+    Attributes
+    ----------
+    func : function
+        The family of functions f(x1,...,xn,p).
+    param : float or numpy array
+        The parameter of this member.
+    """
+    def __init__(self, func, param):
+        self.func = func
+        self.param = param
+
+    def __call__(self, *points):
+        shape = np.shape(points[0]) + np.shape(self.param)
+        return self.func(*points, np.broadcast_to(self.param, shape))
+
+class TransformWorkspace:
+    """Buffers for the temporary arrays of the chebyshev approximations in a solve.
+
+    Each buffer is keyed by what it's used for and its shape, which comes from the degree and the
+    dimension, so the same few buffers get reused for every interval instead of allocating new
+    temporaries each time. The coefficients returned by the approximations are never buffers,
+    since trim_coeffs modifies them later.
+
+    Attributes
+    ----------
+    buffers : dict
+        The buffers, keyed by (name, shape).
+    allocations : int
+        How many buffers have been allocated.
+    uses : int
+        How many times a buffer was asked for. Without the workspace each would be an allocation.
+    """
+    def __init__(self):
+        self.buffers = {}
+        self.allocations = 0
+        self.uses = 0
+
+    def get(self, name, shape):
+        """Gets the buffer called name with the given shape, allocating it the first time."""
+        key = (name, shape)
+        self.uses += 1
+        if key not in self.buffers:
+            self.buffers[key] = np.empty(shape)
+            self.allocations += 1
+        return self.buffers[key]
+
 @Memoize
 def get_cheb_grid(deg, dim, has_eval_grid):
     """Helper function for interval_approximate_nd.
 
     Parameters
     ----------
-    deg : int
-        The interpolation degree.
+    deg : int or tuple
+        The interpolation degree, or a tuple of the degree in each dimension.
     dim : int
         The interpolation dimension.
 
@@ -208,15 +501,123 @@ def get_cheb_grid(deg, dim, has_eval_grid):
     get_cheb_grid : numpy array
         The chebyshev grid used to evaluate the functions in interval_approximate_nd
     """
+    if isinstance(deg, tuple):
+        cheb_values = [np.cos(np.arange(i+1)*np.pi/i) for i in deg]
+    else:
+        cheb_values = [np.cos(np.arange(deg+1)*np.pi/deg)]*dim
     if has_eval_grid:
-        cheb_values = np.cos(np.arange(deg+1)*np.pi/deg)
-        return np.column_stack([cheb_values]*dim)
+        #Shorter columns are padded, the extra values are sliced off by evaluate_cheb_grid
+        size = max(len(values) for values in cheb_values)
+        return np.column_stack([np.pad(values, (0,size-len(values)), mode='edge') for values in cheb_values])
     else:
-        cheb_values = np.cos(np.arange(deg+1)*np.pi/deg)
-        cheb_grids = np.meshgrid(*([cheb_values]*dim), indexing='ij')
+        cheb_grids = np.meshgrid(*cheb_values, indexing='ij')
         flatten = lambda x: x.flatten()
         return np.column_stack(map(flatten, cheb_grids))
 
+def evaluate_cheb_grid(f,a,b,deg,workspace=None):
+    """Evaluates a function on the grid of Chebyshev extrema on an interval.
+
+    Parameters
+    ----------
+    f : function from R^n -> R
+        The function to evaluate.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int or numpy array
+        The degree of the interpolation the grid is for, or the degree in each dimension.
+    workspace : TransformWorkspace
+        If given, the grid points are put in one of its buffers. Then f must not keep the arrays
+        of points it is called with, and the values are only good until the next evaluation.
+
+    Returns
+    -------
+    values_block : numpy array
+        The values of the function on the grid. Has shape (deg+1,)*dim and the point
+        at index i is transform(cos(pi*i/deg),a,b). If f is vector valued and returns an
+        (n, number of points) array, the shape is (n,)+(deg+1,)*dim.
+    """
+    if len(a)!=len(b):
+        raise ValueError("Interval dimensions must be the same!")
+
+    dim = len(a)
+    deg, shape = grid_degree(deg, dim)
+
+    has_eval_grid = hasattr(f,"evaluate_grid")
+    grid = get_cheb_grid(deg, dim, has_eval_grid)
+    if workspace is None:
+        cheb_points = transform(grid, a, b)
+    else:
+        #Same as transform, without the temporary arrays
+        cheb_points = workspace.get('points', grid.shape)
+        np.multiply(grid, b-a, out=cheb_points)
+        cheb_points += b+a
+        cheb_points /= 2
+
+    if has_eval_grid:
+        return f.evaluate_grid(cheb_points)[tuple([slice(0,i) for i in shape])]
+    else:
+        cheb_points = [cheb_points[:,i] for i in range(dim)]
+        values = np.asarray(f(*cheb_points))
+        #A vector valued function gives an extra leading axis, one entry per function
+        return values.reshape(values.shape[:-1] + shape)
+
+def grid_degree(deg, dim):
+    """Puts a degree in the form get_cheb_grid takes.
+
+    Parameters
+    ----------
+    deg : int or numpy array
+        The interpolation degree, or the degree in each dimension.
+    dim : int
+        The interpolation dimension.
+
+    Returns
+    -------
+    deg : int or tuple
+        An int if the degree is the same in every dimension, otherwise a tuple of the degrees.
+    shape : tuple
+        The shape of the grid.
+    """
+    degs = tuple(int(i) for i in np.broadcast_to(deg, dim))
+    shape = tuple(i+1 for i in degs)
+    if all(i == degs[0] for i in degs):
+        return degs[0], shape
+    return degs, shape
+
+def values_to_coeffs(values_block,multiplier=None,workspace=None):
+    """Finds the coefficients of the chebyshev interpolant of values on a grid of Chebyshev extrema.
+
+    Parameters
+    ----------
+    values_block : numpy array
+        The values of a function on the grid from evaluate_cheb_grid.
+    multiplier : float
+        What to scale the values by. If None it is chosen so the values have a max of about 1.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
+
+    Returns
+    -------
+    coeffs : numpy array
+        The coefficient of the chebyshev interpolating polynomial.
+    multiplier : float
+        What the values were scaled by.
+    """
+    if multiplier is None:
+        if workspace is None:
+            max_val = np.max(np.abs(values_block))
+        else:
+            max_val = np.max(np.abs(values_block, out=workspace.get('abs', values_block.shape)))
+        if max_val < 1.e-5:
+            multiplier = 1.e5
+        else:
+            multiplier = 1./max_val
+    multiplier = max(1, multiplier)
+
+    return chebyshev_dct(values_block, multiplier), multiplier
+
 def interval_approximate_nd(f,a,b,deg,return_bools=False,multiplier=None):
     """Finds the chebyshev approximation of an n-dimensional function on an interval.
 
@@ -240,200 +641,1586 @@ def interval_approximate_nd(f,a,b,deg,return_bools=False,multiplier=None):
     change_sign: numpy array (Optional)
         list of which subintervals change sign
     """
-    if len(a)!=len(b):
-        raise ValueError("Interval dimensions must be the same!")
-
     dim = len(a)
-
-    if hasattr(f,"evaluate_grid"):
-        xyz = transform(get_cheb_grid(deg, dim, True), a, b)
-        values_block = f.evaluate_grid(xyz)
-    else:
-        cheb_points = transform(get_cheb_grid(deg, dim, False), a, b)
-        cheb_points = [cheb_points[:,i] for i in range(dim)]
-        values_block = f(*cheb_points).reshape(*([deg+1]*dim))
+    values_block = evaluate_cheb_grid(f,a,b,deg)
+    coeffs, multiplier = values_to_coeffs(values_block,multiplier)
 
     #figure out on which subintervals the function changes sign
     if return_bools:
-        change_sign = np.zeros(2**dim, dtype=bool)
         #Checks are fast enough that this isn't worth it
+        change_sign = np.zeros(2**dim, dtype=bool)
+        return coeffs, change_sign, multiplier
+    else:
+        return coeffs, multiplier
+
+def get_subintervals(a,b,dimensions,interval_data,polys,change_sign,approx_tol,check_subintervals=False):
+    """Gets the subintervals to divide a search interval into.
+
+    Parameters
+    ----------
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    dimensions : numpy array
+        The dimensions we want to cut in half.
+    interval_data : IntervalData
+        A class to run the subinterval checks and keep track of the solve progress
+    polys : list
+        A list of MultiCheb polynomials representing the function approximations on the
+        interval to subdivide. Used in the subinterval checks.
+    change_sign : list
+        A list of bools of whether we know the functions can change sign on the subintervals.
+        Used in the subinterval checks.
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation. Because trim_coeff
+        introduces this much error again, 2*approx_tol is passed into the subintervals checks.
+    check_subintervals : bool
+        If True runs the subinterval checks to through out intervals where the functions are never 0.
+
+    Returns
+    -------
+    subintervals : list
+        Each element of the list is a tuple containing an a and b, the lower and upper bounds of the interval.
+    """
+    RAND = 0.5139303900908738
+    subintervals = []
+    diffs1 = ((b-a)*RAND)[dimensions]
+    diffs2 = ((b-a)-(b-a)*RAND)[dimensions]
 
-#         change_sign = np.ones(2**dim, dtype=bool)
+    for subset in product([False,True], repeat=len(dimensions)):
+        subset = np.array(subset)
+        aTemp = a.copy()
+        bTemp = b.copy()
+        aTemp[dimensions] += (~subset)*diffs1
+        bTemp[dimensions] -= subset*diffs2
+        subintervals.append((aTemp,bTemp))
 
-#         split = 0.027860780181747646 #from RAND below
-#         split_point = len(np.where(cheb_values>split)[0])
+    if check_subintervals:
+        scaled_subintervals = get_subintervals(-np.ones_like(a),np.ones_like(a),dimensions,None,None,None,approx_tol)
+        #Uses 2*approx_tol because this much error can be added in the approximation and the trim_coeff
+        return interval_data.check_subintervals(subintervals, scaled_subintervals, polys, change_sign, 2*approx_tol)
+    else:
+        return subintervals
 
-#         for k, subinterval in enumerate(product([False,True], repeat=dim)):
-#             slicer = []*dim
-#             for i in range(dim):
-#                 if subinterval[i]:
-#                     slicer.append(slice(split_point,None))
-#                 else:
-#                     slicer.append(slice(None,split_point))
+def full_cheb_approximate(f,a,b,deg,tol,good_deg=None,interval_data=None,max_deg=None,workspace=None):
+    """Gives the full chebyshev approximation and checks if it's good enough.
 
-#             if np.all(values_block[tuple(slicer)]>0) or np.all(values_block[tuple(slicer)]<0):
-#                 change_sign[k] = False
+    The approximation of degree deg is compared to the one of degree 2*deg. The grid for degree deg is
+    every other point of the grid for degree 2*deg, so f is only evaluated once, on the finer grid.
+    If the approximation isn't good enough, the degree is doubled in only the dimensions where it
+    wasn't, as long as it stays below max_deg.
 
-    values = chebyshev_block_copy(values_block)
+    Parameters
+    ----------
+    f : function
+        The function we approximate.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int or numpy array
+        The degree to approximate with, or the degree in each dimension.
+    tol : float
+        How small the high degree terms must be to consider the approximation accurate.
+    good_deg : numpy array
+        Interpoation degree in each dimension that is guaranteed to give an approximation valid to
+        within approx_tol.
+    interval_data : IntervalData
+        If given, the number of function evaluations is added to its count.
+    max_deg : int
+        The largest degree the approximation is refined to before giving up and subdividing.
+        If None the degree is never refined.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
 
-    if multiplier is None:
-        if np.max(np.abs(values)) < 1.e-5:
-            multiplier = 1.e5
-        else:
-            multiplier = 1./np.max(np.abs(values))
-    multiplier = max(1, multiplier)
-    values *= multiplier
+    Returns
+    -------
+    coeff : numpy array
+        The coefficient array of the interpolation, padded to be the same size in every dimension.
+        If the approximation is good enough this is the degree 2*deg approximation. If it can't get
+        a good approximation and needs to subdivide, returns None.
+    bools: numpy array
+        (2^n, 1) array of bools corresponding to which subintervals the function changes sign in
+    """
+    dim = len(a)
+    #We know what degree we want
+    if good_deg is not None:
+        values_block = evaluate_cheb_grid(f,a,b,good_deg,workspace)
+        if interval_data is not None:
+            interval_data.track_evaluations(values_block.size)
+        return good_deg_approximate(values_block,workspace)
+
+    degs = np.array(np.broadcast_to(deg, dim))
+    while True:
+        #Try degree degs and see if it's good enough
+        values_block = evaluate_cheb_grid(f,a,b,2*degs,workspace)
+        if interval_data is not None:
+            interval_data.track_evaluations(values_block.size)
+        coeff, bools = cheb_approximate_values(values_block,degs,tol,workspace)
+        degs = refined_degrees([(coeff, bools)],degs,max_deg)
+        if degs is None:
+            return coeff, bools
+
+def refined_degrees(approximations,degs,max_deg):
+    """Gives the degrees to approximate with next when approximations from the same grid aren't good
+    enough. Only the dimensions that aren't resolved are doubled, as long as they stay below max_deg.
 
-    coeffs = np.real(fftn(values/deg**dim))
+    Parameters
+    ----------
+    approximations : list
+        The results of cheb_approximate_values on the grid for degree 2*degs.
+    degs : numpy array
+        The degree in each dimension that was tried.
+    max_deg : int
+        The largest degree the approximations are refined to. If None they are never refined.
 
-    for i in range(dim):
-        #construct slices for the first and degs[i] entry in each dimension
-        idx0 = [slice(None)] * dim
-        idx0[i] = 0
+    Returns
+    -------
+    degs : numpy array
+        The degree in each dimension to try next, or None if all the approximations are good enough
+        or one of them can't be refined.
+    """
+    refine = np.zeros(len(degs), dtype=bool)
+    for coeff, bools in approximations:
+        if coeff is None:
+            if max_deg is None or np.any(4*degs[bools] > max_deg):
+                return None
+            refine[bools] = True
+    if not np.any(refine):
+        return None
+    degs = degs.copy()
+    degs[refine] *= 2
+    return degs
+
+def cheb_approximate_values(values_block,deg,tol,workspace=None):
+    """Runs the approximation test of full_cheb_approximate on values that were already computed.
 
-        idx_deg = [slice(None)] * dim
-        idx_deg[i] = deg
+    Parameters
+    ----------
+    values_block : numpy array
+        The values of the function on the grid for degree 2*deg from evaluate_cheb_grid.
+    deg : int or numpy array
+        The degree to approximate with, or the degree in each dimension.
+    tol : float
+        How small the high degree terms must be to consider the approximation accurate.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
 
-        #halve the coefficients in each slice
-        coeffs[tuple(idx0)] /= 2
-        coeffs[tuple(idx_deg)] /= 2
+    Returns
+    -------
+    coeff : numpy array
+        The degree 2*deg coefficient array of the interpolation if it is good enough, padded to be
+        the same size in every dimension. Otherwise None.
+    bools: numpy array
+        (2^n, 1) array of bools corresponding to which subintervals the function changes sign in,
+        or the dimensions to subdivide in if coeff is None.
+    """
+    dim = values_block.ndim
+    coeff, multiplier = values_to_coeffs(values_block[tuple([slice(None,None,2)]*dim)],None,workspace)
+    coeff2, multiplier = values_to_coeffs(values_block,multiplier)
+    bools = np.zeros(2**dim, dtype=bool)
 
-    slices = [slice(0,deg+1)]*dim
-    if return_bools:
-        return coeffs[tuple(slices)], change_sign, multiplier
+    if workspace is None:
+        coeff_diff = coeff2.copy()
     else:
-        return coeffs[tuple(slices)], multiplier
+        coeff_diff = workspace.get('diff', coeff2.shape)
+        coeff_diff[...] = coeff2
+    coeff_diff[slice_top(coeff)] -= coeff
+    np.abs(coeff_diff, out=coeff_diff)
+    if np.sum(coeff_diff) > tol:
+        #Find the directions to subdivide
+        div_dimensions = []
+        slices = [slice(0,None,None)]*dim
+        for d in range(dim):
+            slices[d] = slice(coeff.shape[d],None,None)
+            if np.sum(coeff_diff[tuple(slices)]) > tol/dim:
+                div_dimensions.append(d)
+            slices[d] = slice(0,None,None)
+        if len(div_dimensions) == 0:
+            div_dimensions.append(0)
+        return None, np.array(div_dimensions)
+    else:
+        return pad_coeff(coeff2), bools
+
+def good_deg_approximate(values_block,workspace=None):
+    """Gives the approximation from values on the grid of a degree known to be good enough.
+
+    Parameters
+    ----------
+    values_block : numpy array
+        The values of the function on the grid from evaluate_cheb_grid.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
+
+    Returns
+    -------
+    coeff : numpy array
+        The coefficient array of the interpolation, padded to be the same size in every dimension.
+    bools: numpy array
+        (2^n, 1) array of bools corresponding to which subintervals the function changes sign in
+    """
+    coeff, multiplier = values_to_coeffs(values_block,None,workspace)
+    return pad_coeff(coeff), np.zeros(2**values_block.ndim, dtype=bool)
+
+def pad_coeff(coeff):
+    """Pads a coefficient array with zeros so it is the same size in every dimension, which is what
+    trim_coeffs and the interval checks expect.
+    """
+    deg = max(coeff.shape)
+    if any(i < deg for i in coeff.shape):
+        coeff = np.pad(coeff, [(0,deg-i) for i in coeff.shape], mode='constant')
+    return coeff
+
+def system_cheb_approximate(funcs,a,b,deg,tol,good_degs=None,interval_data=None,max_deg=None,workspace=None):
+    """Gives the full chebyshev approximations of a vector valued function.
+
+    The function is evaluated once per grid and the values feed the approximations of every component.
+    The grid is refined like in full_cheb_approximate until every component is good enough, and only
+    the components that weren't are approximated again.
+
+    Parameters
+    ----------
+    funcs : function
+        A function from R^n -> R^n. Called like the functions in a list of functions, but returns
+        an (n, number of points) array.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int
+        The degree to approximate with.
+    tol : float
+        How small the high degree terms must be to consider the approximation accurate.
+    good_degs : numpy array
+        Interpoation degrees of each component in each dimension that are guaranteed to give an
+        approximation valid to within approx_tol.
+    interval_data : IntervalData
+        If given, the number of function evaluations is added to its count.
+    max_deg : int
+        The largest degree the approximations are refined to before giving up and subdividing.
+        If None the degree is never refined.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
+
+    Returns
+    -------
+    approximations : list
+        The result of full_cheb_approximate for each component.
+    """
+    dim = len(a)
+    if good_degs is None:
+        degs = np.array(np.broadcast_to(deg, dim))
+        approximations = None
+        while degs is not None:
+            values_block = evaluate_cheb_grid(funcs,a,b,2*degs,workspace)
+            if interval_data is not None:
+                interval_data.track_evaluations(values_block[0].size)
+            if approximations is None:
+                approximations = [None]*len(values_block)
+            for i, values in enumerate(values_block):
+                if approximations[i] is None or approximations[i][0] is None:
+                    approximations[i] = cheb_approximate_values(values,degs,tol,workspace)
+            degs = refined_degrees(approximations,degs,max_deg)
+        return approximations
+
+    #Evaluate once for each different degree
+    good_degs = np.array(good_degs)
+    approximations = [None]*dim
+    for good_deg in np.unique(good_degs, axis=0):
+        values_block = evaluate_cheb_grid(funcs,a,b,good_deg,workspace)
+        if interval_data is not None:
+            interval_data.track_evaluations(values_block[0].size)
+        for i in np.where(np.all(good_degs == good_deg, axis=1))[0]:
+            approximations[i] = good_deg_approximate(values_block[i],workspace)
+    return approximations
+
+def cheb_approximate(func,a,b,deg,tol,good_deg=None,interval_data=None,max_deg=None,workspace=None):
+    """Gives the chebyshev approximation of one function on an interval, exactly if it is a
+    polynomial, otherwise with full_cheb_approximate.
+
+    Parameters are the same as full_cheb_approximate.
+    """
+    if isinstance(func, MultiCheb):
+        #Polynomials can be restricted to the interval exactly
+        return restrict_approximate(func,a,b)
+    else:
+        return full_cheb_approximate(func,a,b,deg,tol,good_deg,interval_data,max_deg,workspace)
+
+def restrict_approximate(poly,a,b):
+    """Gives the exact chebyshev coefficients of a MultiCheb polynomial on an interval.
+
+    Used instead of full_cheb_approximate for polynomials, so they never have to be sampled.
+
+    Parameters
+    ----------
+    poly : MultiCheb
+        The polynomial.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+
+    Returns
+    -------
+    coeff : numpy array
+        The coefficient array of the polynomial on the interval, padded to be the same size in every
+        dimension and scaled like the approximations from interval_approximate_nd.
+    bools: numpy array
+        (2^n, 1) array of bools corresponding to which subintervals the function changes sign in
+    """
+    dim = len(a)
+    coeff = pad_coeff(poly.restrict(a,b).coeff)
+
+    #The sum of the absolute values of the coefficients bounds the max of the polynomial
+    max_val = np.sum(np.abs(coeff))
+    if max_val < 1.e-5:
+        multiplier = 1.e5
+    else:
+        multiplier = 1./max_val
+    multiplier = max(1, multiplier)
+    return coeff*multiplier, np.zeros(2**dim, dtype=bool)
+
+def good_zeros_nd(zeros, imag_tol = 1.e-5, real_tol = 1.e-5):
+    """Get the real zeros in the -1 to 1 interval in each dimension.
+
+    Parameters
+    ----------
+    zeros : numpy array
+        The zeros to be checked.
+    imag_tol : float
+        How large the imaginary part can be to still have it be considered real.
+    real_tol : float
+        How far the real part can be outside the interval [-1,1] and still be
+        considered valid.
+
+    Returns
+    -------
+    good_zeros : numpy array
+        The real zeros in [-1,1] of the input zeros.
+    """
+    good_zeros = zeros[np.all(np.abs(zeros.imag) <= imag_tol,axis = 1)]
+    good_zeros = good_zeros[np.all(np.abs(good_zeros) <= 1 + real_tol,axis = 1)]
+    return good_zeros.real
+
+class IntervalQueue:
+    """A stack of the intervals that still need to be solved.
+
+    The bounds of the pending intervals are stored in preallocated arrays that grow geometrically
+    as needed, so the subdivision never has to recurse to keep track of its work.
+    Intervals are popped in last in, first out order, which visits them in the same order as a
+    depth first recursion would.
+
+    Attributes
+    ----------
+    lower : numpy array
+        Row i is the lower bound of the i'th pending interval.
+    upper : numpy array
+        Row i is the upper bound of the i'th pending interval.
+    good_degs : numpy array
+        good_degs[i,j] is the good degree in each dimension of function j on the i'th pending interval.
+        -1 means unknown.
+    depth : numpy array
+        How many times the overall interval was subdivided to get the i'th pending interval.
+    size : int
+        The number of pending intervals.
+    """
+    def __init__(self, dim, num_funcs, capacity=64):
+        self.lower = np.empty([capacity, dim])
+        self.upper = np.empty([capacity, dim])
+        self.good_degs = np.empty([capacity, num_funcs, dim], dtype=int)
+        self.depth = np.empty(capacity, dtype=int)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def grow(self, capacity):
+        """Makes room for at least capacity intervals, doubling the storage as needed."""
+        old_capacity = len(self.depth)
+        if capacity <= old_capacity:
+            return
+        new_capacity = max(capacity, 2*old_capacity)
+        for name in ['lower', 'upper', 'good_degs', 'depth']:
+            old = getattr(self, name)
+            new = np.empty((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def push(self, a, b, good_degs=None, depth=0):
+        """Adds the interval [a,b] to the queue.
+
+        Parameters
+        ----------
+        a : numpy array
+            The lower bound on the interval.
+        b : numpy array
+            The upper bound on the interval.
+        good_degs : numpy array
+            The degrees in each dimension that give a good approximation of each function on the interval,
+            or None if unknown.
+        depth : int
+            How many times the overall interval was subdivided to get this interval.
+        """
+        self.grow(self.size + 1)
+        self.lower[self.size] = a
+        self.upper[self.size] = b
+        self.good_degs[self.size] = -1 if good_degs is None else good_degs
+        self.depth[self.size] = depth
+        self.size += 1
+
+    def push_intervals(self, intervals, good_degs=None, depth=0):
+        """Adds a list of intervals to the queue so that they are popped in the order they are given."""
+        self.grow(self.size + len(intervals))
+        for interval in reversed(intervals):
+            self.push(interval[0], interval[1], good_degs, depth)
+
+    def pop(self):
+        """Removes the most recently added interval from the queue.
+
+        Returns
+        -------
+        a : numpy array
+            The lower bound on the interval.
+        b : numpy array
+            The upper bound on the interval.
+        good_degs : numpy array
+            The good degrees of the functions on the interval in each dimension, or None if unknown.
+        depth : int
+            How many times the overall interval was subdivided to get this interval.
+        """
+        self.size -= 1
+        good_degs = self.good_degs[self.size].copy()
+        if np.any(good_degs < 0):
+            good_degs = None
+        return self.lower[self.size].copy(), self.upper[self.size].copy(), good_degs, self.depth[self.size]
+
+    def pop_all(self):
+        """Removes every interval from the queue.
+
+        Returns
+        -------
+        lower : numpy array
+            Row i is the lower bound of the i'th interval.
+        upper : numpy array
+            Row i is the upper bound of the i'th interval.
+        good_degs : numpy array
+            good_degs[i] is the good degrees of the functions on the i'th interval. -1 means unknown.
+        depth : numpy array
+            The depth of each interval.
+        """
+        size = self.size
+        self.size = 0
+        return self.lower[:size].copy(), self.upper[:size].copy(), self.good_degs[:size].copy(), self.depth[:size].copy()
+
+class RootAccumulator:
+    """Collects the roots found by the subdivision in one growable array.
+
+    Attributes
+    ----------
+    roots : numpy array
+        Preallocated storage. The first size rows are the roots found so far.
+    size : int
+        The number of roots found so far.
+    """
+    def __init__(self, dim, capacity=16):
+        self.roots = np.empty([capacity, dim])
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, zeros):
+        """Adds the zeros (one per row) to the accumulator."""
+        num = len(zeros)
+        if num == 0:
+            return
+        if self.size + num > len(self.roots):
+            new_roots = np.empty([max(self.size + num, 2*len(self.roots)), self.roots.shape[1]])
+            new_roots[:self.size] = self.roots[:self.size]
+            self.roots = new_roots
+        self.roots[self.size:self.size+num] = zeros
+        self.size += num
+
+    def get_roots(self, tol=None):
+        """Returns a copy of the roots found so far.
+
+        If tol is given, roots within tol of each other are only returned once, see unique_roots.
+        """
+        if tol is not None:
+            return unique_roots(self.roots[:self.size], tol)
+        return self.roots[:self.size].copy()
+
+def root_tolerance(a,b,approx_tol,solve_tol):
+    """The distance within which two roots found by a solve on [a,b] are treated as the same root.
+
+    The roots of neighboring intervals, and the roots that polishing finds again, agree to
+    about the accuracy of the approximations and the division solve.
+    """
+    return np.sqrt(approx_tol*solve_tol)*np.max(b-a)
+
+def unique_roots(zeros, tol):
+    """Removes duplicate roots.
+
+    The pairs of roots within tol of each other are found with a KD-tree, so this scales to many
+    roots. The roots are kept in order, and each kept root removes the later roots within tol of it.
+    Roots that are only chained together through other roots are not merged, so roots farther than
+    tol apart are never removed for each other.
+
+    Parameters
+    ----------
+    zeros : numpy array
+        Each row is a root.
+    tol : float
+        The distance within which two roots are the same root.
+
+    Returns
+    -------
+    unique_zeros : numpy array
+        The roots with the duplicates removed, in the order they were given.
+    """
+    num = len(zeros)
+    if num < 2:
+        return zeros.copy()
+    pairs = cKDTree(zeros).query_pairs(tol, output_type='ndarray')
+    if len(pairs) == 0:
+        return zeros.copy()
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:,0], pairs[:,1])), shape=(num, num))
+    graph = (graph + graph.T).tocsr()
+    keep = np.ones(num, dtype=bool)
+    #A root with an earlier kept neighbor was already removed, so only the later neighbors change
+    for i in np.unique(pairs):
+        if keep[i]:
+            keep[graph.indices[graph.indptr[i]:graph.indptr[i+1]]] = False
+    return zeros[keep]
+
+def save_checkpoint(path, queues, roots, interval_data):
+    """Saves the state of a subdivision solve to a compressed npz file.
+
+    The file is written to a temporary file first and then moved to path, so an interrupted save
+    never leaves a broken checkpoint behind.
+
+    Parameters
+    ----------
+    path : string or path-like
+        The file to save to.
+    queues : list
+        The IntervalQueues of the intervals that still need to be solved. They are saved as one queue,
+        with the intervals of the last queue popped first.
+    roots : RootAccumulator
+        The roots found so far.
+    interval_data : IntervalData
+        The accounting of the solve.
+    """
+    arrays = dict()
+    for name in ['lower', 'upper', 'good_degs', 'depth']:
+        arrays[name] = np.concatenate([getattr(work, name)[:work.size] for work in queues])
+    arrays['roots'] = roots.get_roots()
+    arrays['a'] = interval_data.a
+    arrays['b'] = interval_data.b
+    arrays['current_area'] = interval_data.current_area
+    arrays['evaluations'] = interval_data.evaluations
+    arrays['methods'] = np.array(interval_data.methods)
+    arrays['counts'] = interval_data.counts
+    arrays['volumes'] = interval_data.volumes
+    if interval_data.interval_log is not None:
+        arrays['interval_log'] = interval_data.interval_log.get_records()
+
+    path = str(path)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(temp_path, path)
+
+def load_checkpoint(path, interval_data):
+    """Loads the state of a subdivision solve saved by save_checkpoint.
+
+    Parameters
+    ----------
+    path : string or path-like
+        The file to load.
+    interval_data : IntervalData
+        Gets the accounting of the saved solve.
+
+    Returns
+    -------
+    work : IntervalQueue
+        The intervals that still need to be solved.
+    roots : RootAccumulator
+        The roots found so far.
+    """
+    with np.load(str(path)) as arrays:
+        interval_data.a = arrays['a']
+        interval_data.b = arrays['b']
+        interval_data.total_area = np.prod(interval_data.b - interval_data.a)
+        interval_data.current_area = float(arrays['current_area'])
+        interval_data.evaluations = int(arrays['evaluations'])
+        ids = np.array([interval_data.method_ids[name] for name in arrays['methods']])
+        interval_data.counts[ids] = arrays['counts']
+        interval_data.volumes[ids] = arrays['volumes']
+        if interval_data.interval_log is not None and 'interval_log' in arrays.files:
+            records = arrays['interval_log']
+            records['method'] = ids[records['method']]
+            interval_data.interval_log.truncate(0)
+            interval_data.interval_log.extend(records)
+
+        num, dim = arrays['lower'].shape
+        work = IntervalQueue(dim, arrays['good_degs'].shape[1], max(num, 1))
+        for name in ['lower', 'upper', 'good_degs', 'depth']:
+            getattr(work, name)[:num] = arrays[name]
+        work.size = num
+        roots = RootAccumulator(dim)
+        roots.add(arrays['roots'])
+    return work, roots
+
+def interval_data_counts(interval_data):
+    """Records how far the accounting of interval_data has gotten, for restore_interval_data_counts."""
+    log_size = None if interval_data.interval_log is None else len(interval_data.interval_log)
+    return interval_data.counts.copy(), interval_data.volumes.copy(), log_size, interval_data.current_area,\
+           interval_data.evaluations
+
+def restore_interval_data_counts(interval_data, counts):
+    """Undoes the accounting interval_data did after interval_data_counts returned counts."""
+    interval_data.counts, interval_data.volumes, log_size, interval_data.current_area,\
+        interval_data.evaluations = counts
+    if log_size is not None:
+        interval_data.interval_log.truncate(log_size)
+
+def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8, polish=False, good_degs=None,\
+                         max_deg=None, max_time=None, max_evaluations=None, max_depth=None, return_unresolved=False,\
+                         checkpoint=None, checkpoint_interval=600., checkpoint_frequency=None, resume_from=None):
+    """Finds the common zeros of the given functions.
+
+    The intervals still to be solved are kept in an IntervalQueue, and each one is handled by
+    subdivision_solve_interval, which either solves it or splits it into more intervals.
+
+    Parameters
+    ----------
+    funcs : list or function
+        Each element of the list is a callable function. Can also be one vector valued function
+        that returns the values of all the functions.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    interval_data : IntervalData
+        A class to run the subinterval checks and keep track of the solve progress
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True resolves for each root on a smaller interval with a finer approximation to give a
+        more accurate answer.
+    good_degs : numpy array
+        Interpoation degrees that are guaranteed to give an approximation valid to within approx_tol.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+    max_time : float
+        The most seconds to spend before stopping with the remaining intervals unresolved.
+    max_evaluations : int
+        The most function evaluations to do before stopping with the remaining intervals unresolved.
+    max_depth : int
+        The most times an interval can be subdivided. Deeper intervals are left unresolved.
+    return_unresolved : bool
+        If True the intervals left unresolved are returned too.
+    checkpoint : string or path-like
+        If given, the state of the solve is saved to this file with save_checkpoint every
+        checkpoint_interval seconds, and when the solve is interrupted by an exception.
+    checkpoint_interval : float
+        The seconds between the saves to checkpoint.
+    checkpoint_frequency : int
+        If given, checkpoint is also saved every this many intervals.
+    resume_from : string
+        A file saved by save_checkpoint to continue the solve from. interval_data is restored from it,
+        and a, b and good_degs are only used to check it is for the same interval.
+
+    Returns
+    -------
+    zeros : numpy array
+        The real zeros of the functions in the interval [a,b]
+    unresolved : numpy array
+        Only returned if return_unresolved is True. unresolved[i,0] and unresolved[i,1] are the lower
+        and upper bounds of the i'th unresolved interval.
+    """
+    dim = len(a)
+    root_tol = root_tolerance(a,b,approx_tol,solve_tol)
+    if isinstance(funcs, list):
+        #Power basis polynomials are converted once so they can be restricted exactly
+        funcs = [poly2cheb(func) if isinstance(func, MultiPower) else func for func in funcs]
+    if resume_from is not None:
+        work, roots = load_checkpoint(resume_from, interval_data)
+        if not (np.allclose(interval_data.a, a) and np.allclose(interval_data.b, b)):
+            raise ValueError("The checkpoint is for a different interval.")
+    else:
+        work = IntervalQueue(dim, dim)
+        work.push(a, b, good_degs)
+        roots = RootAccumulator(dim)
+    workspace = TransformWorkspace()
+    #Intervals deeper than max_depth
+    too_deep = IntervalQueue(dim, dim)
+    start_time = time.perf_counter()
+    last_save = start_time
+    solved_since_save = 0
+    #The interval being solved and the accounting from before it was started
+    current = None
+
+    try:
+        while len(work) > 0:
+            if max_time is not None and time.perf_counter() - start_time > max_time:
+                break
+            if max_evaluations is not None and interval_data.evaluations >= max_evaluations:
+                break
+            a, b, good_degs, depth = work.pop()
+            if max_depth is not None and depth > max_depth:
+                too_deep.push(a, b, good_degs, depth)
+                continue
+            if checkpoint is not None:
+                current = (a, b, good_degs, depth), interval_data_counts(interval_data)
+            interval_data.print_progress()
+            interval_data.depth = depth
+            zeros, intervals, new_good_degs = subdivision_solve_interval(funcs,a,b,deg,interval_data,approx_tol,\
+                                                                         solve_tol,polish,good_degs,max_deg,workspace)
+            roots.add(zeros)
+            work.push_intervals(intervals, new_good_degs, depth+1)
+            current = None
+            solved_since_save += 1
+            if checkpoint is not None and (time.perf_counter() - last_save > checkpoint_interval or\
+                                           (checkpoint_frequency is not None and solved_since_save >= checkpoint_frequency)):
+                save_checkpoint(checkpoint, [too_deep, work], roots, interval_data)
+                last_save = time.perf_counter()
+                solved_since_save = 0
+    except BaseException:
+        if checkpoint is not None:
+            #Puts back the interval that was interrupted so it is solved again when resuming
+            if current is not None:
+                interval, counts = current
+                restore_interval_data_counts(interval_data, counts)
+                work.push(*interval)
+            save_checkpoint(checkpoint, [too_deep, work], roots, interval_data)
+        raise
+
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, [too_deep, work], roots, interval_data)
+
+    if return_unresolved:
+        lower = np.concatenate([too_deep.lower[:too_deep.size], work.lower[:work.size]])
+        upper = np.concatenate([too_deep.upper[:too_deep.size], work.upper[:work.size]])
+        return roots.get_roots(root_tol), np.stack([lower, upper], axis=1)
+    return roots.get_roots(root_tol)
+
+def evaluate_cheb_grids(f,lower,upper,deg,params=None):
+    """Evaluates a function on the Chebyshev grids of many intervals with a single call.
+
+    Parameters
+    ----------
+    f : function from R^n -> R
+        The function to evaluate. Can also be vector valued.
+    lower : numpy array
+        Row i is the lower bound of the i'th interval.
+    upper : numpy array
+        Row i is the upper bound of the i'th interval.
+    deg : int or numpy array
+        The degree of the interpolation the grids are for, or the degree in each dimension.
+    params : numpy array
+        If given, f is the func of a ParameterizedFunction and params[i] is the parameter on the i'th
+        interval.
+
+    Returns
+    -------
+    values : numpy array
+        values[i] is the values block of f on the i'th interval, like evaluate_cheb_grid returns.
+    """
+    num, dim = lower.shape
+    if hasattr(f,"evaluate_grid"):
+        return np.array([evaluate_cheb_grid(f,lower[i],upper[i],deg) for i in range(num)])
+
+    deg, shape = grid_degree(deg, dim)
+    grid = get_cheb_grid(deg, dim, False)
+    cheb_points = transform(grid[np.newaxis], lower[:,np.newaxis], upper[:,np.newaxis]).reshape(-1,dim)
+    cheb_points = [cheb_points[:,i] for i in range(dim)]
+    if params is None:
+        values = np.asarray(f(*cheb_points))
+    else:
+        values = np.asarray(f(*cheb_points, np.repeat(params, len(grid), axis=0)))
+    values = values.reshape(values.shape[:-1] + (num,) + shape)
+    return np.moveaxis(values, -dim-1, 0)
+
+def level_cheb_approximate(func,lower,upper,deg,tol,good_degs,interval_data=None,max_deg=None,workspace=None,\
+                           params=None):
+    """Approximates a function on many intervals, evaluating it once for each grid size.
+
+    The grids of the intervals whose approximations aren't good enough are refined like in
+    full_cheb_approximate, and the intervals that need the same refined grid are evaluated together.
+
+    Parameters
+    ----------
+    func : function
+        The function we approximate. If it's vector valued, each result is a list of the
+        approximations of its components.
+    lower : numpy array
+        Row i is the lower bound of the i'th interval.
+    upper : numpy array
+        Row i is the upper bound of the i'th interval.
+    deg : int
+        The degree to approximate with.
+    tol : float
+        How small the high degree terms must be to consider the approximation accurate.
+    good_degs : numpy array
+        Row i is the good degree in each dimension on the i'th interval, -1 if unknown. For a vector
+        valued function good_degs[i,j] is the good degrees of component j.
+    interval_data : IntervalData or list
+        If given, the number of function evaluations is added to its count. Can also be a list with
+        the IntervalData of each interval.
+    max_deg : int
+        The largest degree the approximations are refined to before giving up and subdividing.
+        If None the degree is never refined.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
+    params : numpy array
+        If given, func is the func of a ParameterizedFunction and params[i] is the parameter on the
+        i'th interval.
+
+    Returns
+    -------
+    approximations : list
+        The result of full_cheb_approximate for each interval.
+    """
+    num, dim = lower.shape
+    if isinstance(func, MultiCheb):
+        return [restrict_approximate(func,lower[i],upper[i]) for i in range(num)]
+
+    def track_evaluations(idx, num_points):
+        if isinstance(interval_data, list):
+            for i in idx:
+                interval_data[i].track_evaluations(num_points)
+        elif interval_data is not None:
+            interval_data.track_evaluations(len(idx)*num_points)
+
+    vector = good_degs.ndim > 2
+    #Rows of good degrees, one for each function and interval
+    deg_rows = good_degs.reshape(-1, dim)
+    unknown = np.any(deg_rows < 0, axis=1).reshape(good_degs.shape[:-1])
+    if vector:
+        unknown = np.any(unknown, axis=1)
+    approximations = [[None]*len(good_degs[i]) if vector and not unknown[i] else None for i in range(num)]
+
+    #Intervals that still need the approximation test, with the degrees to try on each
+    testing = {i: np.array(np.broadcast_to(deg, dim)) for i in np.where(unknown)[0]}
+    while len(testing) > 0:
+        for degs in np.unique([testing[i] for i in testing], axis=0):
+            idx = np.array([i for i in testing if np.all(testing[i] == degs)])
+            values = evaluate_cheb_grids(func,lower[idx],upper[idx],2*degs,None if params is None else params[idx])
+            track_evaluations(idx, np.prod(2*degs+1))
+            for i, values_block in zip(idx, values):
+                if vector:
+                    if approximations[i] is None:
+                        approximations[i] = [None]*len(values_block)
+                    for j, v in enumerate(values_block):
+                        if approximations[i][j] is None or approximations[i][j][0] is None:
+                            approximations[i][j] = cheb_approximate_values(v,degs,tol,workspace)
+                    new_degs = refined_degrees(approximations[i],degs,max_deg)
+                else:
+                    approximations[i] = cheb_approximate_values(values_block,degs,tol,workspace)
+                    new_degs = refined_degrees([approximations[i]],degs,max_deg)
+                if new_degs is None:
+                    del testing[i]
+                else:
+                    testing[i] = new_degs
+
+    #Intervals where we know what degree to use
+    for good_deg in np.unique(deg_rows[np.all(deg_rows >= 0, axis=1)], axis=0):
+        matches = np.all(good_degs == good_deg, axis=-1)
+        if vector:
+            idx = np.where(~unknown & np.any(matches, axis=1))[0]
+        else:
+            idx = np.where(matches)[0]
+        values = evaluate_cheb_grids(func,lower[idx],upper[idx],good_deg,None if params is None else params[idx])
+        track_evaluations(idx, np.prod(good_deg+1))
+        #The transforms of all the blocks are done together
+        if vector:
+            rows, cols = np.where(matches[idx])
+            spots = zip(idx[rows], cols)
+            coeffs = stacked_values_to_coeffs(values[rows,cols])
+        else:
+            spots = idx
+            coeffs = stacked_values_to_coeffs(values)
+        bools = np.zeros(2**dim, dtype=bool)
+        for spot, coeff in zip(spots, coeffs):
+            if vector:
+                approximations[spot[0]][spot[1]] = (pad_coeff(coeff), bools.copy())
+            else:
+                approximations[spot] = (pad_coeff(coeff), bools.copy())
+    return approximations
+
+def stacked_values_to_coeffs(values):
+    """Does values_to_coeffs on many blocks of values of the same shape at once.
+
+    Parameters
+    ----------
+    values : numpy array
+        values[i] is the i'th block of values.
+
+    Returns
+    -------
+    coeffs : numpy array
+        coeffs[i] is the coefficients values_to_coeffs gives for values[i].
+    """
+    num = len(values)
+    max_vals = np.max(np.abs(values).reshape(num,-1), axis=1)
+    small = max_vals < 1.e-5
+    multipliers = np.where(small, 1.e5, 1./np.where(small, 1., max_vals))
+    multipliers = np.maximum(1, multipliers)
+
+    coeffs = chebyshev_dct(values, axes=list(range(1,values.ndim)))
+    coeffs *= multipliers.reshape((num,) + (1,)*(values.ndim-1))
+    return coeffs
+
+def solve_level(funcs,lower,upper,good_degs,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8,polish=False,\
+                workspace=None,system_nums=None,depths=None,max_deg=None):
+    """Does what subdivision_solve_interval does on many intervals at once.
+
+    Each function is evaluated on the grids of all the intervals it still needs to be approximated on
+    with one call, instead of one call per interval.
+
+    Parameters
+    ----------
+    funcs : list or function
+        Each element of the list is a callable function. Can also be one vector valued function
+        that returns the values of all the functions. If system_nums is given, a list of systems like this.
+    lower : numpy array
+        Row i is the lower bound of the i'th interval.
+    upper : numpy array
+        Row i is the upper bound of the i'th interval.
+    good_degs : numpy array
+        Row i is the good degrees of the functions on the i'th interval. -1 means unknown.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    interval_data : IntervalData
+        A class to run the subinterval checks and keep track of the solve progress. If system_nums
+        is given, a list with one for each system.
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True resolves for each root on a smaller interval with a finer approximation to give a
+        more accurate answer.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
+    system_nums : numpy array
+        Which system each interval belongs to, if there are many systems. A function that is in more
+        than one system, or ParameterizedFunctions of the same family, are called once for all of
+        their intervals.
+    depths : numpy array
+        How many times the overall interval was subdivided to get each interval. Logged with the
+        intervals that are solved. Zero if None.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+
+    Returns
+    -------
+    results : list
+        For each interval, the zeros, subintervals and good degrees that subdivision_solve_interval
+        would return.
+    """
+    num, dim = lower.shape
+    if system_nums is None:
+        systems = [funcs]
+        interval_datas = [interval_data]
+        system_nums = np.zeros(num, dtype=int)
+    else:
+        systems = funcs
+        interval_datas = interval_data
+    data = [interval_datas[system_num] for system_num in system_nums]
+    if depths is None:
+        depths = np.zeros(num, dtype=int)
+    results = [None]*num
+    cheb_approx_lists = [[] for i in range(num)]
+    change_signs = [None]*num
+
+    def process(idx, approximations):
+        for i, (coeff, change_sign) in zip(idx, approximations):
+            results[i] = approximation_result(coeff,change_sign,lower[i],upper[i],data[i],approx_tol,False)
+            cheb_approx_lists[i].append(coeff)
+            change_signs[i] = change_sign
+        #The interval checks are run on all the intervals of an IntervalData and depth at once
+        groups = {}
+        for i in idx:
+            if results[i] is None:
+                groups.setdefault((id(data[i]), depths[i]), []).append(i)
+        for group in groups.values():
+            group = np.array(group)
+            interval_data = data[group[0]]
+            interval_data.depth = depths[group[0]]
+            coeffs = stack_coeffs([cheb_approx_lists[i][-1] for i in group])
+            thrown_out = interval_data.check_interval_batch(coeffs,approx_tol,lower[group],upper[group])
+            for i in group[thrown_out]:
+                results[i] = np.zeros([0,dim]), [], None
+
+    def group_by_func(idx, get_func):
+        """Groups the intervals by the function to call on them, and gives the parameters of each
+        interval for the ParameterizedFunctions."""
+        groups = {}
+        for i in idx:
+            func = get_func(i)
+            groups.setdefault(id(func.func if isinstance(func, ParameterizedFunction) else func), []).append(i)
+        for group in groups.values():
+            func = get_func(group[0])
+            if isinstance(func, ParameterizedFunction):
+                yield func.func, np.array(group), np.array([get_func(i).param for i in group])
+            else:
+                yield func, np.array(group), None
+
+    #Vector valued systems
+    vector_idx = [i for i in range(num) if not isinstance(systems[system_nums[i]], list)]
+    for func, idx, params in group_by_func(vector_idx, lambda i: systems[system_nums[i]]):
+        approximations = level_cheb_approximate(func,lower[idx],upper[idx],deg,approx_tol,good_degs[idx],\
+                                                [data[i] for i in idx],max_deg,workspace,params)
+        #Each component is only used on the intervals the components before it didn't finish
+        for component in range(len(approximations[0])):
+            unfinished = [j for j, i in enumerate(idx) if results[i] is None]
+            process(idx[unfinished], [approximations[j][component] for j in unfinished])
+
+    #Lists of functions
+    list_idx = [i for i in range(num) if isinstance(systems[system_nums[i]], list)]
+    for func_num in range(dim):
+        #Only the intervals the earlier functions didn't finish
+        idx = [i for i in list_idx if results[i] is None]
+        for func, group, params in group_by_func(idx, lambda i: systems[system_nums[i]][func_num]):
+            approximations = level_cheb_approximate(func,lower[group],upper[group],deg,approx_tol,\
+                                                    good_degs[group,func_num],[data[i] for i in group],max_deg,\
+                                                    workspace,params)
+            process(group, approximations)
+
+    for i in range(num):
+        if results[i] is None:
+            data[i].depth = depths[i]
+            results[i] = solve_approximations(systems[system_nums[i]],cheb_approx_lists[i],change_signs[i],\
+                                              lower[i],upper[i],data[i],approx_tol,solve_tol,polish)
+    return results
+
+def batched_subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8,polish=False,\
+                                 max_deg=None):
+    """Finds the common zeros of the given functions, one level of the subdivision at a time.
+
+    All the intervals at a level are solved together by solve_level, so each function is called once per
+    grid size per level instead of once per interval. This is much faster for vectorized functions that
+    are cheap to evaluate, where the overhead of each call dominates.
+
+    Parameters
+    ----------
+    funcs : list or function
+        Each element of the list is a callable function. Can also be one vector valued function
+        that returns the values of all the functions.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    interval_data : IntervalData
+        A class to run the subinterval checks and keep track of the solve progress
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True resolves for each root on a smaller interval with a finer approximation to give a
+        more accurate answer.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+
+    Returns
+    -------
+    zeros : numpy array
+        The real zeros of the functions in the interval [a,b]. They are in breadth first order,
+        not in the order subdivision_solve_nd returns them.
+    """
+    return batch_subdivision_solve_nd([funcs],a,b,deg,[interval_data],approx_tol,solve_tol,polish,max_deg)[0]
+
+def batch_subdivision_solve_nd(systems,a,b,deg,interval_datas,approx_tol=1.e-4,solve_tol=1.e-8,polish=False,\
+                               max_deg=None):
+    """Finds the common zeros of many systems of functions on the same interval.
+
+    Each system keeps its own queue of intervals, but the levels of all the systems are solved together
+    by solve_level, sharing the grids, the workspace and the calls to functions that are in more than
+    one system.
+
+    Parameters
+    ----------
+    systems : list
+        The systems to solve. Each is a list of callable functions or one vector valued function.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    interval_datas : list
+        The IntervalData of each system.
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True resolves for each root on a smaller interval with a finer approximation to give a
+        more accurate answer.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+
+    Returns
+    -------
+    zeros : list
+        The real zeros of each system in the interval [a,b], in breadth first order.
+    """
+    dim = len(a)
+    #Power basis polynomials are converted once so they can be restricted exactly
+    systems = [[poly2cheb(func) if isinstance(func, MultiPower) else func for func in funcs]\
+               if isinstance(funcs, list) else funcs for funcs in systems]
+    queues = [IntervalQueue(dim, dim) for funcs in systems]
+    roots = [RootAccumulator(dim) for funcs in systems]
+    for work in queues:
+        work.push(a, b)
+    workspace = TransformWorkspace()
+
+    while any(len(work) > 0 for work in queues):
+        pending = [system_num for system_num in range(len(systems)) if len(queues[system_num]) > 0]
+        levels = [queues[system_num].pop_all() for system_num in pending]
+        system_nums = np.concatenate([[system_num]*len(level[3]) for system_num, level in zip(pending, levels)])
+        system_nums = system_nums.astype(int)
+        lower, upper, good_degs, depths = [np.concatenate(arrays) for arrays in zip(*levels)]
+        results = solve_level(systems,lower,upper,good_degs,deg,interval_datas,approx_tol,solve_tol,polish,\
+                              workspace,system_nums,depths,max_deg)
+        for (zeros, intervals, new_good_degs), depth, system_num in zip(results, depths, system_nums):
+            roots[system_num].add(zeros)
+            queues[system_num].push_intervals(intervals, new_good_degs, depth+1)
+        for system_num in pending:
+            interval_datas[system_num].print_progress()
+    return [root.get_roots(root_tolerance(a,b,approx_tol,solve_tol)) for root in roots]
+
+#The functions being solved by the worker processes of parallel_subdivision_solve_nd.
+_worker_funcs = None
+#The buffers each worker process reuses for all its intervals.
+_worker_workspace = None
+
+def _set_worker_funcs(funcs):
+    """Registers the functions for the worker processes of parallel_subdivision_solve_nd."""
+    global _worker_funcs, _worker_workspace
+    _worker_funcs = funcs
+    _worker_workspace = None if funcs is None else TransformWorkspace()
+
+def _worker_loop(funcs, tasks, results):
+    """The main loop of a worker process of parallel_subdivision_solve_nd.
+
+    Runs solve_interval_task on each task from tasks and puts its result, or the exception it raised,
+    in results. The check schedulers are kept from one task to the next, so a worker keeps tuning the
+    checks for the whole solve. Stops when it gets None.
+
+    Parameters
+    ----------
+    funcs : list or function
+        The functions to solve.
+    tasks : multiprocessing.Queue
+        The arguments of solve_interval_task for each task.
+    results : multiprocessing.Queue
+        Gets the result of each task.
+    """
+    _set_worker_funcs(funcs)
+    schedulers = None
+    for task in iter(tasks.get, None):
+        try:
+            result = solve_interval_task(*task, schedulers=schedulers)
+        except Exception as e:
+            results.put(e)
+            continue
+        schedulers = (result[2].interval_scheduler, result[2].subinterval_scheduler)
+        results.put(result)
+
+def solve_interval_task(a,b,good_degs,depth,deg,total_a,total_b,approx_tol,solve_tol,polish,max_intervals,max_deg,\
+                        log_intervals=True,tune_checks=False,schedulers=None):
+    """The work done by a worker process of parallel_subdivision_solve_nd.
+
+    Solves the interval [a,b] depth first with the registered functions, stopping after max_intervals
+    intervals so that the rest of a large subtree can be handed out to other workers.
+
+    Parameters
+    ----------
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    good_degs : list
+        The good degrees of the functions on the interval, or None if unknown.
+    depth : int
+        How many times the overall interval was subdivided to get this interval.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    total_a : numpy array
+        The lower bound on the overall interval.
+    total_b : numpy array
+        The upper bound on the overall interval.
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True polishes the zeros that are found.
+    max_intervals : int
+        How many intervals to solve before returning the rest.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+    log_intervals : bool
+        If False only counts the intervals solved by each check/method instead of logging them.
+    tune_checks : bool
+        If True the interval checks are reordered and skipped based on how they do.
+    schedulers : tuple
+        The interval and subinterval CheckSchedulers of an earlier task, to keep tuning the checks from.
+        If None new ones are used.
 
-def get_subintervals(a,b,dimensions,interval_data,polys,change_sign,approx_tol,check_subintervals=False):
-    """Gets the subintervals to divide a search interval into.
+    Returns
+    -------
+    zeros : numpy array
+        The zeros that were found.
+    pending : tuple
+        The lower bounds, upper bounds, good degrees and depths of the intervals that weren't solved.
+    interval_data : IntervalData
+        What happened to each interval that was solved.
+    """
+    funcs = _worker_funcs
+    dim = len(a)
+    interval_data = IntervalData(total_a, total_b, log_intervals=log_intervals, tune_checks=tune_checks)
+    if schedulers is not None:
+        interval_data.interval_scheduler, interval_data.subinterval_scheduler = schedulers
+    work = IntervalQueue(dim, dim)
+    work.push(a, b, good_degs, depth)
+    roots = RootAccumulator(dim)
+
+    num_solved = 0
+    while len(work) > 0 and num_solved < max_intervals:
+        a, b, good_degs, depth = work.pop()
+        interval_data.depth = depth
+        zeros, intervals, new_good_degs = subdivision_solve_interval(funcs,a,b,deg,interval_data,approx_tol,\
+                                                                     solve_tol,polish,good_degs,max_deg,\
+                                                                     _worker_workspace)
+        roots.add(zeros)
+        work.push_intervals(intervals, new_good_degs, depth+1)
+        num_solved += 1
+
+    size = work.size
+    pending = (work.lower[:size], work.upper[:size], work.good_degs[:size], work.depth[:size])
+    return roots.get_roots(), pending, interval_data
+
+#The seconds parallel_subdivision_solve_nd waits for a result before checking that the workers are alive
+worker_poll_interval = 1.
+
+def parallel_subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8,polish=False,\
+                                  workers=None,max_intervals=32,max_deg=None):
+    """Finds the common zeros of the given functions using worker processes.
+
+    The main process keeps the queue of pending intervals and hands them out to the workers one at a
+    time. Each worker solves its interval for a while and sends back the roots it found and whatever
+    is left of its subtree, so the load stays balanced no matter how uneven the subdivision is.
+    If a worker dies, like when it is killed, its interval is lost, so the solve raises a
+    RuntimeError instead of waiting for it forever. Each worker keeps tuning the checks across all
+    the intervals it is handed when tune_checks is set on interval_data.
+
+    On platforms that can fork, the functions are inherited by the workers and don't need to be
+    picklable. Otherwise they are pickled and sent to each worker.
 
     Parameters
     ----------
+    funcs : list or function
+        Each element of the list is a callable function. Can also be one vector valued function
+        that returns the values of all the functions.
     a : numpy array
         The lower bound on the interval.
     b : numpy array
         The upper bound on the interval.
-    dimensions : numpy array
-        The dimensions we want to cut in half.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
     interval_data : IntervalData
         A class to run the subinterval checks and keep track of the solve progress
-    polys : list
-        A list of MultiCheb polynomials representing the function approximations on the
-        interval to subdivide. Used in the subinterval checks.
-    change_sign : list
-        A list of bools of whether we know the functions can change sign on the subintervals.
-        Used in the subinterval checks.
     approx_tol: float
-        The bound of the sup norm error of the chebyshev approximation. Because trim_coeff
-        introduces this much error again, 2*approx_tol is passed into the subintervals checks.
-    check_subintervals : bool
-        If True runs the subinterval checks to through out intervals where the functions are never 0.
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True resolves for each root on a smaller interval with a finer approximation to give a
+        more accurate answer.
+    workers : int
+        The number of processes to use. Defaults to the number of cpus.
+    max_intervals : int
+        How many intervals a worker solves before sending the rest of its subtree back.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
 
     Returns
     -------
-    subintervals : list
-        Each element of the list is a tuple containing an a and b, the lower and upper bounds of the interval.
+    zeros : numpy array
+        The real zeros of the functions in the interval [a,b]. They aren't in the same order as
+        subdivision_solve_nd returns them.
     """
-    RAND = 0.5139303900908738
-    subintervals = []
-    diffs1 = ((b-a)*RAND)[dimensions]
-    diffs2 = ((b-a)-(b-a)*RAND)[dimensions]
-
-    for subset in product([False,True], repeat=len(dimensions)):
-        subset = np.array(subset)
-        aTemp = a.copy()
-        bTemp = b.copy()
-        aTemp[dimensions] += (~subset)*diffs1
-        bTemp[dimensions] -= subset*diffs2
-        subintervals.append((aTemp,bTemp))
-
-    if check_subintervals:
-        scaled_subintervals = get_subintervals(-np.ones_like(a),np.ones_like(a),dimensions,None,None,None,approx_tol)
-        #Uses 2*approx_tol because this much error can be added in the approximation and the trim_coeff
-        return interval_data.check_subintervals(subintervals, scaled_subintervals, polys, change_sign, 2*approx_tol)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    dim = len(a)
+    if isinstance(funcs, list):
+        #Power basis polynomials are converted once so they can be restricted exactly
+        funcs = [poly2cheb(func) if isinstance(func, MultiPower) else func for func in funcs]
+    pending = IntervalQueue(dim, dim)
+    pending.push(a, b)
+    roots = RootAccumulator(dim)
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
     else:
-        return subintervals
-
-def full_cheb_approximate(f,a,b,deg,tol,good_deg=None):
-    """Gives the full chebyshev approximation and checks if it's good enough.
-
-    Called recursively.
+        context = multiprocessing.get_context()
+    tasks = context.Queue()
+    results = context.Queue()
+    processes = [context.Process(target=_worker_loop, args=(funcs, tasks, results), daemon=True)\
+                 for i in range(workers)]
+
+    try:
+        for process in processes:
+            process.start()
+        num_running = 0
+        while len(pending) > 0 or num_running > 0:
+            #Keep every worker busy with a little extra queued up
+            while len(pending) > 0 and num_running < 2*workers:
+                sub_a, sub_b, good_degs, depth = pending.pop()
+                tasks.put((sub_a,sub_b,good_degs,depth,deg,a,b,approx_tol,solve_tol,polish,max_intervals,max_deg,\
+                           interval_data.interval_log is not None, interval_data.interval_scheduler.tune))
+                num_running += 1
+
+            result = None
+            while result is None:
+                try:
+                    result = results.get(timeout=worker_poll_interval)
+                except queue.Empty:
+                    #The workers only stop when they are told to, so any that did died
+                    if any(process.exitcode is not None for process in processes):
+                        raise RuntimeError("A worker process died while solving an interval.")
+            num_running -= 1
+            if isinstance(result, BaseException):
+                raise result
+
+            zeros, (lower, upper, good_degs, depths), worker_data = result
+            roots.add(zeros)
+            for i in range(len(depths)):
+                pending.push(lower[i], upper[i], None if np.any(good_degs[i] < 0) else good_degs[i], depths[i])
+            interval_data.merge(worker_data)
+            interval_data.print_progress()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            if process.pid is not None:
+                process.join()
+
+    return roots.get_roots(root_tolerance(a,b,approx_tol,solve_tol))
+
+async def async_evaluate_cheb_grid(f,a,b,deg,semaphore):
+    """Does what evaluate_cheb_grid does for a function that can be a coroutine function.
 
     Parameters
     ----------
     f : function
-        The function we approximate.
+        The function to evaluate. If it returns an awaitable, it is awaited.
     a : numpy array
         The lower bound on the interval.
     b : numpy array
         The upper bound on the interval.
-    deg : int
-        The degree to approximate with.
-    tol : float
-        How small the high degree terms must be to consider the approximation accurate.
-    good_deg : numpy array
-        Interpoation degree that is guaranteed to give an approximation valid to within approx_tol.
+    deg : int or numpy array
+        The degree of the interpolation the grid is for, or the degree in each dimension.
+    semaphore : asyncio.Semaphore
+        Limits how many evaluations are waited on at once.
 
     Returns
     -------
-    coeff : numpy array
-        The coefficient array of the interpolation. If it can't get a good approximation and needs to subdivide, returns None.
-    bools: numpy array
-        (2^n, 1) array of bools corresponding to which subintervals the function changes sign in
+    values_block : numpy array
+        The values of the function on the grid.
     """
-    #We know what degree we want
+    dim = len(a)
+    deg, shape = grid_degree(deg, dim)
+    cheb_points = transform(get_cheb_grid(deg, dim, False), a, b)
+    async with semaphore:
+        values = f(*[cheb_points[:,i] for i in range(dim)])
+        if inspect.isawaitable(values):
+            values = await values
+    values = np.asarray(values)
+    return values.reshape(values.shape[:-1] + shape)
+
+async def async_cheb_approximate(func,a,b,deg,tol,good_deg,interval_data,max_deg,semaphore):
+    """Does what cheb_approximate does for a function that can be a coroutine function.
+
+    Parameters are the same as full_cheb_approximate, plus the semaphore for async_evaluate_cheb_grid.
+    """
+    if isinstance(func, MultiCheb):
+        return restrict_approximate(func,a,b)
     if good_deg is not None:
-        coeff, bools, multiplier = interval_approximate_nd(f,a,b,good_deg,return_bools=True)
-        return coeff, bools
-    #Try degree deg and see if it's good enough
-    coeff, multiplier = interval_approximate_nd(f,a,b,deg)
-    coeff2, bools, multiplier = interval_approximate_nd(f,a,b,deg*2,return_bools=True, multiplier=multiplier)
-    coeff2[slice_top(coeff)] -= coeff
-    if np.sum(np.abs(coeff2)) > tol:
-        #Find the directions to subdivide
-        dim = len(a)
-        div_dimensions = []
-        slices = [slice(0,None,None)]*dim
-        for d in range(dim):
-            slices[d] = slice(deg+1,None,None)
-            if np.sum(np.abs(coeff2[tuple(slices)])) > tol/dim:
-                div_dimensions.append(d)
-            slices[d] = slice(0,None,None)
-        if len(div_dimensions) == 0:
-            div_dimensions.append(0)
-        return None, np.array(div_dimensions)
+        values_block = await async_evaluate_cheb_grid(func,a,b,good_deg,semaphore)
+        interval_data.track_evaluations(values_block.size)
+        return good_deg_approximate(values_block)
+
+    degs = np.array(np.broadcast_to(deg, len(a)))
+    while True:
+        values_block = await async_evaluate_cheb_grid(func,a,b,2*degs,semaphore)
+        interval_data.track_evaluations(values_block.size)
+        coeff, bools = cheb_approximate_values(values_block,degs,tol)
+        degs = refined_degrees([(coeff, bools)],degs,max_deg)
+        if degs is None:
+            return coeff, bools
+
+async def async_system_cheb_approximate(funcs,a,b,deg,tol,good_degs,interval_data,max_deg,semaphore):
+    """Does what system_cheb_approximate does for a function that can be a coroutine function.
+
+    Parameters are the same as system_cheb_approximate, plus the semaphore for async_evaluate_cheb_grid.
+    """
+    dim = len(a)
+    if good_degs is None:
+        degs = np.array(np.broadcast_to(deg, dim))
+        approximations = None
+        while degs is not None:
+            values_block = await async_evaluate_cheb_grid(funcs,a,b,2*degs,semaphore)
+            interval_data.track_evaluations(values_block[0].size)
+            if approximations is None:
+                approximations = [None]*len(values_block)
+            for i, values in enumerate(values_block):
+                if approximations[i] is None or approximations[i][0] is None:
+                    approximations[i] = cheb_approximate_values(values,degs,tol)
+            degs = refined_degrees(approximations,degs,max_deg)
+        return approximations
+
+    approximations = [None]*dim
+    for good_deg in np.unique(good_degs, axis=0):
+        values_block = await async_evaluate_cheb_grid(funcs,a,b,good_deg,semaphore)
+        interval_data.track_evaluations(values_block[0].size)
+        for i in np.where(np.all(good_degs == good_deg, axis=1))[0]:
+            approximations[i] = good_deg_approximate(values_block[i])
+    return approximations
+
+async def async_subdivision_solve_interval(funcs,a,b,deg,interval_data,approx_tol,solve_tol,good_degs,max_deg,\
+                                           semaphore,depth=0):
+    """Does what subdivision_solve_interval does for functions that can be coroutine functions.
+
+    Parameters are the same as subdivision_solve_interval, plus the semaphore for async_evaluate_cheb_grid
+    and the depth of the interval. Other intervals are solved while this one waits, so interval_data.depth
+    is set again after every wait.
+    """
+    cheb_approx_list = []
+    if not isinstance(funcs, list):
+        approximations = await async_system_cheb_approximate(funcs,a,b,deg,approx_tol,good_degs,interval_data,\
+                                                             max_deg,semaphore)
+        for coeff, change_sign in approximations:
+            interval_data.depth = depth
+            result = approximation_result(coeff,change_sign,a,b,interval_data,approx_tol)
+            if result is not None:
+                return result
+            cheb_approx_list.append(coeff)
     else:
-        return coeff, bools
+        if good_degs is None:
+            good_degs = [None]*len(funcs)
+        #Only approximates each function once the ones before it didn't throw out the interval
+        for func, good_deg in zip(funcs, good_degs):
+            coeff, change_sign = await async_cheb_approximate(func,a,b,deg,approx_tol,good_deg,interval_data,\
+                                                              max_deg,semaphore)
+            interval_data.depth = depth
+            result = approximation_result(coeff,change_sign,a,b,interval_data,approx_tol)
+            if result is not None:
+                return result
+            cheb_approx_list.append(coeff)
 
-def good_zeros_nd(zeros, imag_tol = 1.e-5, real_tol = 1.e-5):
-    """Get the real zeros in the -1 to 1 interval in each dimension.
+    interval_data.depth = depth
+    return solve_approximations(funcs,cheb_approx_list,change_sign,a,b,interval_data,approx_tol,solve_tol,False)
+
+async def async_subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8,max_deg=None,\
+                                     max_concurrency=8):
+    """Finds the common zeros of the given functions, which can be coroutine functions.
+
+    Up to 2*max_concurrency intervals are solved concurrently, and at most max_concurrency function
+    evaluations are waited on at once. If this is cancelled or an interval raises an error, the
+    intervals still being solved are cancelled.
 
     Parameters
     ----------
-    zeros : numpy array
-        The zeros to be checked.
-    imag_tol : float
-        How large the imaginary part can be to still have it be considered real.
-    real_tol : float
-        How far the real part can be outside the interval [-1,1] and still be
-        considered valid.
+    funcs : list or function
+        Each element of the list is a callable function or coroutine function. Can also be one vector
+        valued function that returns the values of all the functions.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    deg : int
+        The degree to approximate with in the chebyshev approximation.
+    interval_data : IntervalData
+        A class to run the subinterval checks and keep track of the solve progress
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+    max_concurrency : int
+        The most function evaluations that can be waited on at once.
 
     Returns
     -------
-    good_zeros : numpy array
-        The real zeros in [-1,1] of the input zeros.
+    zeros : numpy array
+        The real zeros of the functions in the interval [a,b]. They aren't in the same order as
+        subdivision_solve_nd returns them.
     """
-    good_zeros = zeros[np.all(np.abs(zeros.imag) <= imag_tol,axis = 1)]
-    good_zeros = good_zeros[np.all(np.abs(good_zeros) <= 1 + real_tol,axis = 1)]
-    return good_zeros.real
-
-def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8, polish=False, good_degs=None):
-    """Finds the common zeros of the given functions.
+    dim = len(a)
+    if isinstance(funcs, list):
+        #Power basis polynomials are converted once so they can be restricted exactly
+        funcs = [poly2cheb(func) if isinstance(func, MultiPower) else func for func in funcs]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    work = IntervalQueue(dim, dim)
+    work.push(a, b)
+    roots = RootAccumulator(dim)
+    #The depth of each interval being solved
+    running = dict()
+
+    try:
+        while len(work) > 0 or len(running) > 0:
+            while len(work) > 0 and len(running) < 2*max_concurrency:
+                sub_a, sub_b, good_degs, depth = work.pop()
+                task = asyncio.ensure_future(async_subdivision_solve_interval(funcs,sub_a,sub_b,deg,interval_data,\
+                                                    approx_tol,solve_tol,good_degs,max_deg,semaphore,depth))
+                running[task] = depth
+
+            done, pending = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                depth = running.pop(task)
+                zeros, intervals, new_good_degs = task.result()
+                roots.add(zeros)
+                work.push_intervals(intervals, new_good_degs, depth+1)
+                interval_data.print_progress()
+    finally:
+        for task in running:
+            task.cancel()
+        if len(running) > 0:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return roots.get_roots(root_tolerance(a,b,approx_tol,solve_tol))
+
+def subdivision_solve_interval(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=1.e-8, polish=False, good_degs=None,\
+                               max_deg=None, workspace=None):
+    """Tries to find the common zeros of the given functions on a single interval.
 
     Parameters
     ----------
-    funcs : list
-        Each element of the list is a callable function.
+    funcs : list or function
+        Each element of the list is a callable function. Can also be one vector valued function
+        that returns the values of all the functions.
     a : numpy array
         The lower bound on the interval.
     b : numpy array
@@ -451,44 +2238,127 @@ def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=
         more accurate answer.
     good_degs : numpy array
         Interpoation degrees that are guaranteed to give an approximation valid to within approx_tol.
+    max_deg : int
+        The largest degree the approximations are refined to in the dimensions they aren't good
+        enough in before subdividing. If None they are never refined.
+    workspace : TransformWorkspace
+        Buffers to reuse for the temporary arrays. If None new arrays are allocated.
 
     Returns
     -------
     zeros : numpy array
-        The real zeros of the functions in the interval [a,b]
+        The real zeros of the functions found in the interval [a,b]
+    intervals : list
+        The subintervals that still need to be solved. Each element is a tuple (a,b).
+    good_degs : list
+        The good degrees of the functions on the subintervals, or None if unknown.
     """
     cheb_approx_list = []
-    interval_data.print_progress()
     dim = len(a)
-    if good_degs is None:
-        good_degs = [None]*len(funcs)
+    if not isinstance(funcs, list):
+        approximations = system_cheb_approximate(funcs,a,b,deg,approx_tol,good_degs,interval_data,max_deg,workspace)
+    else:
+        if good_degs is None:
+            good_degs = [None]*len(funcs)
+        #Only approximates each function once the ones before it didn't throw out the interval
+        approximations = (cheb_approximate(func,a,b,deg,approx_tol,good_deg,interval_data,max_deg,workspace)\
+                          for func, good_deg in zip(funcs, good_degs))
 
-    for func, good_deg in zip(funcs, good_degs):
-        coeff, change_sign = full_cheb_approximate(func,a,b,deg,approx_tol,good_deg)
+    for coeff, change_sign in approximations:
+        result = approximation_result(coeff,change_sign,a,b,interval_data,approx_tol)
+        if result is not None:
+            return result
+        cheb_approx_list.append(coeff)
 
-        #Subdivides if a bad approximation
-        if coeff is None:
-            intervals = get_subintervals(a,b,change_sign,None,None,None,approx_tol)
-            return np.vstack([subdivision_solve_nd(funcs,interval[0],interval[1],deg,interval_data,\
-                                                   approx_tol,solve_tol,polish) for interval in intervals])
-        else:
-            #if the function changes sign on at least one subinterval, skip the checks
-            if np.any(change_sign):
-                cheb_approx_list.append(coeff)
-                continue
-            #Run checks to try and throw out the interval
-            if interval_data.check_interval(coeff, approx_tol, a, b):
-                return np.zeros([0,dim])
+    return solve_approximations(funcs,cheb_approx_list,change_sign,a,b,interval_data,approx_tol,solve_tol,polish)
 
-            cheb_approx_list.append(coeff)
+def approximation_result(coeff,change_sign,a,b,interval_data,approx_tol,run_checks=True):
+    """Decides if an interval is finished after approximating one of the functions on it.
+
+    Parameters
+    ----------
+    coeff : numpy array
+        The coefficients of the approximation, or None if it wasn't good enough.
+    change_sign : numpy array
+        Which subintervals the function changes sign on, or the dimensions to subdivide in if coeff is None.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    interval_data : IntervalData
+        A class to run the interval checks and keep track of the solve progress
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    run_checks : bool
+        If False the interval checks aren't run, so they can be run on many intervals at once with
+        IntervalData.check_interval_batch.
+
+    Returns
+    -------
+    result : tuple
+        None if the next function should be approximated. Otherwise the zeros, subintervals and
+        good degrees to return for the interval, like subdivision_solve_interval.
+    """
+    dim = len(a)
+    #Subdivides if a bad approximation
+    if coeff is None:
+        intervals = get_subintervals(a,b,change_sign,None,None,None,approx_tol)
+        return np.zeros([0,dim]), intervals, None
+    #if the function changes sign on at least one subinterval, skip the checks
+    if np.any(change_sign):
+        return None
+    #Run checks to try and throw out the interval
+    if run_checks and interval_data.check_interval(coeff, approx_tol, a, b):
+        return np.zeros([0,dim]), [], None
+    return None
+
+def solve_approximations(funcs,cheb_approx_list,change_sign,a,b,interval_data,approx_tol,solve_tol,polish):
+    """Solves the Chebyshev approximations of the functions on the interval [a,b], or decides how to
+    subdivide the interval if they can't be solved stably.
+
+    Parameters
+    ----------
+    funcs : list
+        Each element of the list is a callable function. Only used to polish the zeros.
+    cheb_approx_list : list
+        The coefficient matrices of the Chebyshev approximations of the functions on [a,b].
+    change_sign : numpy array
+        Which subintervals we know the functions change sign on.
+    a : numpy array
+        The lower bound on the interval.
+    b : numpy array
+        The upper bound on the interval.
+    interval_data : IntervalData
+        A class to run the subinterval checks and keep track of the solve progress
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximation.
+    solve_tol : float
+        The tolerance to pass into division solve.
+    polish : bool
+        If True resolves for each root on a smaller interval with a finer approximation to give a
+        more accurate answer.
+
+    Returns
+    -------
+    zeros : numpy array
+        The real zeros of the functions found in the interval [a,b]
+    intervals : list
+        The subintervals that still need to be solved. Each element is a tuple (a,b).
+    good_degs : list
+        The good degrees of the functions in each dimension on the subintervals, or None if unknown.
+    """
+    dim = len(a)
+    no_zeros = np.zeros([0,dim])
+
+    #The degree needed in each dimension, if we have to subdivide. The subintervals are approximated with
+    #these degrees without checking, so only terms below solve_tol are dropped
+    degs = [axis_degrees(coeff, solve_tol) for coeff in cheb_approx_list]
 
     #Make the system stable to solve
     coeffs, divisor_var = trim_coeffs(cheb_approx_list, approx_tol, solve_tol)
 
     #Check if everything is linear
     if np.all(np.array([coeff.shape[0] for coeff in coeffs]) == 2):
-#         if approx_tol > 1.e-8:
-#             return subdivision_solve_nd(funcs,a,b,deg,interval_data,1.e-8,1.e-8,polish)
         A = np.zeros([dim,dim])
         B = np.zeros(dim)
         for row in range(dim):
@@ -518,29 +2388,25 @@ def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=
                 pivot_columns = [np.flatnonzero(U[i, :])[0] for i in range(U.shape[0]) if np.flatnonzero(U[i, :]).shape[0]>0]
                 if U.shape[1]-1 in pivot_columns:
                     #dependent
-                    return np.zeros([0,dim])
+                    return no_zeros, [], None
                 else:
                     #independent
                     warnings.warn('System potentially has infinitely many roots')
-                    return np.zeros([0,dim])
+                    return no_zeros, [], None
 
         interval_data.track_interval("Base Case", [a,b])
         if polish:
             polish_tol = (b[0]-a[0])/10
-            return polish_zeros(transform(good_zeros_nd(zero.reshape([1,dim])),a,b), funcs, polish_tol)
+            return polish_zeros(transform(good_zeros_nd(zero.reshape([1,dim])),a,b), funcs, polish_tol), [], None
         else:
-            return transform(good_zeros_nd(zero.reshape([1,dim])),a,b)
+            return transform(good_zeros_nd(zero.reshape([1,dim])),a,b), [], None
     #Check if anything is linear
     elif np.any(np.array([coeff.shape[0] for coeff in coeffs]) == 2):
         #Subdivide but run some checks on the intervals first
         intervals = get_subintervals(a,b,np.arange(dim),interval_data,cheb_approx_list,change_sign,\
                                              approx_tol,True)
-        if len(intervals) == 0:
-            return np.zeros([0,dim])
-        else:
-            good_degs = [coeff.shape[0] - 1 for coeff in coeffs]
-            return np.vstack([subdivision_solve_nd(funcs,interval[0],interval[1],deg,interval_data,\
-                                                   approx_tol,solve_tol,polish,good_degs) for interval in intervals])
+        good_degs = [np.minimum(deg, coeff.shape[0] - 1) for deg, coeff in zip(degs, coeffs)]
+        return no_zeros, intervals, good_degs
 
     if np.any(np.array([coeff.shape[0] for coeff in coeffs]) > 5):
         divisor_var = -1
@@ -548,12 +2414,8 @@ def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=
         #Subdivide but run some checks on the intervals first
         intervals = get_subintervals(a,b,np.arange(dim),interval_data,cheb_approx_list,\
                                              change_sign,approx_tol,True)
-        if len(intervals) == 0:
-            return np.zeros([0,dim])
-        else:
-            good_degs = [coeff.shape[0] - 1 for coeff in coeffs]
-            return np.vstack([subdivision_solve_nd(funcs,interval[0],interval[1],deg,interval_data,\
-                                                   approx_tol,solve_tol,polish,good_degs) for interval in intervals])
+        good_degs = [np.minimum(deg, coeff.shape[0] - 1) for deg, coeff in zip(degs, coeffs)]
+        return no_zeros, intervals, good_degs
 
     polys = [MultiCheb(coeff, lead_term = [coeff.shape[0]-1], clean_zeros = False) for coeff in coeffs]
     zeros = division(polys,divisor_var,solve_tol)
@@ -561,12 +2423,12 @@ def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=
         zeros = np.array(zeros)
         interval_data.track_interval("Division", [a,b])
         if len(zeros) == 0:
-            return np.zeros([0,dim])
+            return no_zeros, [], None
         if polish:
             polish_tol = (b[0]-a[0])
-            return polish_zeros(transform(good_zeros_nd(zeros),a,b), funcs, polish_tol)
+            return polish_zeros(transform(good_zeros_nd(zeros),a,b), funcs, polish_tol), [], None
         else:
-            return transform(good_zeros_nd(zeros),a,b)
+            return transform(good_zeros_nd(zeros),a,b), [], None
     else:
         divisor_var += 1
         while divisor_var < dim:
@@ -580,21 +2442,47 @@ def subdivision_solve_nd(funcs,a,b,deg,interval_data,approx_tol=1.e-4,solve_tol=
             zeros = np.array(zeros)
             interval_data.track_interval("Division", [a,b])
             if len(zeros) == 0:
-                return np.zeros([0,dim])
+                return no_zeros, [], None
             if polish:
                 polish_tol = (b[0]-a[0])
-                return polish_zeros(transform(good_zeros_nd(zeros),a,b),funcs,polish_tol)
+                return polish_zeros(transform(good_zeros_nd(zeros),a,b),funcs,polish_tol), [], None
             else:
-                return transform(good_zeros_nd(zeros),a,b)
+                return transform(good_zeros_nd(zeros),a,b), [], None
         #Subdivide but run some checks on the intervals first
         intervals = get_subintervals(a,b,np.arange(dim),interval_data,cheb_approx_list,change_sign,\
                                              approx_tol,check_subintervals=True)
-        if len(intervals) == 0:
-            return np.zeros([0,dim])
+        good_degs = [np.minimum(deg, poly.coeff.shape[0] - 1) for deg, poly in zip(degs, polys)]
+        return no_zeros, intervals, good_degs
+
+def axis_degrees(coeff, tol):
+    """Finds the degree a chebyshev approximation needs in each dimension.
+
+    Parameters
+    ----------
+    coeff : numpy array
+        The coefficient matrix of the approximation.
+    tol : float
+        How much the approximation can change when the higher degree terms are dropped.
+
+    Returns
+    -------
+    degs : numpy array
+        The degree in each dimension. Dropping the terms above them changes the approximation
+        by at most tol.
+    """
+    dim = coeff.ndim
+    degs = np.empty(dim, dtype=int)
+    abs_coeff = np.abs(coeff)
+    for i in range(dim):
+        #tail_sums[k] is the error from dropping degree k and above in dimension i
+        slab_sums = np.sum(abs_coeff, axis=tuple(j for j in range(dim) if j != i))
+        tail_sums = np.cumsum(slab_sums[::-1])[::-1]
+        small = tail_sums <= tol/dim
+        if np.any(small):
+            degs[i] = max(np.argmax(small)-1, 1)
         else:
-            good_degs = [poly.coeff.shape[0] - 1 for poly in polys]
-            return np.vstack([subdivision_solve_nd(funcs,interval[0],interval[1],deg,interval_data,\
-                                                   approx_tol,solve_tol,polish,good_degs) for interval in intervals])
+            degs[i] = len(tail_sums)-1
+    return degs
 
 def good_direc(coeffs, dim, solve_tol):
     """Determines if this is a good direction to try solving with division.
@@ -623,14 +2511,14 @@ def good_direc(coeffs, dim, solve_tol):
     vals = [coeff[tuple(slices)] for coeff in coeffs]
     degs = [val.shape[0] for val in vals]
 
-    min_vals = np.zeros([len(vals),*vals[np.argmax(degs)].shape])
+    #The spots past the degree of a polynomial aren't in its part of the Macaulay diagonal
+    min_vals = np.ones([len(vals),*vals[np.argmax(degs)].shape])
 
     for num, val in enumerate(vals):
         deg = degs[num]
         slices = [num]+[slice(0,deg) for i in range(val.ndim)]
-        min_vals[tuple(slices)] = val
+        min_vals[tuple(slices)] = np.where(total_degree_labels(val.shape) < deg, val, 1)
 
-    min_vals[min_vals==0] = 1
     if np.any(np.min(np.abs(min_vals),axis=0) < tol):
         return False
     return True
@@ -669,6 +2557,151 @@ def polish_zeros(zeros, funcs, tol=1.e-1):
         polished_zeros.append(polished_zero)
     return np.vstack(polished_zeros)
 
+def evaluate_funcs(funcs, points):
+    """Evaluates the functions at many points with one call to each.
+
+    Parameters
+    ----------
+    funcs : list or function
+        The functions to evaluate, or one vector valued function.
+    points : numpy array
+        Each row is a point.
+
+    Returns
+    -------
+    values : numpy array
+        values[i,j] is the value of the i'th function at the j'th point.
+    """
+    if not isinstance(funcs, list):
+        return np.asarray(funcs(*points.T))
+    return np.array([func(points) if isinstance(func, Polynomial) else func(*points.T) for func in funcs])
+
+def jacobians(funcs, points, jac=None):
+    """Gets the Jacobian matrices of the functions at many points.
+
+    Parameters
+    ----------
+    funcs : list or function
+        The functions, or one vector valued function.
+    points : numpy array
+        Each row is a point.
+    jac : function
+        If given, jac(x1,...,xn) returns an array J where J[i,j] is the derivative of the i'th function
+        with respect to the j'th variable at each point. Otherwise central differences are used.
+
+    Returns
+    -------
+    jacobians : numpy array
+        jacobians[k] is the Jacobian matrix at the k'th point.
+    """
+    if jac is not None:
+        return np.moveaxis(np.asarray(jac(*points.T), dtype=float), -1, 0)
+    num, dim = points.shape
+    steps = np.finfo(float).eps**(1/3)*np.maximum(1, np.abs(points))
+    #All the shifted points are evaluated together
+    shifted = np.repeat(points[np.newaxis], 2*dim, axis=0)
+    for j in range(dim):
+        shifted[2*j,:,j] += steps[:,j]
+        shifted[2*j+1,:,j] -= steps[:,j]
+    values = evaluate_funcs(funcs, shifted.reshape(-1, dim)).reshape(dim, 2*dim, num)
+    derivatives = (values[:,0::2] - values[:,1::2])/(2*steps.T)
+    return np.moveaxis(derivatives, -1, 0)
+
+def newton_polish(zeros, funcs, max_step, jac=None, max_iter=10, tol=1.e-12):
+    """Refines all the zeros together with Newton's method.
+
+    Parameters
+    ----------
+    zeros : numpy array
+        Each row is a zero to refine.
+    funcs : list or function
+        The functions, or one vector valued function.
+    max_step : float
+        The farthest a zero can move and still count as converged.
+    jac : function
+        The Jacobian of the functions, see jacobians. If None central differences are used.
+    max_iter : int
+        The most Newton steps to take.
+    tol : float
+        A zero is converged once its Newton step is less than tol relative to its size.
+
+    Returns
+    -------
+    polished : numpy array
+        The refined zeros.
+    converged : numpy array
+        Whether each zero converged.
+    """
+    polished = zeros.copy()
+    converged = np.zeros(len(zeros), dtype=bool)
+    active = np.arange(len(zeros))
+    for i in range(max_iter):
+        if len(active) == 0:
+            break
+        points = polished[active]
+        values = evaluate_funcs(funcs, points).T
+        J = jacobians(funcs, points, jac)
+        try:
+            steps = np.linalg.solve(J, values[...,np.newaxis])[...,0]
+        except np.linalg.LinAlgError:
+            steps = np.array([np.linalg.lstsq(J[k], values[k], rcond=None)[0] for k in range(len(points))])
+        polished[active] -= steps
+        done = np.linalg.norm(steps, axis=1) <= tol*np.maximum(1, np.linalg.norm(polished[active], axis=1))
+        converged[active[done]] = True
+        active = active[~done]
+
+    converged &= np.all(np.isfinite(polished), axis=1)
+    converged &= np.linalg.norm(polished - zeros, axis=1) <= max_step
+    return polished, converged
+
+def polish_roots(zeros, funcs, a, b, approx_tol=1.e-4, solve_tol=1.e-8, jac=None):
+    """Polishes all the zeros found on [a,b] together.
+
+    Newton's method refines all the zeros at once. The zeros where it doesn't converge, or where it
+    moves too far, are polished by polish_zeros instead. A zero is left unpolished if polishing
+    moves it out of [a,b] or doesn't lower its residual.
+
+    Parameters
+    ----------
+    zeros : numpy array
+        Each row is a zero to polish.
+    funcs : list or function
+        The functions, or one vector valued function.
+    a : numpy array
+        The lower bound on the interval that was solved.
+    b : numpy array
+        The upper bound on the interval that was solved.
+    approx_tol: float
+        The bound of the sup norm error of the chebyshev approximations the zeros were found with.
+    solve_tol : float
+        The tolerance that was passed into division solve.
+    jac : function
+        The Jacobian of the functions, see jacobians. If None central differences are used.
+
+    Returns
+    -------
+    polished_zeros : numpy array
+        The polished zeros.
+    """
+    if len(zeros) == 0:
+        return zeros
+    def improved(points, residuals):
+        #Polished zeros must stay in [a,b] and not have a larger residual than the zeros they came from
+        inside = np.all((a <= points) & (points <= b), axis=1)
+        return inside & (np.max(np.abs(evaluate_funcs(funcs, points)), axis=0) <= residuals)
+
+    residuals = np.max(np.abs(evaluate_funcs(funcs, zeros)), axis=0)
+    max_step = np.sqrt(approx_tol)*np.max(b-a)
+    polished, converged = newton_polish(zeros, funcs, max_step, jac)
+    rejected = converged & ~improved(polished, residuals)
+    polished[rejected] = zeros[rejected]
+    polished = [polished[converged]]
+    for zero, residual in zip(zeros[~converged], residuals[~converged]):
+        refined = polish_zeros(zero[np.newaxis], funcs, max_step)
+        refined = refined[improved(refined, residual)] if len(refined) else refined
+        polished.append(refined if len(refined) else zero[np.newaxis])
+    return unique_roots(np.vstack(polished), root_tolerance(a,b,approx_tol,solve_tol))
+
 def trim_coeffs(coeffs, approx_tol, solve_tol):
     """Trim the coefficient matrices so they are stable and choose a direction to divide in.
 
@@ -690,41 +2723,21 @@ def trim_coeffs(coeffs, approx_tol, solve_tol):
     """
     all_triangular = True
     for num, coeff in enumerate(coeffs):
-        error = 0.
         dim = coeff.ndim
-        deg = np.sum(coeff.shape) - dim
-        initial_mons = []
-        for deg0 in range(coeff.shape[0], deg+1):
-            initial_mons += mon_combos_limited_wrap(deg0, dim, coeff.shape)
-        mons = np.array(initial_mons).T
-        slices = [mons[i] for i in range(dim)]
-        slice_error = np.sum(np.abs(coeff[tuple(slices)]))
-        if slice_error + error > approx_tol:
+        first_deg = coeff.shape[0]
+        labels = total_degree_labels(coeff.shape)
+        #layer_error[deg] is the sum of the absolute values of the terms of degree deg
+        layer_error = np.bincount(labels.ravel(), weights=np.abs(coeff).ravel())
+        if np.sum(layer_error[first_deg:]) > approx_tol:
             all_triangular = False
         else:
-            coeff[tuple(slices)] = 0
-            deg = coeff.shape[0]-1
-            while deg > 1:
-                mons = mon_combos_limited_wrap(deg, dim, coeff.shape)
-                slices = [] #becomes the indices of the terms of degree deg
-                mons = np.array(mons).T
-                for i in range(dim):
-                    slices.append(mons[i])
-                slices = tuple(slices)
-                slice_error = np.sum(np.abs(coeff[slices]))
-                if slice_error + error > approx_tol:
-                    if deg < coeff.shape[0]-1:
-                        slices = tuple([slice(0,deg+1)]*dim)
-                        coeff = coeff[slices]
-                    break
-                else:
-                    error += slice_error
-                    coeff[slices] = 0
-                    deg-=1
-                    if deg == 1:
-                        slices = tuple([slice(0,2)]*dim)
-                        coeff = coeff[slices]
-                        break
+            #Drops the terms of degree deg for deg from first_deg-1 down to 2 while the error they add
+            #up to is below approx_tol
+            errors = np.cumsum(layer_error[first_deg-1:1:-1])
+            deg = first_deg - 1 - np.searchsorted(errors, approx_tol, side='right')
+            coeff[labels > deg] = 0
+            if deg < first_deg - 1:
+                coeff = coeff[tuple([slice(0,deg+1)]*dim)]
         coeffs[num] = coeff
 
     if not all_triangular:
@@ -736,62 +2749,24 @@ def trim_coeffs(coeffs, approx_tol, solve_tol):
         return coeffs, -1
 
 @Memoize
-def mon_combos_limited_wrap(deg, dim, shape):
-    '''A wrapper for mon_combos_limited to memoize.
-
-    Parameters
-    --------
-    deg: int
-        Degree of the monomials desired.
-    dim : int
-        Dimension of the monomials desired.
-    shape : tuple
-        The limiting shape. The i'th index of the mon can't be bigger than the i'th index of the shape.
-
-    Returns
-    -----------
-    mon_combo_limited_wrap : list
-        A list of all the monomials.
-    '''
-    return mon_combos_limited([0]*dim,deg,shape)
-
-def mon_combos_limited(mon, remaining_degrees, shape, cur_dim = 0):
-    '''Finds all the monomials of a given degree that fits in a given shape and returns them. Works recursively.
-
-    Very similar to mon_combos, but only returns the monomials of the desired degree.
+def total_degree_labels(shape):
+    '''The total degree of each term of a coefficient tensor, memoized for each shape.
 
     Parameters
     --------
-    mon: list
-        A list of zeros, the length of which is the dimension of the desired monomials. Will change
-        as the function searches recursively.
-    remaining_degrees : int
-        Initially the degree of the monomials desired. Will decrease as the function searches recursively.
     shape : tuple
-        The limiting shape. The i'th index of the mon can't be bigger than the i'th index of the shape.
-    cur_dim : int
-        The current position in the list the function is iterating through. Defaults to 0, but increases
-        in each step of the recursion.
+        The shape of the coefficient tensor.
 
     Returns
     -----------
-    answers : list
-        A list of all the monomials.
+    total_degree_labels : numpy array
+        An int array of the given shape where each spot is the sum of its indices.
     '''
-    answers = []
-    if len(mon) == cur_dim+1: #We are at the end of mon, no more recursion.
-        if remaining_degrees < shape[cur_dim]:
-            mon[cur_dim] = remaining_degrees
-            answers.append(mon.copy())
-        return answers
-    if remaining_degrees == 0: #Nothing else can be added.
-        answers.append(mon.copy())
-        return answers
-    temp = mon.copy() #Quicker than copying every time inside the loop.
-    for i in range(min(shape[cur_dim],remaining_degrees+1)): #Recursively add to mon further down.
-        temp[cur_dim] = i
-        answers.extend(mon_combos_limited(temp, remaining_degrees-i, shape, cur_dim+1))
-    return answers
+    labels = np.zeros(shape, dtype=int)
+    for i, n in enumerate(shape):
+        labels += np.arange(n).reshape([-1 if j == i else 1 for j in range(len(shape))])
+    labels.setflags(write=False)
+    return labels
 
 def good_zeros_1d(zeros, imag_tol = 1.e-10):
     """Get the real zeros in the -1 to 1 interval
@@ -854,3 +2829,105 @@ def subdivision_solve_1d(f,a,b,cheb_approx_tol=1.e-3,max_degree=128):
     div_length = (b-a)/2
     return np.hstack([subdivision_solve_1d(f,a,b-div_length,max_degree=max_degree),\
                       subdivision_solve_1d(f,a+div_length,b,max_degree=max_degree)])
+
+def subdivision_solve_1d_batch(funcs,a,b,cheb_approx_tol=1.e-3,max_degree=128):
+    """Finds the roots of many one-dimensional functions, each on its own interval.
+
+    Does the same thing as calling subdivision_solve_1d on each (f,a,b), but all the intervals are
+    handled together. Each round, every function is called once on the chebyshev extrema of all of
+    its intervals that are at the same degree, the transforms are done together, and the leaves are
+    grouped by degree so their colleague matrices can be solved with one call to np.linalg.eigvals.
+
+    Parameters
+    ----------
+    funcs : list
+        The functions from R -> R. The same function can appear many times.
+    a : numpy array
+        The lower bound on the interval of each function.
+    b : numpy array
+        The upper bound on the interval of each function.
+    cheb_approx_tol : float
+        The bound of the sup norm error of the chebyshev approximation.
+    max_degree : int
+        The degree of the interpolation before subdividing.
+
+    Returns
+    -------
+    zeros : list
+        The zeros of each function on its interval, in the order subdivision_solve_1d gives them.
+    """
+    num_problems = len(funcs)
+    a = np.array(np.broadcast_to(a, num_problems), dtype=float)
+    b = np.array(np.broadcast_to(b, num_problems), dtype=float)
+    #Problems with the same function share its calls
+    func_nums = {}
+    func_list = []
+    for f in funcs:
+        if id(f) not in func_nums:
+            func_nums[id(f)] = len(func_list)
+            func_list.append(f)
+    problem_funcs = np.array([func_nums[id(f)] for f in funcs], dtype=int)
+
+    #The pending intervals and which problem they belong to
+    problems = np.arange(num_problems)
+    lower = a
+    upper = b
+    degs = np.full(num_problems, 2)
+    #Each leaf is (problem, a, coefficients)
+    leaves = []
+
+    while len(problems) > 0:
+        passed = np.zeros(len(problems), dtype=bool)
+        leaf_coeffs = [None]*len(problems)
+        for cur_deg in np.unique(degs):
+            extrema = np.cos((np.pi*np.arange(2*cur_deg+1))/(2*cur_deg))
+            for func_num in np.unique(problem_funcs[problems[degs == cur_deg]]):
+                idx = np.where((degs == cur_deg) & (problem_funcs[problems] == func_num))[0]
+                points = transform(extrema, lower[idx,np.newaxis], upper[idx,np.newaxis])
+                values = np.asarray(func_list[func_num](points.ravel()), dtype=float).reshape(points.shape)
+                coeffs2N = chebyshev_dct(values, axes=[1])
+                #Check if the approximation is good enough
+                good = np.sum(np.abs(coeffs2N[:,cur_deg+1:]), axis=1) < cheb_approx_tol
+                if np.any(good):
+                    coeffsN = chebyshev_dct(values[good,::2], axes=[1])
+                    for i, coeffs in zip(idx[good], coeffsN):
+                        leaf_coeffs[i] = coeffs
+                passed[idx[good]] = True
+
+        for i in np.where(passed)[0]:
+            leaves.append((problems[i], lower[i], upper[i], leaf_coeffs[i]))
+
+        #Raise the degree of the rest, and subdivide the ones that are already at the max
+        degs = 2*degs
+        problems, lower, upper, degs = problems[~passed], lower[~passed], upper[~passed], degs[~passed]
+        split = degs > max_degree
+        div_length = (upper[split]-lower[split])/2
+        problems = np.concatenate([problems[~split], np.repeat(problems[split], 2)])
+        new_lower = np.column_stack([lower[split], lower[split]+div_length]).ravel()
+        new_upper = np.column_stack([upper[split]-div_length, upper[split]]).ravel()
+        lower = np.concatenate([lower[~split], new_lower])
+        upper = np.concatenate([upper[~split], new_upper])
+        degs = np.concatenate([degs[~split], np.full(2*np.sum(split), 2)])
+
+    #Solve the leaves, grouped by degree
+    leaf_zeros = [None]*len(leaves)
+    groups = {}
+    for leaf_num, (problem, leaf_a, leaf_b, coeffs) in enumerate(leaves):
+        if len(coeffs) > 76:
+            #Division is faster after degree 75
+            leaf_zeros[leaf_num] = divCheb(coeffs)
+        else:
+            coeffs = np.trim_zeros(coeffs.copy(),trim='b')
+            groups.setdefault(len(coeffs), []).append((leaf_num, coeffs))
+    for group in groups.values():
+        zeros = multChebStacked(np.array([coeffs for leaf_num, coeffs in group]))
+        for (leaf_num, coeffs), leaf in zip(group, zeros):
+            leaf_zeros[leaf_num] = leaf
+
+    #Put the zeros of each problem in order of the intervals they were found in
+    zeros = [[] for i in range(num_problems)]
+    order = sorted(range(len(leaves)), key=lambda leaf_num: leaves[leaf_num][1])
+    for leaf_num in order:
+        problem, leaf_a, leaf_b, coeffs = leaves[leaf_num]
+        zeros[problem].append(transform(good_zeros_1d(leaf_zeros[leaf_num]),leaf_a,leaf_b))
+    return [np.hstack(problem_zeros) for problem_zeros in zeros]